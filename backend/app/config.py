@@ -8,32 +8,104 @@ class Settings(BaseSettings):
     # Pinecone Settings
     PINECONE_API_KEY: str
     PINECONE_INDEX: str
+    PINECONE_POOL_THREADS: int = Field(default=4)  # Concurrent index queries per process
+    PINECONE_FIRST_ENABLED: bool = Field(default=True)  # Answer from previously ingested papers when they match well
+    PINECONE_FIRST_MIN_SCORE: float = Field(default=0.85)  # Every Pinecone top-k cosine must reach this
+    PINECONE_FIRST_TIMEOUT_SECONDS: float = Field(default=1.0)  # Sources are already being fetched; don't wait longer
+
+    # Rate limits are seconds between requests to each upstream (see http/rate_limit.py)
+    RATE_LIMIT_BURST: int = Field(default=1)  # Requests allowed back-to-back after an idle period
 
     # Arxiv Settings
     ARXIV_RATE_LIMIT: float = Field(default=1.5)
+    ARXIV_TIMEOUT_SECONDS: float = Field(default=5.0)  # Page deadline until arXiv latency is observed; results parsed so far are kept
+    ARXIV_SEARCH_MAX_RESULTS: int = Field(default=12)  # Results per live search
+    ARXIV_PAGE_SIZE: int = Field(default=100)  # Results per page for ingestion pulls
     
     # PubMed Settings
     PUBMED_EMAIL: str = Field(default="")  # Made optional with default empty string
-    #PUBMED_API_KEY: str = Field(default="")  # Optional
+    PUBMED_API_KEY: str = Field(default="")  # Optional; with a key NCBI allows 10 requests/second (set rate limit to 0.1)
     PUBMED_RATE_LIMIT: float = Field(default=0.34)  # NCBI allows 3 requests/second
+    PUBMED_FETCH_BATCH_SIZE: int = Field(default=20)  # Records per efetch call; batches are fetched in parallel
     
     MAX_WORKERS: int = Field(default=4)
 
+    # HTTP Settings (shared by all source connectors and web search)
+    HTTP_POOL_LIMIT: int = Field(default=100)  # Open connections across all hosts
+    HTTP_POOL_LIMIT_PER_HOST: int = Field(default=10)  # Requests in flight to any one upstream
+    HTTP_KEEPALIVE_CONNECTIONS: int = Field(default=20)  # Idle httpx connections kept, across all hosts
+    HTTP_KEEPALIVE_SECONDS: float = Field(default=30.0)
+    HTTP_TIMEOUT_SECONDS: float = Field(default=30.0)  # Until an upstream has enough latency samples
+    JSON_DECODER: str = Field(default="msgspec")  # msgspec, orjson or json; all decode into the same typed structs
+
+    # Upstream Health Settings (per host, see http/health.py)
+    HEALTH_WINDOW: int = Field(default=100)  # Recent requests kept for p95 latency and error rate
+    CIRCUIT_FAILURE_THRESHOLD: int = Field(default=5)  # Consecutive failures that open the circuit
+    CIRCUIT_ERROR_RATE: float = Field(default=0.5)  # Share of failed requests in the window that opens it
+    CIRCUIT_MIN_REQUESTS: int = Field(default=20)  # Requests in the window before the error rate counts
+    CIRCUIT_OPEN_SECONDS: float = Field(default=30.0)  # Requests fail fast this long before a half-open probe
+    ADAPTIVE_TIMEOUT_MULTIPLIER: float = Field(default=2.0)  # Timeout is this times observed p95 latency
+    ADAPTIVE_TIMEOUT_MIN_SECONDS: float = Field(default=1.0)
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES: int = Field(default=20)  # Until then the configured timeout applies
+
+    # Embedding Settings
+    EMBEDDING_MODEL: str = Field(default="allenai/specter")  # Loaded once per process
+    EMBEDDING_BACKEND: str = Field(default="torch")  # torch, torch_int8 or onnx (see inference/backends.py)
+    EMBEDDING_BATCH_SIZE: int = Field(default=32)  # Texts per forward pass
+    EMBEDDING_MAX_CONCURRENCY: int = Field(default=2)  # Forward passes running at once
+    EMBEDDING_MAX_QUEUE: int = Field(default=64)  # Jobs allowed to wait for a worker
+    EMBEDDING_MAX_BATCH_SIZE: int = Field(default=128)  # Texts coalesced across requests per batch
+    EMBEDDING_MAX_WAIT_MS: float = Field(default=5.0)  # How long a text waits for batch-mates
+    EMBEDDING_CACHE_ENABLED: bool = Field(default=True)
+    EMBEDDING_CACHE_PATH: str = Field(default=".cache/embeddings.sqlite3")
+    EMBEDDING_CACHE_MAX_ENTRIES: int = Field(default=100_000)  # ~1.5KB per float16 SPECTER vector
+    QUERY_CACHE_MAX_ENTRIES: int = Field(default=2048)
+    QUERY_CACHE_TTL_SECONDS: float = Field(default=3600.0)
+
+    # Ranking Settings
+    RANKING_MODE: str = Field(default="hybrid")  # "hybrid" (BM25 prune + dense, RRF fused) or "dense"
+    RANKING_DENSE_CANDIDATES: int = Field(default=25)  # Per-source BM25 survivors sent to embedding (0 = all)
+    RANKING_RRF_K: int = Field(default=60)  # Reciprocal rank fusion constant
+
+    # Latency Budget Settings (measured from when /search receives the request)
+    SEARCH_BUDGET_SECONDS: float = Field(default=10.0)  # Target for the whole response
+    SEARCH_BUDGET_QUERY_SHARE: float = Field(default=0.2)  # Query processing still running at this point falls back to the raw query
+    SEARCH_BUDGET_SOURCES_SHARE: float = Field(default=0.6)  # Sources still fetching at this point are dropped
+    SEARCH_BUDGET_RANKING_SHARE: float = Field(default=0.8)  # Embedding still running at this point is dropped
+    # The web search and LLM summary get the whole budget
+
+    # Local Index Settings
+    LOCAL_INDEX_ENABLED: bool = Field(default=True)  # Answer from previously ranked papers when possible
+    LOCAL_INDEX_PATH: str = Field(default=".cache/paper_index")
+    LOCAL_INDEX_MIN_SCORE: float = Field(default=0.85)  # Every local top-k cosine must reach this
+    LOCAL_INDEX_MAX_AGE_SECONDS: float = Field(default=7 * 24 * 3600.0)  # Older results trigger a live fetch
+    LOCAL_INDEX_LISTS: int = Field(default=64)  # IVF centroids, trained once the index is large enough
+    LOCAL_INDEX_PROBES: int = Field(default=8)  # Lists scanned per query
+
+    # Write-behind Settings
+    WRITE_BEHIND_ENABLED: bool = Field(default=True)  # Upsert ranked papers into Pinecone in the background
+    WRITE_BEHIND_BATCH_SIZE: int = Field(default=100)  # Vectors per upsert call
+    WRITE_BEHIND_MAX_PENDING: int = Field(default=5000)  # Oldest pending papers are dropped past this
+    WRITE_BEHIND_FLUSH_INTERVAL_SECONDS: float = Field(default=2.0)  # Longest a partial batch waits
+
     # Semantic Scholar Settings
     SEMANTIC_SCHOLAR_API_KEY: str = Field(default="")
-    SEMANTIC_SCHOLAR_RATE_LIMIT: float = Field(default=100.0)  # 100 requests per 5 minutes
+    SEMANTIC_SCHOLAR_RATE_LIMIT: float = Field(default=3.0)  # 100 requests per 5 minutes
 
     # OpenAI Settings
     OPENAI_API_KEY: str
 
     # Crossref Settings
     CROSSREF_EMAIL: str = "your-email@example.com"
-    CROSSREF_RATE_LIMIT: float = 1.0  # requests per second
+    CROSSREF_RATE_LIMIT: float = 1.0  # 1 request per second
 
     # OpenAlex Settings
-    OPEN_ALEX_RATE_LIMIT: int = 10
+    OPEN_ALEX_RATE_LIMIT: float = 0.1  # OpenAlex allows 10 requests/second
     OPEN_ALEX_EMAIL: str = "your-email@example.com"
 
+    # Google Search Settings
+    GOOGLE_SEARCH_RATE_LIMIT: float = Field(default=3.0)  # Keep scraping spaced out to avoid CAPTCHAs
+
     # SerpAPI Settings
     USE_SERP: bool = Field(default=False)
     SERP_API_KEY: str
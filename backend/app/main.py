@@ -6,6 +6,16 @@ from slowapi.errors import RateLimitExceeded
 from fastapi.responses import JSONResponse
 from app.schemas.search import SearchQuery, SearchResponse, ResearchPaper
 from app.orchestration.search import SearchOrchestrator
+from app.services.inference.registry import model_registry
+from app.services.inference.executor import inference_executor
+from app.services.embeddings import EmbeddingService
+from app.services.cache.embedding_cache import embedding_cache
+from app.services.cache.query_cache import query_embedding_cache
+from app.services.search.local_index import local_paper_index
+from app.services.search.search import SearchService
+from app.services.http.health import upstream_health
+from app.services.http.pool import http_pool
+from app.services.http.rate_limit import rate_limiter
 from app.config import settings
 
 limiter = Limiter(key_func=get_remote_address)
@@ -41,6 +51,26 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def metrics():
+    """Resource and cache metrics for this worker"""
+    search_pipeline = search_orchestrator.search_pipeline
+    write_behind = search_pipeline.write_behind
+    return {
+        "models": model_registry.stats(),
+        "inference": inference_executor.stats(),
+        "embedding_batches": EmbeddingService.batcher_stats(),
+        "embedding_cache": embedding_cache.stats(),
+        "query_cache": query_embedding_cache.stats(),
+        "local_index": local_paper_index.stats(),
+        "write_behind": write_behind.stats() if write_behind else None,
+        "http": http_pool.stats(),
+        "rate_limits": rate_limiter.stats(),
+        "upstreams": upstream_health.stats(),
+        "sources": {name: connector.transfer_stats() for name, connector in search_pipeline.sources.items()},
+        "deadline_misses": dict(search_pipeline.deadline_misses),
+    }
+
 @app.post("/search", response_model=SearchResponse)
 @limiter.limit("5/hour")  # Allow 5 requests per hour per IP
 async def search_papers(request: Request, query: SearchQuery):
@@ -60,7 +90,18 @@ async def search_papers(request: Request, query: SearchQuery):
             detail="An error occurred while processing your search"
         )
 
+@app.on_event("startup")
+async def startup_event():
+    """Open shared connection pools"""
+    await http_pool.start()
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup when shutting down"""
-    await search_orchestrator.query_processor.close()
\ No newline at end of file
+    await search_orchestrator.query_processor.close()
+    await search_orchestrator.search_pipeline.close()
+    await http_pool.close()
+    inference_executor.shutdown()
+    SearchService.shutdown()
+    embedding_cache.close()
+    local_paper_index.close()
\ No newline at end of file
@@ -0,0 +1,26 @@
+import time
+from typing import Callable
+
+class LatencyBudget:
+    """
+    End-to-end latency budget for one request, started when it arrives.
+    Stages get cumulative shares of it: a stage with share 0.6 must be done
+    by 60% of the total, so time an earlier stage overran comes out of the
+    later ones instead of the response.
+    """
+
+    def __init__(self, total_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.total_seconds = total_seconds
+        self.clock = clock
+        self.start = clock()
+
+    def deadline(self, share: float = 1.0) -> float:
+        """Clock time by which a stage with this share must finish"""
+        return self.start + self.total_seconds * share
+
+    def remaining(self, share: float = 1.0) -> float:
+        """Seconds left until that stage's deadline, never negative"""
+        return max(0.0, self.deadline(share) - self.clock())
+
+    def elapsed(self) -> float:
+        return self.clock() - self.start
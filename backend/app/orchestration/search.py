@@ -7,8 +7,9 @@ from app.services.llm.llm_service import LLMService
 from app.schemas.search import SearchResponse, ResearchPaper
 from app.schemas.research_summary import ResearchSummary
 from app.config import settings
+from app.orchestration.budget import LatencyBudget
 import asyncio
-from typing import List, Union
+from typing import List, Optional, Union
 
 
 class SearchOrchestrator:
@@ -21,11 +22,24 @@ class SearchOrchestrator:
         self.llm_service = LLMService()
 
     async def search(self, query: str) -> SearchResponse:
+        budget = LatencyBudget(settings.SEARCH_BUDGET_SECONDS)
+
         # 1. Process and validate query
         print(f"User entered query: {query}")
-        processed = await self.query_processor.process_query(query)
+        try:
+            processed = await asyncio.wait_for(
+                self.query_processor.process_query(query),
+                timeout=budget.remaining(settings.SEARCH_BUDGET_QUERY_SHARE)
+            )
+            is_valid = processed.processed_result.is_valid
+            academic_term = processed.processed_result.academic_term
+        except asyncio.TimeoutError:
+            # The LLM missed its share of the budget; search the raw query if it passes the basic rules
+            print(f"Query processing missed its share of the {settings.SEARCH_BUDGET_SECONDS}s search budget")
+            is_valid = self.query_processor.basic_validator.check_basic_rules(query)
+            academic_term = query
         
-        if not processed.processed_result.is_valid:
+        if not is_valid:
             return SearchResponse(
                 is_valid=False,
                 papers=[],
@@ -33,9 +47,12 @@ class SearchOrchestrator:
             )
 
         # 2. Run academic search and web search in parallel
+        # Both share the request's latency budget; whatever misses it is left out
         async def academic_search():
-            papers = await self.search_pipeline.search(processed.processed_result.academic_term)
-            return papers
+            return await self.search_pipeline.search_within_budget(
+                academic_term,
+                budget
+            )
 
         async def web_search_and_summarize() -> ResearchSummary:
             web_results: List[Union[GoogleSearchResult, SerpSearchResponse]] = await self.search_service.search(query=query)
@@ -45,10 +62,20 @@ class SearchOrchestrator:
             )
             return summary
 
+        web_missing: List[str] = []
+
+        async def web_summary_within_budget() -> Optional[ResearchSummary]:
+            try:
+                return await asyncio.wait_for(web_search_and_summarize(), timeout=budget.remaining())
+            except asyncio.TimeoutError:
+                print(f"Web summary missed the {settings.SEARCH_BUDGET_SECONDS}s search budget")
+                web_missing.append("web")
+                return None
+
         # Execute searches in parallel
-        academic_results, web_summary = await asyncio.gather(
+        (academic_results, missing_sources), web_summary = await asyncio.gather(
             academic_search(),
-            web_search_and_summarize()
+            web_summary_within_budget()
         )
 
         # 3. Convert academic results to ResearchPaper objects
@@ -69,5 +96,6 @@ class SearchOrchestrator:
         return SearchResponse(
             is_valid=True,
             papers=papers,
-            web_summary=web_summary
+            web_summary=web_summary,
+            missing_sources=missing_sources + web_missing
         )
\ No newline at end of file
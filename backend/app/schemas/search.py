@@ -5,6 +5,13 @@ from app.schemas.research_summary import ResearchSummary
 class SearchQuery(BaseModel):
     query: str
 
+class SearchFilters(BaseModel):
+    """Metadata constraints for vector index retrieval; unset fields don't filter"""
+    year_min: Optional[int] = None
+    year_max: Optional[int] = None
+    sources: Optional[List[str]] = None
+    categories: Optional[List[str]] = None  # Matches papers in any of these
+
 class ResearchPaper(BaseModel):
     title: str
     summary: str
@@ -19,3 +26,4 @@ class SearchResponse(BaseModel):
     is_valid: bool
     papers: List[ResearchPaper]
     web_summary: Optional[ResearchSummary] = None
+    missing_sources: List[str] = []  # Sources cut off by the latency budget; papers are ranked without them
@@ -0,0 +1,182 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional
+import numpy as np
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """
+    Persistent content-addressed cache of text embeddings.
+    Vectors are stored as float16 blobs in SQLite, keyed by a hash of
+    (model name, normalized text), and evicted least-recently-used once
+    the cache holds more than max_entries vectors. The row count is kept
+    by triggers, so it stays right across worker processes without a
+    table scan.
+    """
+
+    def __init__(self, path: str, max_entries: int, dtype: str = "float16"):
+        self.path = path
+        self.max_entries = max_entries
+        self.dtype = np.dtype(dtype)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)"
+            )
+            with conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS embedding_count (n INTEGER NOT NULL)")
+                # Seeded once from the existing rows, then maintained by the triggers
+                conn.execute(
+                    "INSERT INTO embedding_count (n) SELECT COUNT(*) FROM embeddings "
+                    "WHERE NOT EXISTS (SELECT 1 FROM embedding_count)"
+                )
+                conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS embeddings_count_insert AFTER INSERT ON embeddings "
+                    "BEGIN UPDATE embedding_count SET n = n + 1; END"
+                )
+                conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS embeddings_count_delete AFTER DELETE ON embeddings "
+                    "BEGIN UPDATE embedding_count SET n = n - 1; END"
+                )
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Unicode and whitespace normalization that leaves model input unchanged"""
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    @classmethod
+    def make_key(cls, model_name: str, text: str) -> str:
+        return hashlib.sha256(f"{model_name}\x00{cls.normalize(text)}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached float32 vectors in input order, None for misses"""
+        if not texts:
+            return []
+
+        keys = [self.make_key(model_name, text) for text in texts]
+        found: Dict[str, bytes] = {}
+        with self._lock:
+            conn = self._connect()
+            unique_keys = list(set(keys))
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(unique_keys), 500):
+                chunk = unique_keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                conn.commit()
+
+        results = [
+            None if blob is None else np.frombuffer(blob, dtype=self.dtype).astype(np.float32)
+            for blob in (found.get(key) for key in keys)
+        ]
+        hits = sum(result is not None for result in results)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_many(self, model_name: str, texts: List[str], vectors: np.ndarray):
+        """Store vectors for texts, evicting the oldest entries if over capacity"""
+        if not texts:
+            return
+
+        now = time.time()
+        rows = [
+            (self.make_key(model_name, text), np.asarray(vector, dtype=self.dtype).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            conn = self._connect()
+            # An upsert, not INSERT OR REPLACE: a replace skips the delete trigger and overcounts
+            conn.executemany(
+                "INSERT INTO embeddings (key, vector, last_access) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET vector = excluded.vector, last_access = excluded.last_access",
+                rows
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        count = self._count(conn)
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return
+
+        conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+            (overflow,)
+        )
+        self.evictions += overflow
+        logger.info(f"Evicted {overflow} embeddings from cache")
+
+    @staticmethod
+    def _count(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT n FROM embedding_count").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count(self._connect())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._count(self._connect())
+            hits, misses, evictions = self.hits, self.misses, self.evictions
+        lookups = hits + misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": (hits / lookups) if lookups else 0.0,
+            "evictions": evictions,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+embedding_cache = EmbeddingCache(
+    path=settings.EMBEDDING_CACHE_PATH,
+    max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES
+)
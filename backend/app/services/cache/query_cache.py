@@ -0,0 +1,80 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+
+class QueryEmbeddingCache:
+    """
+    Bounded in-memory LRU cache of query vectors with a time-to-live.
+    Terms are keyed on a normalized form, so phrasings that differ only in
+    case, whitespace or punctuation share one entry.
+    """
+
+    _PUNCTUATION = re.compile(r"[^\w\s]+")
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+
+    @classmethod
+    def normalize(cls, term: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace"""
+        return " ".join(cls._PUNCTUATION.sub(" ", term.lower()).split())
+
+    def get(self, model_name: str, term: str) -> Optional[List[float]]:
+        key = (model_name, self.normalize(term))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, vector = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, model_name: str, term: str, vector: List[float]):
+        key = (model_name, self.normalize(term))
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "expirations": self.expirations,
+        }
+
+# Shared by SearchPipeline and SearchService
+query_embedding_cache = QueryEmbeddingCache(
+    max_entries=settings.QUERY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.QUERY_CACHE_TTL_SECONDS
+)
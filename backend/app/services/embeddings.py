@@ -1,10 +1,94 @@
-from sentence_transformers import SentenceTransformer
+from typing import Dict, List
+import asyncio
+import numpy as np
+from app.config import settings
+from app.services.cache.embedding_cache import embedding_cache
+from app.services.cache.query_cache import query_embedding_cache
+from app.services.inference.batcher import MicroBatcher
+from app.services.inference.executor import inference_executor
+from app.services.inference.registry import model_registry
 
 class EmbeddingService:
-    def __init__(self):
-        # Using a good model for scientific text
-        self.model = SentenceTransformer('allenai/specter')
-    
+    # One micro-batcher per model, shared by every service instance
+    _batchers: Dict[str, MicroBatcher] = {}
+
+    def __init__(self, model_name: str = settings.EMBEDDING_MODEL, backend: str = settings.EMBEDDING_BACKEND):
+        # Using a good model for scientific text (shared across services)
+        self.model_name = model_name
+        self.backend = backend
+        self.model = model_registry.get(model_name, backend)
+
+        # Backends produce slightly different vectors, so caches and batchers key on both
+        self.model_id = f"{model_name}:{backend}"
+        if self.model_id not in self._batchers:
+            self._batchers[self.model_id] = MicroBatcher(
+                encode_batch=self.get_embeddings,
+                executor=inference_executor,
+                max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+                max_wait_ms=settings.EMBEDDING_MAX_WAIT_MS
+            )
+        self.batcher = self._batchers[self.model_id]
+
     def get_embedding(self, text: str) -> list[float]:
         embedding = self.model.encode(text)
-        return embedding.tolist()
\ No newline at end of file
+        return embedding.tolist()
+
+    def get_embeddings(self, texts: List[str], batch_size: int = settings.EMBEDDING_BATCH_SIZE) -> np.ndarray:
+        """
+        Encode many texts in batched forward passes.
+        Returns a (len(texts), dim) float32 matrix, one row per text.
+        """
+        if not texts:
+            dim = self.model.get_sentence_embedding_dimension()
+            return np.empty((0, dim), dtype=np.float32)
+
+        embeddings = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return embeddings.astype(np.float32, copy=False)
+
+    async def get_embedding_async(self, text: str) -> list[float]:
+        """Encode one text, batched with other concurrent requests"""
+        embeddings = await self.batcher.submit([text])
+        return embeddings[0].tolist()
+
+    async def get_embeddings_async(self, texts: List[str]) -> np.ndarray:
+        """Encode many texts, batched with other concurrent requests"""
+        if not texts:
+            return self.get_embeddings([])
+        return await self.batcher.submit(texts)
+
+    async def get_query_embedding_async(self, query: str) -> list[float]:
+        """Encode a search term through the shared in-memory query cache"""
+        embedding = query_embedding_cache.get(self.model_id, query)
+        if embedding is None:
+            embedding = await self.get_embedding_async(query)
+            query_embedding_cache.put(self.model_id, query, embedding)
+        return embedding
+
+    async def get_cached_embeddings_async(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts through the persistent embedding cache.
+        Only cache misses reach the model; their vectors are written back.
+        """
+        if not texts or not settings.EMBEDDING_CACHE_ENABLED:
+            return await self.get_embeddings_async(texts)
+
+        cached = await asyncio.to_thread(embedding_cache.get_many, self.model_id, texts)
+
+        # Embed each distinct missing text once
+        miss_texts = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        if miss_texts:
+            miss_vectors = await self.get_embeddings_async(miss_texts)
+            await asyncio.to_thread(embedding_cache.put_many, self.model_id, miss_texts, miss_vectors)
+            computed = dict(zip(miss_texts, miss_vectors))
+            cached = [computed[text] if vector is None else vector for text, vector in zip(texts, cached)]
+
+        return np.vstack(cached).astype(np.float32, copy=False)
+
+    @classmethod
+    def batcher_stats(cls) -> Dict:
+        return {name: batcher.stats() for name, batcher in cls._batchers.items()}
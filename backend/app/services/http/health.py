@@ -0,0 +1,330 @@
+import logging
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Deque, Dict, Optional
+import httpx
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending a request to an upstream whose circuit is open"""
+
+# time.monotonic() by which the current caller gives up on its requests
+_request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+@contextmanager
+def request_deadline(deadline: Optional[float]):
+    """
+    Clamp the timeout of requests made within the block to `deadline` (a
+    time.monotonic() value), so httpx times them out before the caller
+    cancels them. Nested blocks keep the earlier deadline.
+    """
+    outer = _request_deadline.get()
+    if outer is not None and (deadline is None or outer < deadline):
+        deadline = outer
+    token = _request_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+class Permit:
+    """Leave to send one request, from UpstreamHealth.allow(); its outcome is reported with it"""
+
+    __slots__ = ("generation",)
+
+    def __init__(self, generation: int):
+        self.generation = generation  # Times the circuit had opened when it was issued
+
+class UpstreamHealth:
+    """
+    Rolling latency and error window for one upstream host, with a circuit
+    breaker on top.
+    The circuit opens after `failure_threshold` consecutive failures, or
+    once `error_rate` of the last `window` requests failed. While open,
+    requests fail fast; after `open_seconds` a single probe is let through
+    (half-open), and its outcome closes or reopens the circuit.
+    Timeouts follow observed p95 latency once there are enough samples.
+    A request abandoned by its caller counts as a failure once it has run
+    past its timeout; before that it has no outcome. Outcomes of requests
+    sent before the circuit last opened are ignored, so a straggler can't
+    close it without a probe.
+    """
+
+    def __init__(
+        self,
+        default_timeout: float,
+        window: int = 100,
+        failure_threshold: int = 5,
+        error_rate: float = 0.5,
+        min_requests: int = 20,
+        open_seconds: float = 30.0,
+        timeout_multiplier: float = 2.0,
+        min_timeout: float = 1.0,
+        min_samples: int = 20,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.default_timeout = default_timeout
+        self.failure_threshold = failure_threshold
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.min_samples = min_samples
+        self.clock = clock
+
+        self._latencies: Deque[float] = deque(maxlen=window)  # Successful requests only
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True for a failure
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe: Optional[Permit] = None  # Permit of the half-open probe in flight
+        self.state = CLOSED
+
+        # Metrics
+        self.requests = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+
+    def allow(self) -> Optional[Permit]:
+        """
+        A permit if a request may go out now, else None. When half-open the
+        permit claims the probe, and only that permit can release it.
+        """
+        if self.state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+            self._probe = None
+        if self.state == CLOSED:
+            return Permit(self.opened)
+        if self.state == HALF_OPEN and self._probe is None:
+            self._probe = Permit(self.opened)
+            return self._probe
+        self.rejected += 1
+        return None
+
+    def _counts(self, permit: Permit) -> bool:
+        """Whether a request's outcome says anything about the circuit's current state"""
+        if permit.generation != self.opened:
+            return False  # Sent before the circuit last opened
+        return self.state == CLOSED or permit is self._probe
+
+    def record_success(self, permit: Permit, latency: float):
+        if not self._counts(permit):
+            return
+        self.requests += 1
+        self._latencies.append(latency)
+        self._outcomes.append(False)
+        self._consecutive_failures = 0
+        if self.state != CLOSED:
+            # The probe got through; judge the upstream on what happens from here
+            logger.info(f"Circuit closed after a successful probe ({latency:.2f}s)")
+            self.state = CLOSED
+            self._probe = None
+            self._outcomes.clear()
+
+    def record_failure(self, permit: Permit):
+        if not self._counts(permit):
+            return
+        self.requests += 1
+        self.failures += 1
+        self._outcomes.append(True)
+        self._consecutive_failures += 1
+        if self.state == HALF_OPEN or self._should_open():
+            self._open()
+
+    def release(self, permit: Permit):
+        """Give back a half-open probe that ended without an outcome (cancelled)"""
+        if permit is self._probe:
+            self._probe = None
+
+    def record_abandoned(self, permit: Permit, overdue: bool):
+        """A request its caller gave up on: a failure if it outlived its timeout"""
+        if overdue:
+            self.record_failure(permit)
+        else:
+            self.release(permit)
+
+    def _should_open(self) -> bool:
+        if self.state != CLOSED:
+            return False
+        if self._consecutive_failures >= self.failure_threshold:
+            return True
+        return len(self._outcomes) >= self.min_requests and self.current_error_rate() >= self.error_rate
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = self.clock()
+        self._probe = None
+        self.opened += 1
+
+    def current_error_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile of recent successful latencies"""
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    def timeout(self) -> float:
+        """p95 latency times the multiplier, between min_timeout and the configured timeout"""
+        if len(self._latencies) < self.min_samples:
+            return self.default_timeout
+        adaptive = self.percentile(0.95) * self.timeout_multiplier
+        return min(self.default_timeout, max(self.min_timeout, adaptive))
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "requests": self.requests,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "opened": self.opened,
+            "error_rate": round(self.current_error_rate(), 3),
+            "p50_seconds": self.percentile(0.5),
+            "p95_seconds": self.percentile(0.95),
+            "timeout_seconds": self.timeout(),
+        }
+
+class HealthTracker:
+    """
+    One UpstreamHealth per upstream host, shared by every request in the
+    process. Hosts are tracked from their first request; `timeouts` sets
+    the starting timeout for hosts that shouldn't start at `default_timeout`.
+    """
+
+    def __init__(self, default_timeout: float, timeouts: Optional[Dict[str, float]] = None, **options):
+        self.default_timeout = default_timeout
+        self.timeouts = timeouts or {}
+        self.options = options
+        self._upstreams: Dict[str, UpstreamHealth] = {}
+
+    def upstream(self, host: Optional[str]) -> UpstreamHealth:
+        host = host or ""
+        upstream = self._upstreams.get(host)
+        if upstream is None:
+            upstream = UpstreamHealth(self.timeouts.get(host, self.default_timeout), **self.options)
+            self._upstreams[host] = upstream
+        return upstream
+
+    def timeout(self, host: Optional[str]) -> float:
+        return self.upstream(host).timeout()
+
+    def stats(self) -> Dict:
+        return {host: upstream.stats() for host, upstream in self._upstreams.items()}
+
+def is_failure(status_code: int) -> bool:
+    """Throttling and server errors count against an upstream; other 4xx are the caller's fault"""
+    return status_code == 429 or status_code >= 500
+
+class _TimedStream(httpx.AsyncByteStream):
+    """Response body that reports the full request's outcome once it has been read"""
+
+    def __init__(
+        self,
+        stream: httpx.AsyncByteStream,
+        upstream: UpstreamHealth,
+        permit: Permit,
+        started: float,
+        expires: float
+    ):
+        self._stream = stream
+        self._upstream = upstream
+        self._permit = permit
+        self._started = started
+        self._expires = expires
+        self._finished = False
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        except Exception:
+            if not self._finished:
+                self._finished = True
+                self._upstream.record_failure(self._permit)
+            raise
+        if not self._finished:
+            self._finished = True
+            self._upstream.record_success(self._permit, time.monotonic() - self._started)
+
+    async def aclose(self):
+        # Closed before the body was read (cancelled or abandoned)
+        if not self._finished:
+            self._finished = True
+            self._upstream.record_abandoned(self._permit, time.monotonic() >= self._expires)
+        await self._stream.aclose()
+
+class HealthTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport wrapper that fails fast on open circuits, sets each
+    request's timeout from its host's latency (clamped to the caller's
+    request_deadline), and records how it went
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, tracker: HealthTracker):
+        self._transport = transport
+        self._tracker = tracker
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        upstream = self._tracker.upstream(host)
+        permit = upstream.allow()
+        if not permit:
+            raise CircuitOpenError(f"Circuit open for {host}", request=request)
+
+        started = time.monotonic()
+        timeout = upstream.timeout()
+        deadline = _request_deadline.get()
+        if deadline is not None:
+            timeout = min(timeout, deadline - started)
+            if timeout <= 0:
+                # The caller is out of time; not the upstream's fault
+                upstream.release(permit)
+                raise httpx.TimeoutException(f"Request deadline passed before sending to {host}", request=request)
+        expires = started + timeout
+        request.extensions["timeout"] = httpx.Timeout(timeout).as_dict()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            upstream.record_failure(permit)
+            raise
+        except BaseException:
+            upstream.record_abandoned(permit, time.monotonic() >= expires)
+            raise
+
+        if is_failure(response.status_code):
+            upstream.record_failure(permit)
+            return response
+        if isinstance(response.stream, httpx.ByteStream):
+            # Body already in memory (mock and test transports)
+            upstream.record_success(permit, time.monotonic() - started)
+            return response
+        response.stream = _TimedStream(response.stream, upstream, permit, started, expires)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+upstream_health = HealthTracker(
+    default_timeout=settings.HTTP_TIMEOUT_SECONDS,
+    timeouts={"export.arxiv.org": settings.ARXIV_TIMEOUT_SECONDS},
+    window=settings.HEALTH_WINDOW,
+    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+    error_rate=settings.CIRCUIT_ERROR_RATE,
+    min_requests=settings.CIRCUIT_MIN_REQUESTS,
+    open_seconds=settings.CIRCUIT_OPEN_SECONDS,
+    timeout_multiplier=settings.ADAPTIVE_TIMEOUT_MULTIPLIER,
+    min_timeout=settings.ADAPTIVE_TIMEOUT_MIN_SECONDS,
+    min_samples=settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES
+)
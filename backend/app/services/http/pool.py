@@ -0,0 +1,156 @@
+import asyncio
+import importlib.util
+import logging
+from typing import Dict, Optional
+import httpx
+from app.config import settings
+from app.services.http.health import HealthTracker, HealthTransport, upstream_health
+
+logger = logging.getLogger(__name__)
+
+# httpx only speaks HTTP/2 when the optional h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Only advertise brotli when a decoder for it is installed
+BROTLI_AVAILABLE = any(importlib.util.find_spec(name) is not None for name in ("brotli", "brotlicffi"))
+ACCEPT_ENCODING = "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate"
+
+class _SlotReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees its host slot once closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+class HostLimitTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport wrapper that caps requests in flight to each host.
+    httpx only limits connections across all hosts, and over HTTP/2 one
+    connection carries many requests, so the cap counts requests: a slot
+    is held until the response body is closed.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, limit_per_host: int):
+        self._transport = transport
+        self.limit_per_host = limit_per_host
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        slots = self._slots.get(host)
+        if slots is None:
+            slots = self._slots[host] = asyncio.Semaphore(self.limit_per_host)
+        await slots.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            slots.release()
+            raise
+        if isinstance(response.stream, httpx.ByteStream):
+            # Body already in memory (mock and test transports)
+            slots.release()
+        else:
+            response.stream = _SlotReleasingStream(response.stream, slots.release)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+class HttpPool:
+    """
+    Process-wide HTTP connection pool shared by source connectors and web
+    search backends.
+    One httpx client (HTTP/2 where available, keep-alive) asking for gzip
+    or brotli responses, with at most `limit_per_host` requests in flight
+    to each upstream. Its requests go through the upstream health
+    tracker, which fails fast on open circuits and sets per-host timeouts
+    from observed latency. It is opened on app startup and closed on
+    shutdown; if used outside the app (scripts, tests) or from another
+    event loop, it is recreated on demand.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        max_keepalive: int = 20,
+        keepalive_timeout: float = 30.0,
+        timeout: float = 30.0,
+        health: Optional[HealthTracker] = None
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.max_keepalive = max_keepalive
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.health = health
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Metrics
+        self.clients_created = 0
+
+    async def start(self):
+        self.client()
+        logger.info(f"HTTP pool ready (limit={self.limit}, limit_per_host={self.limit_per_host}, http2={HTTP2_AVAILABLE})")
+
+    def client(self) -> httpx.AsyncClient:
+        """Shared httpx client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            transport = httpx.AsyncHTTPTransport(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=self.limit,
+                    # A cap on idle connections across all hosts, not per host
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_timeout
+                )
+            )
+            if self.health:
+                transport = HealthTransport(transport, self.health)
+            self._client = httpx.AsyncClient(
+                # Outside the health tracker, so time spent waiting for a slot isn't upstream latency
+                transport=HostLimitTransport(transport, self.limit_per_host),
+                headers={"Accept-Encoding": ACCEPT_ENCODING},
+                timeout=self.timeout,
+                follow_redirects=True
+            )
+            self._client_loop = loop
+            self.clients_created += 1
+        return self._client
+
+    async def close(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def stats(self) -> Dict:
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "max_keepalive": self.max_keepalive,
+            "http2": HTTP2_AVAILABLE,
+            "accept_encoding": ACCEPT_ENCODING,
+            "client_open": self._client is not None and not self._client.is_closed,
+            "clients_created": self.clients_created,
+        }
+
+http_pool = HttpPool(
+    limit=settings.HTTP_POOL_LIMIT,
+    limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+    max_keepalive=settings.HTTP_KEEPALIVE_CONNECTIONS,
+    keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS,
+    timeout=settings.HTTP_TIMEOUT_SECONDS,
+    health=upstream_health
+)
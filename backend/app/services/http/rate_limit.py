@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` requests per second with bursts of `capacity`.
+    A caller takes a token immediately and only sleeps if the bucket is in
+    debt. Reserving the token and computing the wait happen without an
+    await, so concurrent coroutines queue up in order without a lock.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+        # Metrics
+        self.acquired = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _reserve(self) -> float:
+        """Take a token, possibly on credit; returns how long to wait for it"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        self.acquired += 1
+        return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self):
+        delay = self._reserve()
+        if delay <= 0:
+            return
+
+        self.waited += 1
+        self.total_wait += delay
+        self.max_wait = max(self.max_wait, delay)
+        # A cancelled waiter's slot is left unused: the callers queued behind
+        # it already have fixed wake times, so a refunded token would only let
+        # the next new caller fire alongside one of them
+        await asyncio.sleep(delay)
+
+    def stats(self) -> Dict:
+        return {
+            "requests_per_second": self.rate,
+            "burst": self.capacity,
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "total_wait_seconds": self.total_wait,
+            "max_wait_seconds": self.max_wait,
+        }
+
+class RateLimiter:
+    """
+    One token bucket per upstream host, shared by every request in the
+    process. Hosts without a configured interval are not limited.
+    """
+
+    def __init__(self, intervals: Dict[str, float], burst: int = 1):
+        self._buckets: Dict[str, TokenBucket] = {
+            host: TokenBucket(rate=1.0 / interval, capacity=burst)
+            for host, interval in intervals.items()
+            if interval > 0
+        }
+
+    def bucket(self, host: Optional[str]) -> Optional[TokenBucket]:
+        return self._buckets.get(host or "")
+
+    async def acquire(self, host: Optional[str]):
+        """Wait, only if needed, until a request to host is within budget"""
+        bucket = self.bucket(host)
+        if bucket is not None:
+            await bucket.acquire()
+
+    def stats(self) -> Dict:
+        return {host: bucket.stats() for host, bucket in self._buckets.items()}
+
+# Seconds between requests to each upstream
+rate_limiter = RateLimiter({
+    "export.arxiv.org": settings.ARXIV_RATE_LIMIT,
+    "eutils.ncbi.nlm.nih.gov": settings.PUBMED_RATE_LIMIT,
+    "api.semanticscholar.org": settings.SEMANTIC_SCHOLAR_RATE_LIMIT,
+    "api.crossref.org": settings.CROSSREF_RATE_LIMIT,
+    "api.openalex.org": settings.OPEN_ALEX_RATE_LIMIT,
+    "www.google.com": settings.GOOGLE_SEARCH_RATE_LIMIT,
+}, burst=settings.RATE_LIMIT_BURST)
@@ -0,0 +1,45 @@
+import logging
+from typing import Dict
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+# Supported inference backends for EMBEDDING_BACKEND
+#   torch       fp32 PyTorch forward pass (reference)
+#   torch_int8  PyTorch with Linear layers dynamically quantized to int8
+#   onnx        ONNX Runtime on CPU (needs `pip install optimum[onnxruntime]`)
+BACKENDS = ("torch", "torch_int8", "onnx")
+
+def load_model(model_name: str, backend: str = "torch") -> SentenceTransformer:
+    """Load a SentenceTransformer for the given inference backend"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {BACKENDS}")
+
+    if backend == "onnx":
+        return SentenceTransformer(model_name, device="cpu", backend="onnx")
+
+    if backend == "torch_int8":
+        model = SentenceTransformer(model_name, device="cpu")
+        model.eval()
+        # Weights of every Linear layer become int8; activations are quantized on the fly
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    return SentenceTransformer(model_name)
+
+def cosine_drift(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """
+    Compare row-aligned embeddings from two backends.
+    Drift is 1 - cosine(reference_i, candidate_i) for each text.
+    """
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosines = np.sum(reference * candidate, axis=1)
+    drift = 1.0 - cosines
+    return {
+        "mean_cosine": float(cosines.mean()),
+        "min_cosine": float(cosines.min()),
+        "mean_drift": float(drift.mean()),
+        "max_drift": float(drift.max()),
+    }
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from app.services.inference.executor import InferenceExecutor
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """
+    Coalesces encode requests from concurrent coroutines into shared batches.
+    Texts wait up to max_wait_ms (or until max_batch_size texts are pending),
+    then run through one forward pass and the rows are handed back to each caller.
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], np.ndarray],
+        executor: InferenceExecutor,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0
+    ):
+        self.encode_batch = encode_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks = set()  # Keep in-flight batches referenced
+
+        # Metrics
+        self._batches = 0
+        self._texts = 0
+        self._requests = 0
+
+    async def submit(self, texts: List[str]) -> np.ndarray:
+        """Queue texts for the next batch and wait for their vectors"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Pending work from a previous loop can never complete
+            self._pending = []
+            self._timer = None
+            self._tasks = set()
+            self._loop = loop
+
+        self._requests += 1
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future))
+            futures.append(future)
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        rows = await asyncio.gather(*futures)
+        return np.vstack(rows)
+
+    def _flush(self):
+        """Dispatch everything pending as max_batch_size chunks"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, []
+        for i in range(0, len(pending), self.max_batch_size):
+            chunk = pending[i:i + self.max_batch_size]
+            task = asyncio.ensure_future(self._run_batch(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, chunk: List[Tuple[str, asyncio.Future]]):
+        # Skip texts whose callers have already given up
+        live = [(text, future) for text, future in chunk if not future.done()]
+        if not live:
+            return
+
+        self._batches += 1
+        self._texts += len(live)
+        try:
+            vectors = await self.executor.run(self.encode_batch, [text for text, _ in live])
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(live)} failed: {str(e)}")
+            for _, future in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), vector in zip(live, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    def stats(self) -> Dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "pending": len(self._pending),
+            "requests": self._requests,
+            "batches": self._batches,
+            "texts": self._texts,
+            "avg_batch_size": (self._texts / self._batches) if self._batches else 0.0,
+        }
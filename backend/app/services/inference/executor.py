@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class InferenceQueueFullError(Exception):
+    """Raised when the inference queue is at capacity"""
+    pass
+
+class InferenceExecutor:
+    """
+    Bounded thread pool for model inference.
+    Keeps blocking forward passes off the event loop; at most max_workers
+    run at once and at most max_queue wait behind them.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="inference"
+            )
+        return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the pool and await its result"""
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise InferenceQueueFullError(
+                    f"Inference queue full ({self._queued} waiting)"
+                )
+            self._queued += 1
+
+        submitted_at = time.perf_counter()
+
+        def task():
+            started_at = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._total_wait += started_at - submitted_at
+            succeeded = False
+            try:
+                result = fn(*args, **kwargs)
+                succeeded = True
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    if succeeded:
+                        self._completed += 1
+                    else:
+                        self._failed += 1
+                    self._total_run += time.perf_counter() - started_at
+            return result
+
+        future = self._get_pool().submit(task)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Drop the job if no worker has picked it up yet
+            if future.cancel():
+                with self._lock:
+                    self._queued -= 1
+            raise
+
+    def stats(self) -> Dict:
+        with self._lock:
+            # Wait and run times average over every job that ran, failed or not
+            finished = self._completed + self._failed
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": (self._total_wait / finished * 1000) if finished else 0.0,
+                "avg_run_ms": (self._total_run / finished * 1000) if finished else 0.0,
+            }
+
+    def shutdown(self):
+        """Stop accepting work and wait for running jobs"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+inference_executor = InferenceExecutor(
+    max_workers=settings.EMBEDDING_MAX_CONCURRENCY,
+    max_queue=settings.EMBEDDING_MAX_QUEUE
+)
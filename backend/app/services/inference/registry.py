@@ -0,0 +1,74 @@
+import logging
+import os
+import threading
+from typing import Dict, Tuple
+from sentence_transformers import SentenceTransformer
+from app.services.inference.backends import load_model
+
+logger = logging.getLogger(__name__)
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process (0 where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+class ModelRegistry:
+    """
+    Process-wide registry of loaded embedding models.
+    Every service asking for the same model name and backend gets the same
+    handle, so a worker holds one copy of each model no matter how many
+    services use it.
+    """
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, str], SentenceTransformer] = {}
+        self._load_rss: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str, backend: str = "torch") -> SentenceTransformer:
+        """Return the shared model, loading it on first use"""
+        key = (model_name, backend)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            model = self._models.get(key)
+            if model is None:
+                logger.info(f"Loading embedding model: {model_name} ({backend})")
+                rss_before = _rss_bytes()
+                model = load_model(model_name, backend)
+                self._load_rss[key] = max(_rss_bytes() - rss_before, 0)
+                self._models[key] = model
+            return model
+
+    def is_loaded(self, model_name: str, backend: str = "torch") -> bool:
+        return (model_name, backend) in self._models
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Resident bytes held by each loaded model.
+        Counts parameter and buffer tensors; backends that keep weights
+        outside PyTorch tensors (ONNX, packed int8) fall back to the RSS
+        growth measured while loading.
+        """
+        usage = {}
+        for (name, backend), model in self._models.items():
+            tensors = list(model.parameters()) + list(model.buffers())
+            tensor_bytes = sum(t.numel() * t.element_size() for t in tensors)
+            usage[f"{name}:{backend}"] = max(tensor_bytes, self._load_rss.get((name, backend), 0))
+        return usage
+
+    def stats(self) -> Dict:
+        usage = self.memory_usage()
+        return {
+            "loaded_models": list(usage.keys()),
+            "memory_bytes": usage,
+            "total_memory_bytes": sum(usage.values()),
+        }
+
+model_registry = ModelRegistry()
@@ -0,0 +1,52 @@
+import json
+import logging
+from typing import Any, Generic, Type, TypeVar
+import msgspec
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("msgspec", "orjson", "json")
+
+T = TypeVar("T")
+
+def resolve_backend(name: str) -> str:
+    """Validate a JSON_DECODER value, falling back to msgspec if orjson isn't installed"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON decoder {name!r}, expected one of {', '.join(BACKENDS)}")
+    if name == "orjson" and orjson is None:
+        logger.warning("orjson is not installed, decoding with msgspec")
+        return "msgspec"
+    return name
+
+def loads(raw: bytes, backend: str = settings.JSON_DECODER) -> Any:
+    """Decode JSON into plain Python objects with the configured backend"""
+    backend = resolve_backend(backend)
+    if backend == "msgspec":
+        return msgspec.json.decode(raw)
+    if backend == "orjson":
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+class ResponseDecoder(Generic[T]):
+    """
+    Decodes one API's response body into its typed response struct.
+    msgspec reads the bytes straight into the struct, skipping any field
+    the struct doesn't declare; the orjson and json backends build dicts
+    first and convert them, so every backend hands connectors the same types.
+    """
+
+    def __init__(self, response_type: Type[T], backend: str = settings.JSON_DECODER):
+        self.response_type = response_type
+        self.backend = resolve_backend(backend)
+        self._decoder = msgspec.json.Decoder(response_type) if self.backend == "msgspec" else None
+
+    def decode(self, raw: bytes) -> T:
+        if self._decoder is not None:
+            return self._decoder.decode(raw)
+        return msgspec.convert(loads(raw, self.backend), self.response_type)
@@ -0,0 +1,116 @@
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+_DOI_PREFIX = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)', re.IGNORECASE)
+_ARXIV_DOI = re.compile(r'^10\.48550/arxiv\.(.+)$', re.IGNORECASE)
+_ARXIV_URL = re.compile(r'arxiv\.org/(?:abs|pdf)/([^?#]+?)(?:v\d+)?(?:\.pdf)?$', re.IGNORECASE)
+_VERSION_SUFFIX = re.compile(r'v\d+$')
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+def normalize_doi(doi: Optional[str]) -> Optional[str]:
+    """Bare lowercase DOI ('10.1234/abc') from any of the forms sources return"""
+    if not doi:
+        return None
+    doi = _DOI_PREFIX.sub('', doi.strip()).lower()
+    return doi or None
+
+def extract_arxiv_id(doc: Dict) -> Optional[str]:
+    """Version-less arXiv id from an arXiv URL or an arXiv-issued DOI"""
+    match = _ARXIV_URL.search(doc.get('url') or '')
+    if match:
+        return _VERSION_SUFFIX.sub('', match.group(1).lower())
+
+    doi = normalize_doi(doc.get('doi'))
+    match = _ARXIV_DOI.match(doi or '')
+    if match:
+        return _VERSION_SUFFIX.sub('', match.group(1).lower())
+    return None
+
+def title_fingerprint(title: Optional[str]) -> Optional[str]:
+    """Accent-, case- and punctuation-insensitive title key"""
+    if not title:
+        return None
+    ascii_title = unicodedata.normalize('NFKD', title).encode('ascii', 'ignore').decode('ascii')
+    fingerprint = _NON_ALNUM.sub(' ', ascii_title.lower()).strip()
+    # Very short titles ("Introduction", "Editorial") are too generic to match on
+    return fingerprint if len(fingerprint) >= 20 else None
+
+def paper_key(doc: Dict) -> str:
+    """Stable identity of a paper across queries and sources"""
+    doi = normalize_doi(doc.get('doi'))
+    if doi:
+        return f"doi:{doi}"
+    arxiv_id = extract_arxiv_id(doc)
+    if arxiv_id:
+        return f"arxiv:{arxiv_id}"
+    return f"url:{doc.get('url') or doc.get('title')}"
+
+class PaperDeduplicator:
+    """
+    Collapses the same paper returned by several sources (e.g. an arXiv
+    preprint and its published DOI version) into one record.
+    Records are matched by normalized DOI, arXiv id or title fingerprint; the
+    first copy seen is kept and later copies only contribute metadata.
+    """
+
+    def __init__(self):
+        self._index: Dict[str, Dict] = {}
+        self.duplicates = 0
+
+    def _keys(self, doc: Dict) -> List[str]:
+        keys = []
+        doi = normalize_doi(doc.get('doi'))
+        if doi:
+            keys.append(f"doi:{doi}")
+        arxiv_id = extract_arxiv_id(doc)
+        if arxiv_id:
+            keys.append(f"arxiv:{arxiv_id}")
+        fingerprint = title_fingerprint(doc.get('title'))
+        if fingerprint:
+            keys.append(f"title:{fingerprint}")
+        return keys
+
+    def add(self, documents: List[Dict]) -> List[Dict]:
+        """
+        Register documents and return only those not seen before.
+        Duplicates are merged into the record that was kept.
+        """
+        unique = []
+        for doc in documents:
+            keys = self._keys(doc)
+            existing = next((self._index[key] for key in keys if key in self._index), None)
+
+            if existing is None:
+                unique.append(doc)
+                existing = doc
+            else:
+                self._merge(existing, doc)
+                self.duplicates += 1
+
+            # Index every key of the kept record, including ones only the duplicate had
+            for key in keys + self._keys(existing):
+                self._index.setdefault(key, existing)
+
+        return unique
+
+    def forget(self, documents: List[Dict]):
+        """Unregister kept records, so a later copy of one of them counts as new"""
+        dropped = {id(doc) for doc in documents}
+        self._index = {key: kept for key, kept in self._index.items() if id(kept) not in dropped}
+
+    @staticmethod
+    def _merge(kept: Dict, duplicate: Dict):
+        """Fill gaps in the kept record from its duplicate"""
+        if duplicate.get('citations') is not None:
+            kept['citations'] = max(kept.get('citations') or 0, duplicate['citations'])
+
+        categories = list(kept.get('categories') or [])
+        for category in duplicate.get('categories') or []:
+            if category and category not in categories:
+                categories.append(category)
+        kept['categories'] = categories
+
+        for field in ('doi', 'year', 'authors'):
+            if not kept.get(field) and duplicate.get(field):
+                kept[field] = duplicate[field]
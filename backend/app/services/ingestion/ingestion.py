@@ -1,6 +1,7 @@
 from pinecone import Pinecone
 from app.config import settings
 from app.services.embeddings import EmbeddingService
+from app.services.ingestion.write_behind import paper_metadata
 import logging
 from tenacity import retry, stop_after_attempt, wait_exponential
 from typing import List, Dict
@@ -26,14 +27,10 @@ class IngestionService:
         try:
             # Create embedding from title + abstract
             text_to_embed = f"{paper['title']} {paper['abstract']}"
-            vector = self.embedding_service.get_embedding(text_to_embed)
+            vector = await self.embedding_service.get_embedding_async(text_to_embed)
             
-            # Metadata to store
-            metadata = {
-                "title": paper["title"],
-                "abstract": paper["abstract"][:1400],  # Limit abstract length
-                "url": paper["url"]
-            }
+            # Metadata to store, including the fields search filters on
+            metadata = paper_metadata(paper)
             
             self.index.upsert(
                 vectors=[{
@@ -62,20 +59,24 @@ class IngestionService:
                 batch = papers[i:i + self.batch_size]
                 vectors = []
                 
+                # Embed the whole batch off the event loop
+                try:
+                    batch_vectors = await self.embedding_service.get_embeddings_async(
+                        [f"{paper['title']} {paper['abstract']}" for paper in batch]
+                    )
+                except Exception as e:
+                    logger.error(f"Error embedding batch {i//self.batch_size + 1}: {str(e)}")
+                    failed_papers.extend([paper["id"] for paper in batch])
+                    pbar.update(1)
+                    continue
+
                 # Prepare batch
-                for paper in batch:
+                for paper, vector in zip(batch, batch_vectors):
                     try:
-                        text_to_embed = f"{paper['title']} {paper['abstract']}"
-                        vector = self.embedding_service.get_embedding(text_to_embed)
-                        
                         vectors.append({
                             "id": paper["id"],
-                            "values": vector,
-                            "metadata": {
-                                "title": paper["title"],
-                                "abstract": paper["abstract"][:1400],
-                                "url": paper["url"]
-                            }
+                            "values": vector.tolist(),
+                            "metadata": paper_metadata(paper)
                         })
                     except Exception as e:
                         logger.error(f"Error preparing paper {paper['id']}: {str(e)}")
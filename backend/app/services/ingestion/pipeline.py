@@ -1,73 +1,229 @@
-from typing import List, Dict, AsyncGenerator
+from typing import List, Dict, AsyncGenerator, Optional, Set, Tuple
 import asyncio
+import time
+from collections import Counter
+from contextlib import aclosing
 from datetime import datetime
+import numpy as np
 from pinecone import Pinecone
 from app.services.embeddings import EmbeddingService
+from app.services.http.health import request_deadline
+from app.services.ranking.bm25 import BM25Index, reciprocal_rank_fusion
+from app.services.ranking.engine import RankingEngine, normalize_rows, top_k_indices
 from app.services.search.search import SearchService
+from app.services.search.local_index import local_paper_index
+from app.services.ingestion.dedup import PaperDeduplicator
+from app.services.ingestion.write_behind import PineconeVectorStore, WriteBehindQueue
 from app.services.ingestion.sources.base import BaseSourceConnector
+from app.orchestration.budget import LatencyBudget
 from app.config import settings
 from app.services.ingestion.sources.arxiv import ArxivConnector
 from app.services.ingestion.sources.open_alex import OpenAlexConnector
+from app.services.ingestion.sources.pubmed import PubMedConnector
+from app.services.ingestion.sources.semantic_scholar import SemanticScholarConnector
 from app.schemas.paper import Paper
+from app.schemas.search import SearchFilters
 
 class SearchPipeline:
-    sources = {
-        'arxiv': ArxivConnector(),          # ~100 results
-        #'pubmed': PubMedConnector(),        # ~100 results  # temporarily disabled (poor results)
-        #'crossref': CrossrefConnector(),    # ~100 results  # temporarily disabled (inconsistent results/lacking information)
-        'open_alex': OpenAlexConnector(),  # ~100 results
-        
-        # TODO: Future Sources
-        # ... existing comments ...
-    }
-    
     def __init__(self):
+        # Connectors are per instance; their HTTP client comes from the shared pool
+        self.sources = {
+            'arxiv': ArxivConnector(),          # ~100 results
+            'pubmed': PubMedConnector(),        # ~100 results
+            #'crossref': CrossrefConnector(),    # ~100 results  # temporarily disabled (inconsistent results/lacking information)
+            'open_alex': OpenAlexConnector(),  # ~100 results
+            'semantic_scholar': SemanticScholarConnector(),  # ~50 results, one request
+            
+            # TODO: Future Sources
+            # ... existing comments ...
+        }
         self.embedding_service = EmbeddingService()
         self.pinecone_client = Pinecone(api_key=settings.PINECONE_API_KEY)
-        self.index = self.pinecone_client.Index(settings.PINECONE_INDEX)
+        self.index = self.pinecone_client.Index(settings.PINECONE_INDEX, pool_threads=settings.PINECONE_POOL_THREADS)
+        self.vector_search = SearchService(
+            index=self.index,
+            embedding_service=self.embedding_service
+        ) if settings.PINECONE_FIRST_ENABLED else None
+        self.local_index = local_paper_index if settings.LOCAL_INDEX_ENABLED else None
+        self.write_behind = WriteBehindQueue(
+            PineconeVectorStore(self.index),
+            batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+            max_pending=settings.WRITE_BEHIND_MAX_PENDING,
+            flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL_SECONDS
+        ) if settings.WRITE_BEHIND_ENABLED else None
+        self.deadline_misses: Counter = Counter()  # Per source, fetching or ranking
+        self._indexing: Set[asyncio.Task] = set()  # Local index writes still running
         
     async def search(self, query: str, top_k: int = 3) -> List[Dict]:
         """
         Real-time search across all sources
         Expected total: ~200-300 results to process
+        Each source's results are embedded and scored as soon as they arrive,
+        so embedding overlaps with the slower sources' network time.
+        Queries that the local index of previously ranked papers, or
+        Pinecone's store of ingested ones, can already answer well never
+        wait on the live sources.
         """
+        ranked_results, _ = await self._search(query, top_k)
+        return ranked_results
+
+    async def search_within_budget(
+        self,
+        query: str,
+        budget: LatencyBudget,
+        top_k: int = 3
+    ) -> Tuple[List[Dict], List[str]]:
+        """
+        Like search, but sources still fetching at SEARCH_BUDGET_SOURCES_SHARE
+        of the budget and embedding still running at SEARCH_BUDGET_RANKING_SHARE
+        are cancelled. Returns the ranked results from whatever made it in
+        time and the names of the sources that didn't.
+        """
+        return await self._search(
+            query,
+            top_k,
+            sources_deadline=budget.deadline(settings.SEARCH_BUDGET_SOURCES_SHARE),
+            ranking_deadline=budget.deadline(settings.SEARCH_BUDGET_RANKING_SHARE)
+        )
+
+    async def _search(
+        self,
+        query: str,
+        top_k: int,
+        sources_deadline: Optional[float] = None,
+        ranking_deadline: Optional[float] = None
+    ) -> Tuple[List[Dict], List[str]]:
         start_time = datetime.now()
         
-        # Fetch ~100 results from each source concurrently
-        all_results = await self._fetch_from_all_sources(query)
-        print(f"Fetched {len(all_results)} total results in {datetime.now() - start_time}")
-        
-        # Generate query embedding once
-        query_embedding = self.embedding_service.get_embedding(query)
-        
-        # Process in batches of 50 for memory efficiency
-        batch_size = 50
-        ranked_results = []
+        # Embed the query while the sources are being fetched
+        query_task = asyncio.create_task(
+            self.embedding_service.get_query_embedding_async(query)
+        )
+        # The fan-out starts now rather than after the index lookups, and is
+        # cancelled if either index can answer on its own
+        fetches = self._start_fetches(query, sources_deadline)
+        if self.local_index is not None or self.vector_search is not None:
+            try:
+                query_embedding = await self._embed_query(query_task, ranking_deadline)
+                if query_embedding is not None:
+                    indexed_results = await self._search_indexed(query_embedding, top_k)
+            except BaseException:
+                await self._cancel(fetches)
+                raise
+            if query_embedding is None:
+                await self._cancel(fetches)
+                return self._missed_query_embedding()
+            if indexed_results is not None:
+                await self._cancel(fetches)
+                print(f"Served {len(indexed_results)} indexed results in {datetime.now() - start_time}")
+                return indexed_results, []
+
+        engine = None
+        rank_tasks: Dict[asyncio.Task, str] = {}
+        missing: List[str] = []
+        total_results = 0
+        deduplicator = PaperDeduplicator()
+        hybrid = settings.RANKING_MODE == "hybrid"
+        lexical = BM25Index()
         
-        for i in range(0, len(all_results), batch_size):
-            batch = all_results[i:i + batch_size]
-            batch_ranked = await self._rank_results(query_embedding, batch)
-            ranked_results.extend(batch_ranked)
+        try:
+            async with aclosing(self._stream_from_all_sources(query, sources_deadline, missing, fetches)) as arrivals:
+                async for source_name, documents in arrivals:
+                    total_results += len(documents)
+                    # Drop papers another source already returned before paying to embed them
+                    documents = deduplicator.add(documents)
+                    if not documents:
+                        continue
+                    if hybrid:
+                        # Only the lexically strongest candidates go on to dense embedding
+                        candidates = self._lexical_prune(lexical, query, documents)
+                        # A pruned paper can still be ranked if a later source returns it
+                        survivors = {id(doc) for doc in candidates}
+                        deduplicator.forget([doc for doc in documents if id(doc) not in survivors])
+                        documents = candidates
+                    print(f"Ranking {len(documents)} results from {source_name} at {datetime.now() - start_time}")
+                    if engine is None:
+                        query_embedding = await self._embed_query(query_task, ranking_deadline)
+                        if query_embedding is None:
+                            return self._missed_query_embedding()
+                        engine = RankingEngine(query_embedding, keep=top_k)
+                    rank_tasks[asyncio.create_task(self._rank_results(engine, documents))] = source_name
             
-            # Sort and keep top results so far
-            ranked_results.sort(key=lambda x: x['score'], reverse=True)
-            ranked_results = ranked_results[:top_k]
+            if rank_tasks:
+                done, late = await asyncio.wait(rank_tasks, timeout=self._until(ranking_deadline))
+                for task in done:
+                    task.result()
+                if late:
+                    # Their documents never reached the engine, so rank without them
+                    self._missed_deadline([rank_tasks[task] for task in late], missing, "ranking")
+        finally:
+            # The stream cancels its own fetches, but only once it has been iterated
+            await self._cancel([query_task, *fetches, *rank_tasks])
+        
+        print(f"Fetched {total_results} total results, {deduplicator.duplicates} duplicates merged")
+        if engine is not None:
+            self._index_candidates(engine)
+            if self.write_behind is not None:
+                # Upserted to Pinecone in the background, off the request path
+                self.write_behind.enqueue(engine.documents, engine.matrix)
+        if engine is None:
+            ranked_results = []
+        elif hybrid and self._until(ranking_deadline) != 0.0:
+            # Fuse dense and lexical ranks; 'score' stays the cosine similarity
+            fused = reciprocal_rank_fusion(
+                engine.scores,
+                lexical.score(query, engine.documents),
+                k=settings.RANKING_RRF_K
+            )
+            ranked_results = engine.top_k(top_k, order_by=fused)
+        else:
+            # Dense mode, or the ranking deadline has passed: cosine similarity alone
+            ranked_results = engine.top_k(top_k)
         
         print(f"Total search time: {datetime.now() - start_time}")
-        return ranked_results
+        return ranked_results, missing
+
+    @staticmethod
+    def _until(deadline: Optional[float]) -> Optional[float]:
+        """Seconds left before a time.monotonic() deadline, or None for no deadline"""
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+    async def _embed_query(self, query_task: asyncio.Task, deadline: Optional[float]) -> Optional[List[float]]:
+        """The query embedding, or None if it isn't ready by the ranking deadline"""
+        try:
+            async with asyncio.timeout(self._until(deadline)):
+                return await query_task
+        except TimeoutError:
+            return None
+
+    def _missed_query_embedding(self) -> Tuple[List[Dict], List[str]]:
+        """Nothing can be ranked without the query embedding, so every source counts as missing"""
+        missing: List[str] = []
+        self._missed_deadline(list(self.sources), missing, "embedding the query")
+        return [], missing
+
+    def _missed_deadline(self, source_names: List[str], missing: List[str], stage: str):
+        print(f"Deadline passed while {stage}: {', '.join(source_names)}")
+        for source_name in source_names:
+            self.deadline_misses[source_name] += 1
+            if source_name not in missing:
+                missing.append(source_name)
 
     async def _fetch_from_source(
         self, 
         source_name: str, 
         connector: BaseSourceConnector, 
         query: str,
-        max_results: int = 50
+        max_results: int = 50,
+        deadline: Optional[float] = None
     ) -> List[Dict]:
         """
-        Fetch up to max_results from a single source
+        Fetch up to max_results from a single source. Its requests time out
+        by the deadline, so a hung upstream is charged before it's cancelled.
         """
         try:
-            papers: List[Paper] = await connector.fetch_papers(query, max_results=max_results)
+            with request_deadline(deadline):
+                papers: List[Paper] = await connector.fetch_papers(query, max_results=max_results)
             print(f"Fetched {len(papers)} papers from {source_name}")
             
             # Convert Paper objects to dict with only needed fields
@@ -78,86 +234,206 @@ class SearchPipeline:
                 'source': source_name,
                 'categories': paper.metadata.categories,
                 'authors': paper.metadata.authors,
-                'year': paper.metadata.year
+                'year': paper.metadata.year,
+                'doi': paper.metadata.doi,
+                'citations': paper.metadata.citations
             } for paper in papers]
             
         except Exception as e:
             print(f"Error fetching from {source_name}: {str(e)}")
             return []
 
-    async def _fetch_from_all_sources(self, query: str) -> List[Dict]:
-        """
-        Fetch results from all sources concurrently
-        """
-        tasks = []
+    def _start_fetches(self, query: str, deadline: Optional[float] = None) -> Dict[asyncio.Task, str]:
+        """Start fetching from every source at once; maps each task to its source"""
+        tasks = {}
         for source_name, connector in self.sources.items():
             # Adjust max_results based on source
             max_results = 50
-            task = self._fetch_from_source(
+            task = asyncio.create_task(self._fetch_from_source(
                 source_name=source_name, 
                 connector=connector, 
                 query=query, 
-                max_results=max_results
-            )
-            tasks.append(task)
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+                max_results=max_results,
+                deadline=deadline
+            ))
+            tasks[task] = source_name
+        return tasks
+
+    @staticmethod
+    async def _cancel(tasks):
+        """Cancel unfinished tasks and wait for them to unwind"""
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _stream_from_all_sources(
+        self,
+        query: str,
+        deadline: Optional[float] = None,
+        missing: Optional[List[str]] = None,
+        tasks: Optional[Dict[asyncio.Task, str]] = None
+    ) -> AsyncGenerator[Tuple[str, List[Dict]], None]:
+        """
+        Fetch results from all sources concurrently, yielding each source's
+        results as soon as that source finishes. Sources still running at
+        the deadline are cancelled and added to missing. Fetches already
+        started with _start_fetches can be passed in as tasks.
+        """
+        if tasks is None:
+            tasks = self._start_fetches(query, deadline)
         
-        # Combine results, excluding any errors
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=self._until(deadline)):
+                try:
+                    documents = await next_done
+                except TimeoutError:
+                    # as_completed timed out; _fetch_from_source handles each source's own errors
+                    late = [source_name for task, source_name in tasks.items() if not task.done()]
+                    self._missed_deadline(late, [] if missing is None else missing, "fetching")
+                    return
+                except Exception as e:
+                    print(f"Error fetching source: {str(e)}")
+                    continue
+                if documents:
+                    yield documents[0]['source'], documents
+        finally:
+            # Don't leave fetches running if the consumer stops early or the deadline passed,
+            # and let them unwind so their connections go back to the pool
+            await self._cancel(tasks)
+
+    async def _fetch_from_all_sources(self, query: str) -> List[Dict]:
+        """
+        Fetch results from all sources concurrently
+        """
         all_documents: List[Dict] = []
-        for result in results:
-            if isinstance(result, list):
-                all_documents.extend(result)
-        
+        async for _, documents in self._stream_from_all_sources(query):
+            all_documents.extend(documents)
         return all_documents
 
+    async def _search_indexed(self, query_embedding: List[float], top_k: int) -> Optional[List[Dict]]:
+        """Top-k from the local index, else from Pinecone, or None if neither matches well"""
+        if self.local_index is not None:
+            results = await self._search_local(query_embedding, top_k)
+            if results is not None:
+                return results
+        if self.vector_search is not None:
+            return await self._search_pinecone(query_embedding, top_k)
+        return None
+
+    async def _search_pinecone(self, query_embedding: List[float], top_k: int) -> Optional[List[Dict]]:
+        """
+        Top-k previously ingested papers from the enabled sources, or None
+        if any scores below PINECONE_FIRST_MIN_SCORE or Pinecone is slow
+        """
+        try:
+            papers = await asyncio.wait_for(
+                self.vector_search.search_vector(query_embedding, top_k, SearchFilters(sources=list(self.sources))),
+                timeout=settings.PINECONE_FIRST_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            print(f"Error searching Pinecone: {str(e) or type(e).__name__}")
+            return None
+
+        if len(papers) < top_k or any(paper.confidence < settings.PINECONE_FIRST_MIN_SCORE for paper in papers):
+            return None
+        return [{
+            'title': paper.title,
+            'abstract': paper.summary,
+            'url': paper.url,
+            'score': paper.confidence,
+            'source': paper.source,
+            'categories': paper.categories,
+            'authors': paper.authors,
+            'year': paper.year
+        } for paper in papers]
+
+    async def _search_local(self, query_embedding: List[float], top_k: int) -> Optional[List[Dict]]:
+        """
+        Top-k from the local index, or None if its best matches are too
+        weak or too old to skip the live sources
+        """
+        try:
+            return await asyncio.to_thread(
+                self.local_index.lookup,
+                query_embedding,
+                top_k,
+                settings.LOCAL_INDEX_MIN_SCORE,
+                settings.LOCAL_INDEX_MAX_AGE_SECONDS
+            )
+        except Exception as e:
+            print(f"Error searching local index: {str(e)}")
+            return None
+
+    def _index_candidates(self, engine: RankingEngine):
+        """
+        Write every ranked candidate into the local index for later queries,
+        in the background so the response doesn't wait on the disk write
+        """
+        if self.local_index is None:
+            return
+        task = asyncio.create_task(self._add_to_local_index(engine.documents, engine.matrix))
+        self._indexing.add(task)
+        task.add_done_callback(self._indexing.discard)
+
+    async def _add_to_local_index(self, documents: List[Dict], matrix: np.ndarray):
+        try:
+            await asyncio.to_thread(self.local_index.add, documents, matrix)
+        except Exception as e:
+            print(f"Error updating local index: {str(e)}")
+
+    async def wait_for_indexing(self):
+        """Wait for local index writes started by earlier searches"""
+        if self._indexing:
+            await asyncio.gather(*self._indexing)
+
+    def _lexical_prune(self, lexical: BM25Index, query: str, documents: List[Dict]) -> List[Dict]:
+        """
+        Index documents for BM25 and keep the top RANKING_DENSE_CANDIDATES
+        of them for dense ranking (0 keeps everything)
+        """
+        lexical.add(documents)
+        limit = settings.RANKING_DENSE_CANDIDATES
+        if not limit or len(documents) <= limit:
+            return documents
+
+        keep = top_k_indices(lexical.score(query, documents), limit)
+        return [documents[i] for i in sorted(keep)]
+
     async def _rank_results(
         self,
-        query_embedding: List[float],
+        engine: RankingEngine,
         documents: List[Dict]
     ) -> List[Dict]:
         """
-        Rank a batch of results based on relevance to query
+        Embed a set of results and add them to the ranking engine
         """
-        scored_docs = []
-        
-        # Process embeddings in parallel for the batch
-        embedding_tasks = []
-        for doc in documents:
-            doc_text = f"{doc['title']} {doc['abstract'][:1000]}"
-            task = asyncio.create_task(
-                self._get_embedding_async(doc_text)
-            )
-            embedding_tasks.append((doc, task))
-        
-        # Wait for all embeddings
-        for doc, task in embedding_tasks:
-            try:
-                doc_embedding = await task
-                similarity = self._calculate_similarity(
-                    query_embedding, 
-                    doc_embedding
-                )
-                
-                doc['score'] = similarity
-                scored_docs.append(doc)
-            except Exception as e:
-                print(f"Error processing document: {str(e)}")
-                continue
-        
-        return scored_docs
+        if not documents:
+            return []
+
+        # Embed in batched forward passes, skipping papers already in the cache
+        doc_texts = [f"{doc['title']} {(doc['abstract'] or '')[:1000]}" for doc in documents]
+        try:
+            doc_embeddings = await self.embedding_service.get_cached_embeddings_async(doc_texts)
+        except Exception as e:
+            print(f"Error embedding batch: {str(e)}")
+            return []
+
+        engine.add(documents, doc_embeddings)
+        return documents
 
     async def _get_embedding_async(self, text: str) -> List[float]:
         """
-        Wrapper to make embedding generation async
+        Generate an embedding on the inference executor
         """
-        return self.embedding_service.get_embedding(text)
+        return await self.embedding_service.get_embedding_async(text)
 
     def _calculate_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """
         Calculate cosine similarity between two embeddings
         """
-        return sum(a * b for a, b in zip(embedding1, embedding2)) / (sum(a**2 for a in embedding1) * sum(b**2 for b in embedding2))
+        vectors = normalize_rows(np.array([embedding1, embedding2]))
+        return float(vectors[0] @ vectors[1])
 
     def _chunk_content(self, content: str, chunk_size: int = 1000):
         """
@@ -166,6 +442,10 @@ class SearchPipeline:
         # Simple chunking for now - could be improved with semantic splitting
         return [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
 
-    async def upsert_to_pinecone(self, processed_docs: List[Dict]):
-        if processed_docs:
-            self.index.upsert(vectors=processed_docs) 
\ No newline at end of file
+    async def close(self):
+        """
+        Flush papers still waiting to be written to the vector store
+        """
+        await self.wait_for_indexing()
+        if self.write_behind is not None:
+            await self.write_behind.close()
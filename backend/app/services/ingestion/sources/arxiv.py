@@ -1,69 +1,147 @@
-from typing import List, Dict
-import arxiv
+from typing import AsyncGenerator, List, Optional, Tuple
 from datetime import datetime
-from app.services.ingestion.sources.base import BaseSourceConnector
+import xml.etree.ElementTree as ET
+from app.services.ingestion.sources.base import BaseSourceConnector, SEARCH
+from app.services.http.health import request_deadline
+from app.services.http.pool import http_pool
 from app.config import settings
 import asyncio
+import time
 from app.schemas.paper import Paper, PaperMetadata
 
+ATOM = "{http://www.w3.org/2005/Atom}"
+ARXIV = "{http://arxiv.org/schemas/atom}"
+OPENSEARCH = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+class AtomFeedParser:
+    """
+    Incremental parser for arXiv's Atom feed.
+    Bytes are fed in as they arrive; each completed <entry> becomes a Paper
+    and is freed right away, so memory stays flat for large pages.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("end",))
+        self.total_results: Optional[int] = None
+
+    def feed(self, chunk: bytes) -> List[Paper]:
+        self._parser.feed(chunk)
+        papers = []
+        for _, elem in self._parser.read_events():
+            if elem.tag == f"{ATOM}entry":
+                paper = self._to_paper(elem)
+                if paper is not None:
+                    papers.append(paper)
+                elem.clear()
+            elif elem.tag == f"{OPENSEARCH}totalResults" and elem.text:
+                self.total_results = int(elem.text)
+        return papers
+
+    @staticmethod
+    def _clean_text(text: Optional[str]) -> str:
+        return " ".join((text or "").split())
+
+    def _to_paper(self, entry: ET.Element) -> Optional[Paper]:
+        entry_id = entry.findtext(f"{ATOM}id", "")
+        # Query errors come back as a single entry pointing at the API docs
+        if not entry_id or "/api/errors" in entry_id:
+            print(f"ArxivConnector: API error: {entry.findtext(f'{ATOM}summary', '')}")
+            return None
+
+        published = datetime.fromisoformat(entry.findtext(f"{ATOM}published").replace("Z", "+00:00"))
+        return Paper(
+            title=self._clean_text(entry.findtext(f"{ATOM}title")),
+            url=entry_id,
+            metadata=PaperMetadata(
+                authors=[author.findtext(f"{ATOM}name", "") for author in entry.findall(f"{ATOM}author")],
+                year=published.year,
+                published_date=published,
+                abstract=(entry.findtext(f"{ATOM}summary") or "").strip(),
+                categories=[category.get("term") for category in entry.findall(f"{ATOM}category") if category.get("term")],
+                doi=entry.findtext(f"{ARXIV}doi")
+            )
+        )
+
 class ArxivConnector(BaseSourceConnector):
     def __init__(self):
         super().__init__()
-        self.rate_limit = settings.ARXIV_RATE_LIMIT  # 3 seconds
-        self.base_url = "http://export.arxiv.org/api/query"
-        
-    async def fetch_papers(self, query: str, max_results: int = 2000) -> List[Paper]:
+        self.base_url = "https://export.arxiv.org/api/query"
+
+    async def fetch_papers(self, query: str, max_results: int = 2000, mode: str = SEARCH) -> List[Paper]:
+        # The Atom feed has no field selection, so both modes fetch the same entries
         print(f"ArxivConnector: Fetching papers for query: {query}")
+        if not query:
+            return []
+
+        # A search only needs the top few; use fetch_pages for bulk pulls
+        papers, _ = await self._fetch_page(query, start=0, page_size=min(max_results, settings.ARXIV_SEARCH_MAX_RESULTS))
+        print(f"ArxivConnector: Successfully processed {len(papers)} papers")
+        return papers
+
+    async def fetch_pages(
+        self,
+        query: str,
+        max_results: int,
+        page_size: int = settings.ARXIV_PAGE_SIZE
+    ) -> AsyncGenerator[List[Paper], None]:
+        """
+        Page through up to max_results papers for ingestion, yielding each
+        page as it is parsed. Pages are rate limited like any other request.
+        """
+        start = 0
+        empty_pages = 0
+        while start < max_results:
+            page, total_results = await self._fetch_page(query, start, min(page_size, max_results - start))
+            if total_results is not None:
+                max_results = min(max_results, total_results)
+            if not page:
+                # arXiv occasionally returns an empty page mid-result set; retry a couple of times
+                empty_pages += 1
+                if empty_pages >= 3:
+                    return
+                continue
+
+            empty_pages = 0
+            start += len(page)
+            yield page
+
+    async def _fetch_page(self, query: str, start: int, page_size: int) -> Tuple[List[Paper], Optional[int]]:
+        """
+        Stream one page of results and the total result count, returning
+        what was parsed if arXiv's adaptive timeout passes first
+        """
+        params = {
+            'search_query': query,
+            'start': start,
+            'max_results': page_size,
+            'sortBy': 'relevance',
+            'sortOrder': 'descending'
+        }
+        parser = AtomFeedParser()
+        papers: List[Paper] = []
+
         try:
-            if not query:
-                return []
-            
-            # Rate limit the initial fetch only
+            # Only waits if arXiv was queried within the last ARXIV_RATE_LIMIT seconds
             await self.rate_limit_wait()
-            
-            search = arxiv.Search(
-                query=query,
-                max_results=min(max_results, 12),
-                sort_by=arxiv.SortCriterion.Relevance,
-                sort_order=arxiv.SortOrder.Descending
-            )
-            
-            try:
-                async with asyncio.timeout(3):
-                    papers = list(search.results())
-                    print(f"ArxivConnector: Got {len(papers)} results")
-                    
-                    results = [
-                        Paper(
-                            title=paper.title,
-                            url=paper.entry_id,
-                            metadata=PaperMetadata(
-                                authors=[author.name for author in paper.authors],
-                                year=paper.published.year,
-                                published_date=paper.published,
-                                abstract=paper.summary,
-                                categories=paper.categories
-                            )
-                        )
-                        for paper in papers
-                    ]
-                    
-                    print(f"ArxivConnector: Successfully processed {len(results)} papers")
-                    return results
-                
-            except asyncio.TimeoutError:
-                print(f"ArxivConnector: Timeout while fetching results")
-                return []
-            except Exception as e:
-                print(f"ArxivConnector: Error processing results: {str(e)}")
-                return []
-            
-        except Exception as e:
-            print(f"ArxivConnector: Top-level error: {str(e)}")
-            return []
+            # The deadline starts once the request can go out. Passing it to the
+            # transport as well means a page cut off here counts against arXiv.
+            deadline = time.monotonic() + self.request_timeout()
+            with request_deadline(deadline):
+                async with asyncio.timeout_at(deadline):
+                    async with http_pool.client().stream('GET', self.base_url, params=params) as response:
+                        if response.status_code != 200:
+                            print(f"ArxivConnector: Unexpected status code: {response.status_code}")
+                            return [], None
+                        body_bytes = 0
+                        async for chunk in response.aiter_bytes():
+                            body_bytes += len(chunk)
+                            papers.extend(parser.feed(chunk))
+                        self.record_transfer(response.num_bytes_downloaded, body_bytes)
 
-    def _clean_text(self, text: str) -> str:
-        """Clean and format text content"""
-        if not text:
-            return ""
-        return " ".join(text.split())
\ No newline at end of file
+        except asyncio.TimeoutError:
+            print(f"ArxivConnector: Timeout after {len(papers)} results")
+        except ET.ParseError as e:
+            print(f"ArxivConnector: Error parsing feed: {str(e)}")
+        except Exception as e:
+            print(f"ArxivConnector: Error fetching results: {str(e)}")
+        return papers, parser.total_results
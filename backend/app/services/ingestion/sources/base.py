@@ -1,23 +1,48 @@
 from abc import ABC, abstractmethod
-from typing import List
-import asyncio
-import aiohttp
+from typing import Dict, List
+from urllib.parse import urlparse
 from app.schemas.paper import Paper
+from app.services.http.health import upstream_health
+from app.services.http.rate_limit import rate_limiter
+
+# Field profiles. Live search asks each API only for what ranking and
+# display use; ingestion asks for the richer record worth storing.
+SEARCH = "search"
+INGEST = "ingest"
 
 class BaseSourceConnector(ABC):
     def __init__(self):
-        self.session = None
-        self.rate_limit = 1.0  # Default 1 second between requests
-    
-    async def get_session(self):
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
-        return self.session
+        self.base_url = ""  # Its host keys the shared rate limiter
+
+        # Transfer metrics
+        self.responses = 0
+        self.wire_bytes = 0  # As received, before gzip/br decoding
+        self.body_bytes = 0  # After decoding
     
     @abstractmethod
-    async def fetch_papers(self, query: str, max_results: int = 100) -> List[Paper]:
+    async def fetch_papers(self, query: str, max_results: int = 100, mode: str = SEARCH) -> List[Paper]:
         """Fetch papers from the source"""
         pass
     
     async def rate_limit_wait(self):
-        await asyncio.sleep(self.rate_limit)
\ No newline at end of file
+        """Wait only if this upstream's shared request budget is used up"""
+        await rate_limiter.acquire(urlparse(self.base_url).hostname)
+
+    def request_timeout(self) -> float:
+        """This upstream's current timeout, following its observed p95 latency"""
+        return upstream_health.timeout(urlparse(self.base_url).hostname)
+
+    def record_transfer(self, wire_bytes: int, body_bytes: int):
+        """Count and log one response's size on the wire and after decoding"""
+        self.responses += 1
+        self.wire_bytes += wire_bytes
+        self.body_bytes += body_bytes
+        print(f"{type(self).__name__}: {wire_bytes} bytes on the wire, {body_bytes} decoded")
+
+    def transfer_stats(self) -> Dict:
+        return {
+            "responses": self.responses,
+            "wire_bytes": self.wire_bytes,
+            "body_bytes": self.body_bytes,
+            "compression_ratio": round(self.body_bytes / self.wire_bytes, 2) if self.wire_bytes else None,
+        }
@@ -1,99 +1,125 @@
-from typing import List, Dict
-import aiohttp
-import re
-from app.services.ingestion.sources.base import BaseSourceConnector
+from typing import Any, List, Dict, Optional
+import msgspec
+from app.services.ingestion.sources.base import BaseSourceConnector, INGEST, SEARCH
+from app.services.http.pool import http_pool
 from app.config import settings
-import json
+from app.utils.text import strip_markup
+from app.services.ingestion.decoding import ResponseDecoder
+
+class CrossrefAuthor(msgspec.Struct):
+    given: str = ''
+    family: str = ''
+    affiliation: List[Dict[str, Any]] = []
+
+class CrossrefDate(msgspec.Struct):
+    date_parts: List[List[Optional[int]]] = msgspec.field(default=[], name='date-parts')
+
+class CrossrefWork(msgspec.Struct):
+    DOI: str = ''
+    title: List[str] = []
+    abstract: str = ''
+    author: List[CrossrefAuthor] = []
+    published_print: Optional[CrossrefDate] = msgspec.field(default=None, name='published-print')
+    type: Optional[str] = None
+    reference: List[Dict[str, Any]] = []
+    is_referenced_by_count: int = msgspec.field(default=0, name='is-referenced-by-count')
+
+class CrossrefMessage(msgspec.Struct):
+    items: List[CrossrefWork] = []
+
+class CrossrefResponse(msgspec.Struct):
+    message: CrossrefMessage = msgspec.field(default_factory=CrossrefMessage)
+
+# Reference lists are often the bulk of a Crossref record; only ingestion keeps them
+FIELDS = {
+    SEARCH: 'DOI,title,abstract,author,published-print,type,is-referenced-by-count',
+    INGEST: 'DOI,title,abstract,author,published-print,type,reference,is-referenced-by-count',
+}
 
 class CrossrefConnector(BaseSourceConnector):
     def __init__(self):
         super().__init__()
         self.base_url = "https://api.crossref.org/works"
         self.email = settings.CROSSREF_EMAIL
+        self.decoder = ResponseDecoder(CrossrefResponse)
         
     def clean_abstract(self, abstract: str) -> str:
         """Clean abstract text by removing XML tags and normalizing whitespace"""
-        if not abstract:
-            return ""
+        return strip_markup(abstract)
             
-        # Simple regex to remove XML/JATS tags
-        text = re.sub(r'<[^>]+>', '', abstract)
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
-            
-    async def fetch_papers(self, query: str, max_results: int = 100) -> List[Dict]:
+    async def fetch_papers(self, query: str, max_results: int = 100, mode: str = SEARCH) -> List[Dict]:
         """Fetch papers from Crossref based on query"""
         if not query.strip():
             return []
             
         try:
-            session = await self.get_session()
             params = {
                 'query': query,
                 'rows': min(max_results * 2, 100),  # Fetch more since we'll filter some out
                 'mailto': self.email,
-                'select': 'DOI,title,abstract,author,published-print,type,reference,is-referenced-by-count'
+                'select': FIELDS[mode]
             }
             
             print(f"\nQuerying Crossref API:")
             print(f"URL: {self.base_url}")
-            print(f"Params: {json.dumps(params, indent=2)}")
+            print(f"Params: {params}")
             
-            async with session.get(self.base_url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    #print(f"Data: {json.dumps(data, indent=2)}")
-                    results = []
-                    
-                    for work in data['message'].get('items', []):
-                        try:
-                            # Skip if no abstract
-                            raw_abstract = work.get('abstract', '')
-                            if not raw_abstract:
-                                continue
-                                
-                            title = work.get('title', [''])[0]
-                            doi = work.get('DOI', '')
-                            cleaned_abstract = self.clean_abstract(raw_abstract)
-                            
-                            # Double check we still have an abstract after cleaning
-                            if not cleaned_abstract:
-                                continue
-                                
-                            processed_paper = {
-                                'id': f"crossref_{doi}",
-                                'title': title,
-                                'content': cleaned_abstract,
-                                'url': f"https://doi.org/{doi}",
-                                'source': 'crossref',
-                                'metadata': {
-                                    'authors': [
-                                        {
-                                            'name': f"{author.get('given', '')} {author.get('family', '')}".strip(),
-                                            'affiliations': author.get('affiliation', [])
-                                        }
-                                        for author in work.get('author', [])
-                                    ],
-                                    'year': work.get('published-print', {}).get('date-parts', [['']])[0][0],
-                                    'type': work.get('type'),
-                                    'citations': work.get('is-referenced-by-count', 0),
-                                    'abstract': cleaned_abstract,
-                                    'doi': doi,
-                                    'references': work.get('reference', [])
-                                }
-                            }
-                            results.append(processed_paper)
+            await self.rate_limit_wait()
+            response = await http_pool.client().get(self.base_url, params=params)
+            self.record_transfer(response.num_bytes_downloaded, len(response.content))
+            if response.status_code == 200:
+                data = self.decoder.decode(response.content)
+                results = []
+                
+                for work in data.message.items:
+                    try:
+                        # Skip if no abstract
+                        if not work.abstract:
+                            continue
                             
-                        except Exception as e:
-                            print(f"Error processing work: {e}")
+                        title = work.title[0] if work.title else ''
+                        doi = work.DOI
+                        cleaned_abstract = self.clean_abstract(work.abstract)
+                        
+                        # Double check we still have an abstract after cleaning
+                        if not cleaned_abstract:
                             continue
-                    
-                    return results[:max_results]
-                    
-                else:
-                    print(f"Error response from Crossref: {response.status}")
-                    print(await response.text())
-                    
+                            
+                        date_parts = work.published_print.date_parts if work.published_print else []
+                        processed_paper = {
+                            'id': f"crossref_{doi}",
+                            'title': title,
+                            'content': cleaned_abstract,
+                            'url': f"https://doi.org/{doi}",
+                            'source': 'crossref',
+                            'metadata': {
+                                'authors': [
+                                    {
+                                        'name': f"{author.given} {author.family}".strip(),
+                                        'affiliations': author.affiliation
+                                    }
+                                    for author in work.author
+                                ],
+                                'year': date_parts[0][0] if date_parts and date_parts[0] else '',
+                                'type': work.type,
+                                'citations': work.is_referenced_by_count,
+                                'abstract': cleaned_abstract,
+                                'doi': doi,
+                                'references': work.reference
+                            }
+                        }
+                        results.append(processed_paper)
+                        
+                    except Exception as e:
+                        print(f"Error processing work: {e}")
+                        continue
+                
+                return results[:max_results]
+                
+            else:
+                print(f"Error response from Crossref: {response.status_code}")
+                print(response.text)
+                
             return []
             
         except Exception as e:
@@ -1,125 +1,183 @@
-from typing import List, Dict
-import aiohttp
-import re
-from app.services.ingestion.sources.base import BaseSourceConnector
+from typing import List, Dict, Optional, Union
+import msgspec
+from app.services.ingestion.sources.base import BaseSourceConnector, INGEST, SEARCH
+from app.services.http.pool import http_pool
 from app.config import settings
 from app.schemas.paper import Paper, PaperMetadata
+from app.utils.text import strip_abstract_noise
+from app.services.ingestion.decoding import ResponseDecoder, loads
 from datetime import datetime
 
+def _reconstruct_sorted(inverted_index: Dict[str, List[int]]) -> str:
+    word_positions = []
+    for word, positions in inverted_index.items():
+        for pos in positions:
+            word_positions.append((pos, word))
+    return ' '.join(word for _, word in sorted(word_positions))
+
+def _reconstruct_slots(inverted_index: Dict[str, List[int]]) -> Optional[str]:
+    count = 0
+    last = -1
+    negative = False
+    for positions in inverted_index.values():
+        count += len(positions)
+        for pos in positions:
+            if pos > last:
+                last = pos
+            elif pos < 0:
+                negative = True
+    # A stray huge position would allocate a huge mostly-empty array
+    if negative or last >= 2 * count + 16:
+        return None
+
+    slots: List[Optional[str]] = [None] * (last + 1)
+    for word, positions in inverted_index.items():
+        if len(positions) == 1:
+            slots[positions[0]] = word
+        else:
+            for pos in positions:
+                slots[pos] = word
+
+    # As many positions as slots and none left empty means every slot was written exactly once
+    if count == len(slots) and None not in slots:
+        return ' '.join(slots)
+    filled = [word for word in slots if word is not None]
+    # Otherwise words sharing a position overwrote each other
+    return ' '.join(filled) if len(filled) == count else None
+
+def reconstruct_abstract(inverted_index: Optional[Dict[str, List[int]]]) -> str:
+    """
+    Rebuild an abstract from OpenAlex's {word: [positions]} inverted index
+    by dropping each word straight into a slot array sized by the highest
+    position, which is linear in the number of words. Gaps are skipped;
+    indexes with shared, negative or non-integer positions fall back to
+    sorting (position, word) pairs, which orders shared words by spelling.
+    """
+    if not inverted_index:
+        return ""
+    try:
+        text = _reconstruct_slots(inverted_index)
+    except TypeError:
+        text = None
+    return _reconstruct_sorted(inverted_index) if text is None else text
+
+def reconstruct_abstract_json(raw: Union[bytes, str]) -> str:
+    """Rebuild an abstract from the raw JSON of an abstract_inverted_index value"""
+    return reconstruct_abstract(loads(raw))
+
+class OpenAlexAuthor(msgspec.Struct):
+    display_name: Optional[str] = None
+
+class OpenAlexAuthorship(msgspec.Struct):
+    author: Optional[OpenAlexAuthor] = None
+
+class OpenAlexTopicLevel(msgspec.Struct):
+    display_name: str = ''
+
+class OpenAlexTopic(msgspec.Struct):
+    display_name: str = ''
+    subfield: Optional[OpenAlexTopicLevel] = None
+    field: Optional[OpenAlexTopicLevel] = None
+
+class OpenAlexWork(msgspec.Struct):
+    id: str = ''
+    title: Optional[str] = None
+    abstract_inverted_index: Optional[Dict[str, List[int]]] = None
+    authorships: List[OpenAlexAuthorship] = []
+    publication_year: Optional[int] = None
+    cited_by_count: Optional[int] = None
+    type: Optional[str] = None
+    doi: Optional[str] = None
+    primary_topic: Optional[OpenAlexTopic] = None
+    topics: List[OpenAlexTopic] = []
+
+class OpenAlexResponse(msgspec.Struct):
+    results: List[OpenAlexWork] = []
+
+# Authorships can't be narrowed further, but per-work concepts, topics and
+# open access blocks are skipped on the live path; search gets the primary
+# topic, ingestion every topic
+FIELDS = {
+    SEARCH: 'id,doi,title,publication_year,cited_by_count,type,authorships,primary_topic,abstract_inverted_index',
+    INGEST: 'id,doi,title,publication_year,cited_by_count,type,authorships,topics,abstract_inverted_index',
+}
+
 class OpenAlexConnector(BaseSourceConnector):
     def __init__(self):
         super().__init__()
-        self.rate_limit = settings.OPEN_ALEX_RATE_LIMIT
         self.base_url = "https://api.openalex.org/works"
         self.email = settings.OPEN_ALEX_EMAIL
+        self.decoder = ResponseDecoder(OpenAlexResponse)
         
     def clean_abstract(self, text: str) -> str:
         """Clean abstract text by removing HTML and unnecessary metadata"""
-        if not text:
-            return ""
-            
-        # Remove common patterns that indicate metadata
-        patterns_to_remove = [
-            r'Journal of.*?\d+',  # Journal references
-            r'Volume \d+.*?\d+',  # Volume numbers
-            r'First published:.*?(?=\n|$)',  # Publication dates
-            r'https?://\S+',  # URLs
-            r'DOI:.*?(?=\n|$)',  # DOI references
-            r'Citations:.*?(?=\n|$)',  # Citation counts
-            r'\(e-mail:.*?\)',  # Email addresses
-            r'Search for more papers.*?(?=\n|$)',  # Search suggestions
-            r'Please review.*?(?=\n|$)',  # Usage terms
-            r'Share.*?(?=\n|$)',  # Share buttons
-            r'Copyright.*?(?=\n|$)',  # Copyright notices
-            r'\d+\.\s+\w+,\s+\d+',  # Section numbers
-            r'The Faculty of.*?publications:',  # Dissertation headers
-            r'The dissertation is based.*?publications:',  # Publication lists
-            r'Professor.*?Dean',  # Administrative text
-            r'Public defence will.*?\d{4}',  # Defense details
-            r'[A-Z][a-z]+ [A-Z][a-z]+\s+et al\.,?\s+\d{4}',  # Citation patterns
-            r'\([A-Za-z\s]+,\s+\d{4}\)',  # Citation patterns
-            r'Chapter \d+.*?(?=\n|$)',  # Chapter headers
-            r'Part [IVX]+.*?(?=\n|$)',  # Part headers
-            r'Preface.*?(?=\n|$)',  # Front matter
-            r'Acknowledgments.*?(?=\n|$)',  # Front matter
-            r'Abstract.*?(?=\n|$)',  # Abstract headers
-            r'\*Contributed equally.*?(?=\n|$)',  # Author contributions
-        ]
-        
-        text = text.strip()
-        for pattern in patterns_to_remove:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-            
-        # Remove multiple spaces and newlines
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove any remaining citation-like patterns
-        text = re.sub(r'\(\d{4}\)', '', text)  # Remove year citations
-        text = re.sub(r'\[[\d,\s]+\]', '', text)  # Remove numbered citations
-        
-        return text.strip()
+        return strip_abstract_noise(text)
 
-    async def fetch_papers(self, query: str, max_results: int = 100) -> List[Paper]:
+    async def fetch_papers(self, query: str, max_results: int = 100, mode: str = SEARCH) -> List[Paper]:
         try:
-            session = await self.get_session()
             params = {
                 'search': query,
                 'per_page': min(max_results, 100),
                 'mailto': self.email,
-                'select': 'id,title,abstract_inverted_index,authorships,publication_year,cited_by_count,type,open_access,doi,concepts'
+                'select': FIELDS[mode]
             }
             
-            async with session.get(self.base_url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    results = []
-                    
-                    for work in data.get('results', []):
-                        try:
-                            # Get and clean abstract
-                            raw_abstract = self.convert_inverted_index_to_text(
-                                work.get('abstract_inverted_index', {})
-                            )
-                            clean_abstract = self.clean_abstract(raw_abstract)
-                            
-                            if len(clean_abstract) < 50:
-                                continue
-                                
-                            # Extract author names
-                            authors = [
-                                authorship.get('author', {}).get('display_name', '')
-                                for authorship in work.get('authorships', [])
-                                if authorship.get('author', {}).get('display_name')
-                            ]
-                            
-                            # Create paper with metadata
-                            paper = Paper(
-                                title=work.get('title', ''),
-                                url=f"https://doi.org/{work['doi']}" if work.get('doi') else '',
-                                metadata=PaperMetadata(
-                                    authors=authors,
-                                    year=work.get('publication_year'),
-                                    citations=work.get('cited_by_count'),
-                                    type=work.get('type'),
-                                    abstract=clean_abstract,
-                                    doi=work.get('doi'),
-                                    categories=[c.get('display_name', '') for c in work.get('concepts', [])]
-                                )
-                            )
-                            results.append(paper)
-                            
-                        except Exception as e:
-                            print(f"Error processing work: {e}")
-                            continue
-                    
-                    return results
-                    
-                return []
+            await self.rate_limit_wait()
+            response = await http_pool.client().get(self.base_url, params=params)
+            self.record_transfer(response.num_bytes_downloaded, len(response.content))
+            if response.status_code == 200:
+                return self._to_papers(self.decoder.decode(response.content))
+                
+            return []
                     
         except Exception as e:
             print(f"Error fetching from OpenAlex: {str(e)}")
             return []
 
+    def _to_papers(self, response: OpenAlexResponse) -> List[Paper]:
+        results = []
+        for work in response.results:
+            try:
+                # Get and clean abstract
+                clean_abstract = self.clean_abstract(
+                    self.convert_inverted_index_to_text(work.abstract_inverted_index)
+                )
+                if len(clean_abstract) < 50 or not work.title:
+                    continue
+
+                # Fields were type-checked while decoding, so skip a second round of validation
+                results.append(Paper.model_construct(
+                    title=work.title,
+                    # OpenAlex DOIs are already https://doi.org/ URLs
+                    url=work.doi or work.id,
+                    metadata=PaperMetadata.model_construct(
+                        authors=[authorship.author.display_name for authorship in work.authorships
+                                 if authorship.author and authorship.author.display_name],
+                        year=work.publication_year,
+                        citations=work.cited_by_count,
+                        type=work.type,
+                        abstract=clean_abstract,
+                        doi=work.doi.removeprefix("https://doi.org/") if work.doi else None,
+                        categories=self._categories(work)
+                    )
+                ))
+
+            except Exception as e:
+                print(f"Error processing work: {e}")
+                continue
+
+        return results
+
+    @staticmethod
+    def _categories(work: OpenAlexWork) -> List[str]:
+        """Topic names with their subfields and fields, most specific first, without repeats"""
+        categories = {}
+        for topic in work.topics or ([work.primary_topic] if work.primary_topic else []):
+            for level in (topic, topic.subfield, topic.field):
+                if level and level.display_name:
+                    categories[level.display_name] = None
+        return list(categories)
+
     def _extract_authors(self, work: Dict) -> List[Dict]:
         """Extract author information from work data"""
         authors = []
@@ -133,16 +191,8 @@ class OpenAlexConnector(BaseSourceConnector):
 
     def convert_inverted_index_to_text(self, inverted_index: Dict) -> str:
         """Convert OpenAlex's inverted index format to regular text"""
-        if not inverted_index:
-            return ""
-            
         try:
-            word_positions = []
-            for word, positions in inverted_index.items():
-                for pos in positions:
-                    word_positions.append((pos, word))
-            
-            return ' '.join(word for _, word in sorted(word_positions))
+            return reconstruct_abstract(inverted_index)
         except Exception as e:
             print(f"Error converting inverted index: {e}")
-            return "" 
\ No newline at end of file
+            return ""
@@ -1,167 +1,195 @@
-from typing import List, Dict
+from typing import List, Optional
 import asyncio
-from datetime import datetime
-from easy_entrez import EntrezAPI
-from easy_entrez.parsing import xml_to_string
-from app.services.ingestion.sources.base import BaseSourceConnector
+import re
+import xml.etree.ElementTree as ET
+from app.services.ingestion.sources.base import BaseSourceConnector, SEARCH
+from app.services.http.pool import http_pool
 from app.config import settings
+from app.schemas.paper import Paper, PaperMetadata
+
+_YEAR = re.compile(r'\d{4}')
+
+class PubMedXmlParser:
+    """
+    Streaming parser for efetch PubmedArticleSet XML.
+    Fed bytes as they arrive, it tracks the element path and picks fields
+    off as their end tags close, so each article is visited once and
+    freed as soon as it becomes a Paper.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._path: List[str] = []
+        self._article: Optional[dict] = None
+
+    def feed(self, chunk: bytes) -> List[Paper]:
+        self._parser.feed(chunk)
+        papers = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._path.append(elem.tag)
+                if elem.tag == "PubmedArticle":
+                    self._article = {'pmid': None, 'title': '', 'abstract': [], 'authors': [], 'year': None,
+                                     'article_year': None, 'doi': None, 'mesh': [], 'keywords': [], 'type': None}
+                continue
+
+            if self._article is not None:
+                if elem.tag == "PubmedArticle":
+                    paper = self._to_paper(self._article)
+                    if paper is not None:
+                        papers.append(paper)
+                    self._article = None
+                    elem.clear()
+                else:
+                    self._collect(elem, self._path[-2] if len(self._path) > 1 else "")
+            self._path.pop()
+        return papers
+
+    def _collect(self, elem: ET.Element, parent: str):
+        article = self._article
+        tag = elem.tag
+        if tag == "PMID" and parent == "MedlineCitation":
+            article['pmid'] = elem.text
+        elif tag == "ArticleTitle":
+            article['title'] = "".join(elem.itertext()).strip()
+        elif tag == "AbstractText":
+            text = "".join(elem.itertext()).strip()
+            label = elem.get('Label')
+            article['abstract'].append(f"{label}: {text}" if label else text)
+        elif tag == "Author" and parent == "AuthorList":
+            name = elem.findtext('CollectiveName') or f"{elem.findtext('ForeName', '')} {elem.findtext('LastName', '')}".strip()
+            if name:
+                article['authors'].append(name)
+        elif tag == "PubDate" and article['year'] is None:
+            match = _YEAR.search(elem.findtext('Year') or elem.findtext('MedlineDate') or '')
+            article['year'] = int(match.group()) if match else None
+        elif tag == "ArticleDate" and article['article_year'] is None:
+            # Electronic publication date; used when PubDate is only a season or free text
+            year = elem.findtext('Year')
+            article['article_year'] = int(year) if year and year.isdigit() else None
+        elif tag == "ArticleId" and parent == "ArticleIdList" and self._path[-3] == "PubmedData":
+            # Reference lists carry ArticleIds too; only the article's own count
+            if elem.get('IdType') == 'doi':
+                article['doi'] = elem.text
+        elif tag == "DescriptorName" and parent == "MeshHeading":
+            article['mesh'].append(elem.text)
+        elif tag == "Keyword" and elem.text:
+            article['keywords'].append(elem.text.strip())
+        elif tag == "PublicationType" and article['type'] is None:
+            article['type'] = elem.text
+
+    @staticmethod
+    def _to_paper(article: dict) -> Optional[Paper]:
+        abstract = "\n".join(text for text in article['abstract'] if text)
+        # Records without an abstract (letters, errata) can't be ranked meaningfully
+        if not article['pmid'] or not article['title'] or not abstract:
+            return None
+        # Search results are returned with a year
+        year = article['year'] or article['article_year']
+        if year is None:
+            return None
+        return Paper(
+            title=article['title'],
+            url=f"https://pubmed.ncbi.nlm.nih.gov/{article['pmid']}/",
+            metadata=PaperMetadata(
+                authors=article['authors'],
+                year=year,
+                abstract=abstract,
+                doi=article['doi'],
+                categories=[term for term in article['mesh'] or article['keywords'] if term],
+                type=article['type']
+            )
+        )
 
 class PubMedConnector(BaseSourceConnector):
     def __init__(self):
         super().__init__()
-        self.rate_limit = settings.PUBMED_RATE_LIMIT
-        self.api = EntrezAPI(
-            'querie',  # your tool name
-            settings.PUBMED_EMAIL,
-        )
-        
-    async def fetch_papers(self, query: str, max_results: int = 100) -> List[Dict]:
+        self.base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+        self.email = settings.PUBMED_EMAIL
+        self.api_key = settings.PUBMED_API_KEY
+        self.batch_size = settings.PUBMED_FETCH_BATCH_SIZE
+
+    def _params(self, **params) -> dict:
+        params.update({'db': 'pubmed', 'tool': 'factifai'})
+        if self.email:
+            params['email'] = self.email
+        if self.api_key:
+            params['api_key'] = self.api_key
+        return params
+
+    async def fetch_papers(self, query: str, max_results: int = 100, mode: str = SEARCH) -> List[Paper]:
         """Fetch papers from PubMed based on query"""
+        # efetch has no field selection; the streaming parser keeps only what Paper needs
         if not query:
             return []
-        
+
         try:
-            # Search for papers
-            print("\nSearching PubMed for:", query)
-            search_result = self.api.search(query, max_results=max_results, database='pubmed')
-            
-            print("\nSearch response:", search_result.data)
-            
-            if not search_result.data or 'error' in search_result.data:
-                print(f"Error in search response: {search_result.data}")
-                return []
-            
-            if 'esearchresult' not in search_result.data:
-                print("Unexpected response format:", search_result.data)
+            search = await self._search(query, max_results)
+            if search is None:
                 return []
-            
-            id_list = search_result.data['esearchresult'].get('idlist', [])
-            
-            if not id_list:
-                print("No IDs found in search results")
+            count = min(int(search.get('count', 0)), max_results)
+            if not count:
                 return []
-            
-            # Fetch full records
-            print("\nFetching details for IDs:", id_list)
-            fetch_result = self.api.fetch(
-                collection=id_list,
-                database='pubmed',
-                max_results=max_results
-            )
 
-            # The response is already an XML Element
-            root = fetch_result.data
-            
-            # Process each article
-            results = []
-            for article in root.findall('.//PubmedArticle'):
-                try:
-                    medline_citation = article.find('MedlineCitation')
-                    if medline_citation is None:
-                        continue
-                    
-                    article_elem = medline_citation.find('Article')
-                    if article_elem is None:
-                        continue
-                    
-                    # Basic metadata
-                    pmid = medline_citation.findtext('PMID', '')
-                    title = article_elem.findtext('ArticleTitle', '')
-                    
-                    # Enhanced abstract extraction
-                    abstract = ""
-                    abstract_elem = article_elem.find('.//Abstract')
-                    if abstract_elem is not None:
-                        # Handle structured abstracts (with labels like BACKGROUND, METHODS, etc.)
-                        abstract_texts = []
-                        for abstract_text in abstract_elem.findall('AbstractText'):
-                            label = abstract_text.get('Label', '')
-                            text = abstract_text.text or ''
-                            if label:
-                                abstract_texts.append(f"{label}: {text}")
-                            else:
-                                abstract_texts.append(text)
-                        abstract = '\n'.join(abstract_texts)
-                    
-                    # Enhanced author extraction
-                    authors = []
-                    for author in article_elem.findall('.//Author'):
-                        last_name = author.findtext('LastName', '')
-                        fore_name = author.findtext('ForeName', '')
-                        affiliations = [aff.text for aff in author.findall('.//Affiliation') if aff.text]
-                        if last_name or fore_name:
-                            authors.append({
-                                'name': f"{fore_name} {last_name}".strip(),
-                                'affiliations': affiliations
-                            })
-                    
-                    # Enhanced metadata extraction
-                    journal_elem = article_elem.find('.//Journal')
-                    journal = {
-                        'title': journal_elem.findtext('.//Title', ''),
-                        'iso_abbreviation': journal_elem.findtext('.//ISOAbbreviation', ''),
-                        'issn': journal_elem.findtext('.//ISSN', '')
-                    }
-                    
-                    # Publication date (more detailed)
-                    pub_date_elem = article_elem.find('.//PubDate')
-                    pub_date = {}
-                    if pub_date_elem is not None:
-                        pub_date = {
-                            'year': pub_date_elem.findtext('Year', ''),
-                            'month': pub_date_elem.findtext('Month', ''),
-                            'day': pub_date_elem.findtext('Day', '')
-                        }
-                    
-                    # Keywords and MeSH terms
-                    keywords = [keyword.text for keyword in medline_citation.findall('.//KeywordList/Keyword') if keyword.text]
-                    mesh_terms = [
-                        mesh.findtext('DescriptorName', '')
-                        for mesh in medline_citation.findall('.//MeshHeadingList/MeshHeading')
-                    ]
-                    
-                    # DOI and other IDs
-                    article_ids = {}
-                    for id_elem in article.findall('.//ArticleIdList/ArticleId'):
-                        id_type = id_elem.get('IdType', '')
-                        if id_type:
-                            article_ids[id_type] = id_elem.text
-                    
-                    paper = {
-                        'id': f"pubmed_{pmid}",
-                        'title': title,
-                        'content': (
-                            f"Abstract:\n{abstract}\n\n"
-                            f"Authors:\n" + '\n'.join(f"- {author['name']} ({'; '.join(author['affiliations'])})" 
-                                                     for author in authors) + "\n\n"
-                            f"Journal: {journal['title']}\n"
-                            f"Publication Date: {pub_date.get('year', '')}-{pub_date.get('month', '')}-{pub_date.get('day', '')}"
-                        ),
-                        'url': f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/",
-                        'source': 'pubmed',
-                        'metadata': {
-                            'authors': authors,
-                            'journal': journal,
-                            'publication_date': pub_date,
-                            'pmid': pmid,
-                            'doi': article_ids.get('doi', ''),
-                            'keywords': keywords,
-                            'mesh_terms': mesh_terms,
-                            'article_ids': article_ids,
-                            'abstract': abstract
-                        }
-                    }
-                    results.append(paper)
-                    
-                except Exception as e:
-                    print(f"Error processing article: {e}")
-                    continue
-                    
-            print(f"\nPubMed returned {len(results)} results for query: {query}")
+            # Fetch batches in parallel off the history server; the shared
+            # rate limiter keeps them within NCBI's requests-per-second budget
+            batches = await asyncio.gather(*(
+                self._fetch_batch(search['webenv'], search['querykey'], start, min(self.batch_size, count - start))
+                for start in range(0, count, self.batch_size)
+            ))
+            results = [paper for batch in batches for paper in batch]
+
+            print(f"PubMed returned {len(results)} results for query: {query}")
             return results
-            
+
         except Exception as e:
             print(f"Error fetching from PubMed: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-            return []
\ No newline at end of file
+            return []
+
+    async def _search(self, query: str, max_results: int) -> Optional[dict]:
+        """esearch with usehistory, so efetch can page the stored result set"""
+        await self.rate_limit_wait()
+        response = await http_pool.client().get(f"{self.base_url}/esearch.fcgi", params=self._params(
+            term=query,
+            retmax=max_results,
+            sort='relevance',
+            usehistory='y',
+            retmode='json'
+        ))
+        self.record_transfer(response.num_bytes_downloaded, len(response.content))
+        if response.status_code != 200:
+            print(f"Error from PubMed esearch: {response.status_code}")
+            return None
+
+        result = response.json().get('esearchresult', {})
+        if 'ERROR' in result or 'webenv' not in result:
+            print(f"Error in PubMed search response: {result.get('ERROR', 'no history returned')}")
+            return None
+        return result
+
+    async def _fetch_batch(self, webenv: str, query_key: str, start: int, size: int) -> List[Paper]:
+        """Stream one efetch batch through the incremental parser"""
+        try:
+            await self.rate_limit_wait()
+            parser = PubMedXmlParser()
+            papers: List[Paper] = []
+            async with http_pool.client().stream('GET', f"{self.base_url}/efetch.fcgi", params=self._params(
+                WebEnv=webenv,
+                query_key=query_key,
+                retstart=start,
+                retmax=size,
+                retmode='xml'
+            )) as response:
+                if response.status_code != 200:
+                    print(f"Error from PubMed efetch: {response.status_code}")
+                    return []
+                body_bytes = 0
+                async for chunk in response.aiter_bytes():
+                    body_bytes += len(chunk)
+                    papers.extend(parser.feed(chunk))
+                self.record_transfer(response.num_bytes_downloaded, body_bytes)
+            return papers
+
+        except Exception as e:
+            print(f"Error fetching PubMed batch at {start}: {str(e)}")
+            return []
@@ -1,99 +1,149 @@
-from typing import List, Dict
-import aiohttp
-from app.services.ingestion.sources.base import BaseSourceConnector
+from typing import Any, AsyncGenerator, Dict, Iterable, List, Optional
+from datetime import datetime
+import msgspec
+from app.services.ingestion.sources.base import BaseSourceConnector, INGEST, SEARCH
+from app.services.http.pool import http_pool
 from app.config import settings
+from app.schemas.paper import Paper, PaperMetadata
+from app.services.ingestion.decoding import ResponseDecoder
+
+# Only scalar and count fields; nested citation/reference lists are what made payloads huge.
+# The paper URL is derived from its id, so only ingestion asks for it along
+# with publication types and dates.
+FIELDS = {
+    SEARCH: 'title,abstract,year,citationCount,externalIds,fieldsOfStudy,authors',
+    INGEST: 'title,abstract,year,citationCount,externalIds,fieldsOfStudy,authors,url,publicationTypes,publicationDate',
+}
+
+BATCH_LIMIT = 500  # ids per /paper/batch request
+BULK_PAGE_LIMIT = 1000  # results per /paper/search/bulk page
+
+class SemanticScholarAuthor(msgspec.Struct):
+    name: Optional[str] = None
+
+class SemanticScholarPaper(msgspec.Struct, rename='camel'):
+    paper_id: str = ''
+    title: Optional[str] = None
+    abstract: Optional[str] = None
+    year: Optional[int] = None
+    citation_count: Optional[int] = None
+    external_ids: Optional[Dict[str, Any]] = None
+    url: Optional[str] = None
+    fields_of_study: Optional[List[str]] = None
+    authors: List[SemanticScholarAuthor] = []
+    publication_types: Optional[List[str]] = None
+    publication_date: Optional[str] = None
+
+class SemanticScholarResponse(msgspec.Struct):
+    """Relevance and bulk search pages; only bulk search sets a continuation token"""
+    data: List[SemanticScholarPaper] = []
+    token: Optional[str] = None
 
 class SemanticScholarConnector(BaseSourceConnector):
     def __init__(self):
         super().__init__()
-        self.rate_limit = settings.SEMANTIC_SCHOLAR_RATE_LIMIT  # Usually 100 requests per 5 minutes
         self.api_key = settings.SEMANTIC_SCHOLAR_API_KEY
         self.base_url = "https://api.semanticscholar.org/graph/v1"
-        
-    async def fetch_papers(self, query: str, max_results: int = 100) -> List[Dict]:
-        """Fetch papers from Semantic Scholar based on query"""
+        self.search_decoder = ResponseDecoder(SemanticScholarResponse)
+        # Unknown ids come back as nulls, in request order
+        self.batch_decoder = ResponseDecoder(List[Optional[SemanticScholarPaper]])
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        # An empty key is rejected, while no key gets the shared public rate limit
+        return {"x-api-key": self.api_key} if self.api_key else {}
+
+    async def fetch_papers(self, query: str, max_results: int = 100, mode: str = SEARCH) -> List[Paper]:
+        """Fetch papers from Semantic Scholar's relevance search"""
         if not query:
             return []
-            
+
+        data = await self._request('GET', "/paper/search", self.search_decoder, params={
+            'query': query,
+            'limit': min(max_results, 100),  # API limit is 100 per request
+            'fields': FIELDS[mode]
+        })
+        results = self._to_papers(data.data if data else [])
+        print(f"Semantic Scholar returned {len(results)} results for query: {query}")
+        return results
+
+    async def fetch_by_ids(self, ids: List[str], mode: str = INGEST) -> List[Paper]:
+        """
+        Enrich many papers in few requests via /paper/batch. Ids can be S2
+        paper ids or prefixed external ids such as 'DOI:10.1000/1' or
+        'ARXIV:1706.03762'.
+        """
+        results = []
+        for i in range(0, len(ids), BATCH_LIMIT):
+            data = await self._request('POST', "/paper/batch", self.batch_decoder, params={'fields': FIELDS[mode]}, json={
+                'ids': ids[i:i + BATCH_LIMIT]
+            })
+            results.extend(self._to_papers(item for item in data or [] if item))
+        return results
+
+    async def fetch_bulk(self, query: str, max_results: int, mode: str = INGEST) -> AsyncGenerator[List[Paper], None]:
+        """
+        Ingestion-sized pulls: page ids through bulk search, then enrich each
+        page with a single /paper/batch call
+        """
+        token: Optional[str] = None
+        fetched = 0
+        while fetched < max_results:
+            params = {'query': query, 'fields': 'paperId'}
+            if token:
+                params['token'] = token
+            data = await self._request('GET', "/paper/search/bulk", self.search_decoder, params=params)
+            if not data or not data.data:
+                return
+
+            ids = [item.paper_id for item in data.data[:min(BULK_PAGE_LIMIT, max_results - fetched)]]
+            fetched += len(ids)
+            yield await self.fetch_by_ids(ids, mode)
+
+            token = data.token
+            if not token:
+                return
+
+    async def _request(self, method: str, path: str, decoder: ResponseDecoder, params: Dict, json: Optional[Dict] = None):
         try:
-            session = await self.get_session()
-            
-            # Search endpoint
-            search_url = f"{self.base_url}/paper/search"
-            params = {
-                'query': query,
-                'limit': min(max_results, 100),  # API limit is 100 per request
-                'fields': 'title,abstract,authors,year,venue,publicationVenue,citations,references,externalIds,url,fieldsOfStudy,tldr'
-            }
-            headers = {"x-api-key": self.api_key}
-            
-            async with session.get(search_url, params=params, headers=headers) as response:
-                if response.status != 200:
-                    print(f"Error from Semantic Scholar API: {response.status}")
-                    return []
-                    
-                data = await response.json()
-                papers = data.get('data', [])
-                
-                results = []
-                for paper in papers:
-                    # Extract authors with affiliations
-                    authors = []
-                    for author in paper.get('authors', []):
-                        authors.append({
-                            'name': author.get('name', ''),
-                            'affiliations': author.get('affiliations', [])
-                        })
-                    
-                    # Get TLDR (AI-generated summary) if available
-                    tldr = paper.get('tldr', {}).get('text', '')
-                    
-                    # Format content
-                    content = (
-                        f"Abstract:\n{paper.get('abstract', '')}\n\n"
-                        f"TLDR:\n{tldr}\n\n" if tldr else ""
-                        f"Authors:\n" + '\n'.join(f"- {author['name']}" for author in authors) + "\n\n"
-                        f"Venue: {paper.get('venue', '')}\n"
-                        f"Year: {paper.get('year', '')}\n"
-                        f"Citations: {len(paper.get('citations', []))}\n"
-                        f"Fields of Study: {', '.join(paper.get('fieldsOfStudy', []))}"
-                    )
-                    
-                    # Extract external IDs
-                    external_ids = paper.get('externalIds', {})
-                    
-                    result = {
-                        'id': f"semantic_{paper.get('paperId', '')}",
-                        'title': paper.get('title', ''),
-                        'content': content,
-                        'url': paper.get('url', ''),
-                        'source': 'semantic_scholar',
-                        'metadata': {
-                            'authors': authors,
-                            'year': paper.get('year'),
-                            'venue': paper.get('venue'),
-                            'publication_venue': paper.get('publicationVenue'),
-                            'citation_count': len(paper.get('citations', [])),
-                            'reference_count': len(paper.get('references', [])),
-                            'fields_of_study': paper.get('fieldsOfStudy', []),
-                            'abstract': paper.get('abstract', ''),
-                            'tldr': tldr,
-                            'external_ids': {
-                                'doi': external_ids.get('DOI'),
-                                'arxiv': external_ids.get('ArXiv'),
-                                'pubmed': external_ids.get('PubMed'),
-                                'mag': external_ids.get('MAG')
-                            }
-                        }
-                    }
-                    results.append(result)
-                    
-                    # Respect rate limit
-                    await self.rate_limit_wait()
-                    
-                print(f"Semantic Scholar returned {len(results)} results for query: {query}")
-                return results
-                
+            await self.rate_limit_wait()
+            response = await http_pool.client().request(
+                method, f"{self.base_url}{path}", params=params, json=json, headers=self.headers
+            )
+            self.record_transfer(response.num_bytes_downloaded, len(response.content))
+            if response.status_code != 200:
+                print(f"Error from Semantic Scholar API: {response.status_code}")
+                return None
+            return decoder.decode(response.content)
+
         except Exception as e:
             print(f"Error fetching from Semantic Scholar: {str(e)}")
-            return [] 
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def _to_papers(items: Iterable[SemanticScholarPaper]) -> List[Paper]:
+        results = []
+        for item in items:
+            # Many S2 records withhold the abstract; without it there's nothing to rank on
+            if not item.title or not item.abstract:
+                continue
+            # Search results are returned with a year; fall back to the publication date's
+            year = item.year or (int(item.publication_date[:4]) if item.publication_date else None)
+            if year is None:
+                continue
+            # Fields were type-checked while decoding, so skip a second round of validation
+            results.append(Paper.model_construct(
+                title=item.title,
+                url=item.url or f"https://www.semanticscholar.org/paper/{item.paper_id}",
+                metadata=PaperMetadata.model_construct(
+                    authors=[author.name for author in item.authors if author.name],
+                    year=year,
+                    citations=item.citation_count,
+                    categories=item.fields_of_study or [],
+                    abstract=item.abstract,
+                    doi=(item.external_ids or {}).get('DOI'),
+                    published_date=datetime.fromisoformat(item.publication_date) if item.publication_date else None,
+                    type=item.publication_types[0] if item.publication_types else None
+                )
+            ))
+        return results
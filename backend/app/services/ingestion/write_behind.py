@@ -0,0 +1,182 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+from app.services.ingestion.dedup import paper_key
+
+logger = logging.getLogger(__name__)
+
+class VectorStore(ABC):
+    """Destination for paper vectors; upsert is a blocking call"""
+
+    @abstractmethod
+    def upsert(self, vectors: List[Dict]):
+        """Insert or overwrite vectors by id"""
+        pass
+
+class PineconeVectorStore(VectorStore):
+    def __init__(self, index):
+        self.index = index
+
+    def upsert(self, vectors: List[Dict]):
+        self.index.upsert(vectors=vectors)
+
+class InMemoryVectorStore(VectorStore):
+    """In-process stand-in for Pinecone"""
+
+    def __init__(self):
+        self.vectors: Dict[str, Dict] = {}
+        self.upserts = 0
+
+    def upsert(self, vectors: List[Dict]):
+        self.upserts += 1
+        for vector in vectors:
+            self.vectors[vector["id"]] = vector
+
+def paper_metadata(doc: Dict) -> Dict:
+    """Metadata stored with each paper vector; Pinecone can't hold nulls"""
+    metadata = {
+        "title": doc.get("title"),
+        "abstract": (doc.get("abstract") or "")[:1400],  # Limit abstract length
+        "url": doc.get("url"),
+        "source": doc.get("source"),
+        "categories": doc.get("categories"),
+        "authors": doc.get("authors"),
+        "year": doc.get("year"),
+        "doi": doc.get("doi"),
+        "citations": doc.get("citations"),
+    }
+    return {key: value for key, value in metadata.items() if value is not None}
+
+def to_record(doc: Dict, vector: np.ndarray) -> Dict:
+    """Pinecone record for a ranked candidate"""
+    return {
+        "id": paper_key(doc),
+        "values": np.asarray(vector, dtype=np.float32).tolist(),
+        "metadata": paper_metadata(doc),
+    }
+
+class WriteBehindQueue:
+    """
+    Batches papers ranked during searches into the vector store off the
+    request path.
+    Pending records are keyed by paper id, so a paper ranked again before it
+    is written is only written once. Papers written recently are skipped.
+    At most max_pending records wait at a time; past that the oldest are
+    dropped, since they will be fetched and queued again by a later search.
+    """
+
+    def __init__(
+        self,
+        store: VectorStore,
+        batch_size: int = 100,
+        max_pending: int = 5000,
+        flush_interval: float = 2.0,
+        max_retries: int = 3,
+        retry_delay: float = 1.0
+    ):
+        self.store = store
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._pending: "OrderedDict[str, Dict]" = OrderedDict()
+        self._written: "OrderedDict[str, None]" = OrderedDict()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+
+        # Metrics
+        self.enqueued = 0
+        self.written = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def enqueue(self, documents: List[Dict], embeddings: np.ndarray):
+        """Queue papers with their row-aligned vectors; never blocks"""
+        for doc, vector in zip(documents, embeddings):
+            record = to_record(doc, vector)
+            if record["id"] in self._written:
+                self.skipped += 1
+                continue
+            self._pending[record["id"]] = record
+            self._pending.move_to_end(record["id"])
+            self.enqueued += 1
+
+        overflow = len(self._pending) - self.max_pending
+        for _ in range(max(overflow, 0)):
+            self._pending.popitem(last=False)
+            self.dropped += 1
+
+        self._ensure_worker()
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._pending and not self._closing:
+                await self._write_batch()
+
+    async def _write_batch(self):
+        batch = []
+        while self._pending and len(batch) < self.batch_size:
+            batch.append(self._pending.popitem(last=False)[1])
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await asyncio.to_thread(self.store.upsert, batch)
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Dropping {len(batch)} papers after {attempt} failed upserts: {str(e)}")
+                    self.failed += len(batch)
+                    return
+                logger.warning(f"Upsert attempt {attempt} failed: {str(e)}")
+                await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+
+        self.written += len(batch)
+        for record in batch:
+            self._written[record["id"]] = None
+        # Remember recent writes only; a stale paper may be rewritten later
+        while len(self._written) > 4 * self.max_pending:
+            self._written.popitem(last=False)
+
+    async def flush(self):
+        """Write everything pending now"""
+        while self._pending:
+            await self._write_batch()
+
+    async def close(self):
+        """Stop the worker and flush what is still pending"""
+        self._closing = True
+        if self._worker is not None:
+            self._wakeup.set()
+            await self._worker
+            self._worker = None
+        await self.flush()
+        self._closing = False
+
+    def stats(self) -> Dict:
+        return {
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
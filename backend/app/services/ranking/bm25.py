@@ -0,0 +1,80 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this
+to was were which with we our these those their been can not using via into
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens without stopwords or single characters"""
+    return [token for token in _TOKEN.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+class BM25Index:
+    """
+    In-memory inverted index over one request's candidate papers.
+    Documents can be added as sources arrive; scores always use the
+    statistics of everything indexed so far.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._doc_lengths: List[int] = []
+        self._total_length = 0
+        # Candidate dicts are identified by object identity
+        self._ids: Dict[int, int] = {}
+
+    def add(self, documents: List[Dict]):
+        """Index title and abstract of each document"""
+        for doc in documents:
+            doc_id = len(self._doc_lengths)
+            self._ids[id(doc)] = doc_id
+            tokens = tokenize(f"{doc.get('title') or ''} {doc.get('abstract') or ''}")
+            for term, frequency in Counter(tokens).items():
+                self._postings[term][doc_id] = frequency
+            self._doc_lengths.append(len(tokens))
+            self._total_length += len(tokens)
+
+    def score(self, query: str, documents: Sequence[Dict]) -> np.ndarray:
+        """BM25 score of each (already indexed) document for the query"""
+        scores = np.zeros(len(documents), dtype=np.float32)
+        n_docs = len(self._doc_lengths)
+        if not documents or n_docs == 0:
+            return scores
+
+        doc_ids = [self._ids[id(doc)] for doc in documents]
+        avg_length = self._total_length / n_docs or 1.0
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, doc_id in enumerate(doc_ids):
+                frequency = postings.get(doc_id)
+                if frequency:
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    scores[position] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+def reciprocal_rank_fusion(*score_lists: np.ndarray, k: int = 60) -> np.ndarray:
+    """
+    Fuse aligned score arrays by reciprocal rank: sum of 1 / (k + rank).
+    Ranks start at 1 for the highest score in each list; tied scores share
+    the best rank, so a list with no signal (all zeros) changes nothing.
+    """
+    fused = np.zeros(len(score_lists[0]), dtype=np.float64)
+    for scores in score_lists:
+        negated = -np.asarray(scores, dtype=np.float64)
+        ranks = np.searchsorted(np.sort(negated), negated, side="left") + 1
+        fused += 1.0 / (k + ranks)
+    return fused
@@ -0,0 +1,113 @@
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row as float32, leaving all-zero rows at zero"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, via argpartition"""
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+class RankingEngine:
+    """
+    Dense ranker for one search request.
+    Candidate vectors live in a single normalized float32 matrix; scores are
+    true cosine similarities from a matrix-vector product against the query.
+    Candidates can be added as they arrive: each block is scored on add and,
+    when keep is set, merged into a running top-k heap.
+    """
+
+    def __init__(self, query_embedding: Union[Sequence[float], np.ndarray], keep: Optional[int] = None):
+        self.query = normalize_rows(query_embedding)[0]
+        self.keep = keep
+        self.documents: List[Dict] = []
+        self._blocks: List[np.ndarray] = []
+        self._block_scores: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._scores: Optional[np.ndarray] = None
+        # Min-heap of (score, -index) holding the best `keep` candidates so far;
+        # negating the index makes earlier candidates win score ties
+        self._heap: List[Tuple[float, int]] = []
+
+    def add(self, documents: List[Dict], embeddings: np.ndarray) -> np.ndarray:
+        """Add candidates with their row-aligned embeddings; returns their scores"""
+        if not documents:
+            return np.empty(0, dtype=np.float32)
+        if len(documents) != len(embeddings):
+            raise ValueError(f"Got {len(documents)} documents but {len(embeddings)} embeddings")
+
+        offset = len(self.documents)
+        block = normalize_rows(embeddings)
+        block_scores = block @ self.query
+
+        self.documents.extend(documents)
+        self._blocks.append(block)
+        self._block_scores.append(block_scores)
+        self._matrix = None
+        self._scores = None
+
+        if self.keep:
+            for i in top_k_indices(block_scores, self.keep):
+                entry = (float(block_scores[i]), -(offset + int(i)))
+                if len(self._heap) < self.keep:
+                    heapq.heappush(self._heap, entry)
+                elif entry > self._heap[0]:
+                    heapq.heapreplace(self._heap, entry)
+
+        return block_scores
+
+    @property
+    def matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            if not self._blocks:
+                return np.empty((0, len(self.query)), dtype=np.float32)
+            self._matrix = self._blocks[0] if len(self._blocks) == 1 else np.vstack(self._blocks)
+            self._blocks = [self._matrix]
+        return self._matrix
+
+    @property
+    def scores(self) -> np.ndarray:
+        """Cosine similarity of every candidate to the query"""
+        if self._scores is None:
+            if not self._block_scores:
+                return np.empty(0, dtype=np.float32)
+            self._scores = np.concatenate(self._block_scores)
+            self._block_scores = [self._scores]
+        return self._scores
+
+    def top_k(self, k: int, order_by: Optional[np.ndarray] = None) -> List[Dict]:
+        """
+        Best k candidates, each with 'score' set to its cosine similarity.
+        order_by optionally ranks by other aligned scores (e.g. fused ones).
+        """
+        if order_by is not None:
+            indices = top_k_indices(np.asarray(order_by), k)
+        elif self.keep and k <= self.keep:
+            indices = [-neg_index for _, neg_index in sorted(self._heap, reverse=True)[:k]]
+        else:
+            indices = top_k_indices(self.scores, k)
+
+        scores = self.scores
+        ranked = []
+        for i in indices:
+            doc = self.documents[i]
+            doc['score'] = float(scores[i])
+            ranked.append(doc)
+        return ranked
+
+    def __len__(self) -> int:
+        return len(self.documents)
@@ -1,14 +1,15 @@
 from dataclasses import dataclass
 from typing import List, Optional
-import httpx
 from bs4 import BeautifulSoup
 import time
 import random
 from urllib.parse import urlparse
-import asyncio
 import logging
 import json
 from app.services.search.constants import EXCLUDED_DOMAINS, EXCLUDED_URL_PATTERNS
+from app.services.http.health import CircuitOpenError
+from app.services.http.pool import http_pool
+from app.services.http.rate_limit import rate_limiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -110,8 +111,8 @@ class GoogleSearchService:
         Perform Google search with filtering for reliable sources
         """
         try:
-            # Add random delay between requests (2-5 seconds)
-            await asyncio.sleep(random.uniform(1.5, 4.9))
+            # Space requests out across all concurrent searches; only waits when needed
+            await rate_limiter.acquire(urlparse(self.BASE_URL).hostname)
             
             params = {
                 'q': query,
@@ -130,55 +131,56 @@ class GoogleSearchService:
             logger.info(f"Sending request to: {self.BASE_URL}")
             logger.info(f"With params: {params}")
             
-            async with httpx.AsyncClient(
-                timeout=30.0,
-                follow_redirects=True,
-                verify=True
-            ) as client:
-                headers = self.get_headers()
-                logger.info(f"Using User-Agent: {headers['User-Agent']}")
-                
-                response = await client.get(
-                    self.BASE_URL,
-                    headers=headers,
-                    params=params
-                )
-                
-                logger.info(f"Response status: {response.status_code}")
-                logger.info(f"Response headers: {json.dumps(dict(response.headers), indent=2)}")
-                
-                if response.status_code != 200:
-                    logger.error(f"Unexpected status code: {response.status_code}")
-                    self.save_debug_html(response.text, "error_response")
-                    return []
-                
-                html = response.text
-                logger.info(f"Response length: {len(html)}")
-                
-                # Save response for debugging
-                self.save_debug_html(html)
-                
-                if "Our systems have detected unusual traffic" in html:
-                    logger.error("CAPTCHA detected!")
-                    return []
-                    
-                # Check for other blocking patterns
-                blocking_patterns = [
-                    "detected unusual traffic",
-                    "please show you're not a robot",
-                    "automated requests"
-                ]
-                
-                if any(pattern in html.lower() for pattern in blocking_patterns):
-                    logger.error("Request appears to be blocked")
-                    return []
-                
-                results = self._parse_results(html)
-                if not results and self.debug:
-                    logger.error("No results found in parsed response")
-                
-                return results
+            # Shared pooled client, so repeat searches reuse the TLS connection
+            client = http_pool.client()
+            headers = self.get_headers()
+            logger.info(f"Using User-Agent: {headers['User-Agent']}")
+            
+            response = await client.get(
+                self.BASE_URL,
+                headers=headers,
+                params=params
+            )
+            
+            logger.info(f"Response status: {response.status_code}")
+            logger.info(f"Response headers: {json.dumps(dict(response.headers), indent=2)}")
+            
+            if response.status_code != 200:
+                logger.error(f"Unexpected status code: {response.status_code}")
+                self.save_debug_html(response.text, "error_response")
+                return []
+            
+            html = response.text
+            logger.info(f"Response length: {len(html)}")
+            
+            # Save response for debugging
+            self.save_debug_html(html)
+            
+            if "Our systems have detected unusual traffic" in html:
+                logger.error("CAPTCHA detected!")
+                return []
                 
+            # Check for other blocking patterns
+            blocking_patterns = [
+                "detected unusual traffic",
+                "please show you're not a robot",
+                "automated requests"
+            ]
+            
+            if any(pattern in html.lower() for pattern in blocking_patterns):
+                logger.error("Request appears to be blocked")
+                return []
+            
+            results = self._parse_results(html)
+            if not results and self.debug:
+                logger.error("No results found in parsed response")
+            
+            return results
+            
+        except CircuitOpenError as e:
+            # Google has been failing or throttling us; skip it until the circuit half-opens
+            logger.warning(str(e))
+            return []
         except Exception as e:
             logger.error(f"Error performing search: {str(e)}", exc_info=True)
             return []
@@ -0,0 +1,354 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.services.ingestion.dedup import paper_key
+from app.services.ranking.engine import normalize_rows, top_k_indices
+
+logger = logging.getLogger(__name__)
+
+# Candidate fields kept alongside each vector
+PAPER_FIELDS = ('title', 'abstract', 'url', 'source', 'categories', 'authors', 'year', 'doi', 'citations')
+
+class LocalPaperIndex:
+    """
+    Approximate nearest-neighbour index over every paper we have ranked.
+    Normalized float32 vectors live in a memory-mapped matrix (row i is
+    paper i) and paper metadata in SQLite. Below train_threshold entries the
+    matrix is scanned exactly; above it an IVF layer (spherical k-means
+    centroids, one posting list per centroid) limits each search to the
+    n_probe closest lists.
+    Several worker processes can share one path: rows are allocated inside
+    a SQLite write transaction, and every search first picks up rows other
+    workers have committed. Centroids are trained on a background thread,
+    off the request path; each process keeps its own posting lists.
+    """
+
+    def __init__(self, path: str, n_lists: int = 64, n_probe: int = 8, train_threshold: Optional[int] = None):
+        self.path = path
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_threshold = train_threshold or n_lists * 32
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._vectors: Optional[np.memmap] = None
+        self.dim: Optional[int] = None
+        self.count = 0
+
+        # IVF state; rebuilt from the matrix on open
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_count = 0
+        self._lists: Dict[int, List[int]] = {}
+        self._assignments: List[int] = []
+        self._trainer: Optional[threading.Thread] = None
+
+        # Metrics
+        self.searches = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, "vectors.f32")
+
+    @property
+    def _centroids_path(self) -> str:
+        return os.path.join(self.path, "centroids.npy")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.path, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.path, "papers.sqlite3"), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS papers ("
+                "row INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, "
+                "metadata TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn = conn
+            self._load(conn)
+        return self._conn
+
+    def _load(self, conn: sqlite3.Connection):
+        """Reopen the matrix and rebuild posting lists from an existing index"""
+        self._refresh(conn)
+        if self.dim is None:
+            return
+
+        if os.path.exists(self._centroids_path):
+            self._centroids = np.load(self._centroids_path)
+            self._trained_count = self.count
+            self._assign_all()
+        logger.info(f"Opened local paper index with {self.count} papers")
+
+    def _refresh(self, conn: sqlite3.Connection):
+        """Catch up with rows committed by other processes sharing the index"""
+        if self.dim is None:
+            row = conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+            if row is None:
+                return
+            self.dim = int(row[0])
+        count = conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM papers").fetchone()[0]
+        if count <= self.count:
+            return
+        # Their writers grew the file before committing, so there is nothing to grow here
+        self._ensure_capacity(count, grow=False)
+        if self._centroids is not None:
+            self._assign(range(self.count, count), self._vectors[self.count:count])
+        self.count = count
+
+    def _ensure_capacity(self, rows: int, grow: bool = True):
+        """Map at least `rows` vectors, growing the file geometrically if allowed"""
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if self._vectors is not None and rows <= capacity:
+            return
+        row_bytes = self.dim * 4
+        capacity = max(rows, 2 * capacity, 1024) if grow else rows
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, "ab") as f:
+            # Only grown under the SQLite write lock, so workers never race to truncate
+            if grow and f.tell() < capacity * row_bytes:
+                f.truncate(capacity * row_bytes)
+            capacity = max(capacity, f.seek(0, os.SEEK_END) // row_bytes)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def add(self, documents: List[Dict], embeddings: np.ndarray, fetched_at: Optional[float] = None):
+        """Insert or refresh papers with their row-aligned embeddings"""
+        if not documents:
+            return
+        vectors = normalize_rows(embeddings)
+        now = fetched_at or time.time()
+
+        with self._lock:
+            conn = self._connect()
+            # Holds the database write lock until commit, so workers sharing the
+            # index can't hand out the same rows
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._refresh(conn)
+                if self.dim is None:
+                    self.dim = vectors.shape[1]
+                    conn.execute("INSERT INTO meta (name, value) VALUES ('dim', ?)", (str(self.dim),))
+                elif vectors.shape[1] != self.dim:
+                    raise ValueError(f"Index holds {self.dim}-d vectors, got {vectors.shape[1]}-d")
+
+                keys = [paper_key(doc) for doc in documents]
+                existing = self._lookup_rows(conn, keys)
+
+                rows = []
+                count = self.count
+                for key in keys:
+                    if key not in existing:
+                        existing[key] = count
+                        count += 1
+                    rows.append(existing[key])
+                self._ensure_capacity(count)
+
+                # Vectors first, so a crash never leaves metadata pointing at garbage
+                self._vectors[rows] = vectors
+                self._vectors.flush()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO papers (row, key, metadata, fetched_at) VALUES (?, ?, ?, ?)",
+                    [
+                        (row, key, json.dumps({field: doc.get(field) for field in PAPER_FIELDS}), now)
+                        for row, key, doc in zip(rows, keys, documents)
+                    ]
+                )
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+            self.count = count
+            if self._centroids is not None:
+                self._assign(rows, vectors)
+            if self._needs_training():
+                self._start_training()
+
+    @staticmethod
+    def _lookup_rows(conn: sqlite3.Connection, keys: List[str]) -> Dict[str, int]:
+        found = {}
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            found.update(conn.execute(
+                f"SELECT key, row FROM papers WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall())
+        return found
+
+    def _needs_training(self) -> bool:
+        """Train centroids once the index is big enough; retrain as it quadruples"""
+        if self.count < self.train_threshold:
+            return False
+        return self._centroids is None or self.count >= 4 * self._trained_count
+
+    def _start_training(self):
+        if self._trainer is not None and self._trainer.is_alive():
+            return
+        self._trainer = threading.Thread(target=self.train, name="local-index-train", daemon=True)
+        self._trainer.start()
+
+    def wait_for_training(self, timeout: Optional[float] = None):
+        """Block until a background training run, if any, has finished"""
+        trainer = self._trainer
+        if trainer is not None:
+            trainer.join(timeout)
+
+    def train(self):
+        """
+        Run k-means over a sample of the current rows and swap in the new
+        centroids. Only the swap holds the index lock, so searches and
+        writes carry on while it runs.
+        """
+        try:
+            with self._lock:
+                count = self.count
+                matrix = self._vectors
+            rng = np.random.default_rng(0)
+            sample = np.asarray(matrix[np.sort(rng.choice(count, size=min(count, self.n_lists * 256), replace=False))])
+            centroids = sample[rng.choice(len(sample), size=self.n_lists, replace=False)].copy()
+            for _ in range(10):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                for list_id in range(self.n_lists):
+                    members = sample[labels == list_id]
+                    if len(members):
+                        centroids[list_id] = members.sum(axis=0)
+                centroids = normalize_rows(centroids)
+            np.save(self._centroids_path, centroids)
+            labels = np.concatenate([
+                np.argmax(matrix[start:min(start + 65536, count)] @ centroids.T, axis=1)
+                for start in range(0, count, 65536)
+            ]).tolist()
+
+            with self._lock:
+                self._centroids = centroids
+                self._trained_count = count
+                self._assignments = labels
+                self._lists = {}
+                for row, label in enumerate(labels):
+                    self._lists.setdefault(label, []).append(row)
+                # Rows added or refreshed while training get assigned against the new centroids
+                self._assign(range(count, self.count), self._vectors[count:self.count])
+            logger.info(f"Trained {self.n_lists} IVF lists over {count} papers")
+        except Exception as e:
+            logger.error(f"Error training local index: {str(e)}")
+
+    def _assign_all(self):
+        self._lists = {}
+        self._assignments = []
+        for start in range(0, self.count, 65536):
+            end = min(start + 65536, self.count)
+            self._assign(range(start, end), self._vectors[start:end])
+
+    def _assign(self, rows, vectors: np.ndarray):
+        labels = np.argmax(vectors @ self._centroids.T, axis=1)
+        for row, label in zip(rows, labels.tolist()):
+            if row < len(self._assignments):
+                old = self._assignments[row]
+                if old == label:
+                    continue
+                self._lists[old].remove(row)
+                self._assignments[row] = label
+            else:
+                self._assignments.append(label)
+            self._lists.setdefault(label, []).append(row)
+
+    def search(self, query_embedding: np.ndarray, k: int) -> List[Tuple[Dict, float, float]]:
+        """(paper, cosine score, fetched_at) of the k nearest papers, best first"""
+        query = normalize_rows(query_embedding)[0]
+        with self._lock:
+            self._refresh(self._connect())
+            self.searches += 1
+            if self.count == 0 or len(query) != self.dim:
+                return []
+
+            if self._centroids is None:
+                candidates = np.arange(self.count)
+                scores = self._vectors[:self.count] @ query
+            else:
+                probes = top_k_indices(self._centroids @ query, self.n_probe)
+                candidates = np.concatenate([
+                    np.asarray(self._lists.get(int(list_id), []), dtype=np.int64) for list_id in probes
+                ])
+                scores = self._vectors[candidates] @ query
+
+            best = top_k_indices(scores, k)
+            rows = [int(candidates[i]) for i in best]
+            if not rows:
+                return []
+            records = dict((row, (metadata, fetched_at)) for row, metadata, fetched_at in self._conn.execute(
+                f"SELECT row, metadata, fetched_at FROM papers WHERE row IN ({','.join('?' * len(rows))})", rows
+            ).fetchall())
+
+        results = []
+        for row, i in zip(rows, best):
+            metadata, fetched_at = records[row]
+            results.append((json.loads(metadata), float(scores[i]), fetched_at))
+        return results
+
+    def lookup(self, query_embedding: np.ndarray, k: int, min_score: float, max_age_seconds: float) -> Optional[List[Dict]]:
+        """
+        Top-k papers if the local index can answer on its own: k results,
+        all scoring at least min_score and fetched within max_age_seconds.
+        Returns None when live sources should be consulted instead.
+        """
+        results = self.search(query_embedding, k)
+        oldest_allowed = time.time() - max_age_seconds
+        if len(results) < k or any(score < min_score or fetched_at < oldest_allowed for _, score, fetched_at in results):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        papers = []
+        for paper, score, _ in results:
+            paper['score'] = score
+            papers.append(paper)
+        return papers
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh(self._connect())
+            return self.count
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": len(self),
+            "ivf_lists": self.n_lists if self._centroids is not None else 0,
+            "searches": self.searches,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+    def close(self):
+        self.wait_for_training()
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._vectors = None
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            # Reopening reloads everything from disk
+            self.dim = None
+            self.count = 0
+            self._centroids = None
+            self._lists = {}
+            self._assignments = []
+
+local_paper_index = LocalPaperIndex(
+    path=settings.LOCAL_INDEX_PATH,
+    n_lists=settings.LOCAL_INDEX_LISTS,
+    n_probe=settings.LOCAL_INDEX_PROBES
+)
@@ -1,36 +1,114 @@
-from typing import List
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
 from pinecone import Pinecone
 from app.config import settings
-from app.schemas.search import ResearchPaper
+from app.schemas.search import ResearchPaper, SearchFilters
 from app.services.embeddings import EmbeddingService
 
+def build_filter(filters: Optional[SearchFilters]) -> Optional[Dict]:
+    """Pinecone metadata filter for the set fields; clauses are ANDed"""
+    if filters is None:
+        return None
+
+    clauses = {}
+    year = {}
+    if filters.year_min is not None:
+        year["$gte"] = filters.year_min
+    if filters.year_max is not None:
+        year["$lte"] = filters.year_max
+    if year:
+        clauses["year"] = year
+    if filters.sources:
+        clauses["source"] = {"$in": filters.sources}
+    if filters.categories:
+        # $in on a list field matches if any element is in the set
+        clauses["categories"] = {"$in": filters.categories}
+    return clauses or None
+
+def to_research_paper(metadata: Dict, score: float) -> ResearchPaper:
+    """ResearchPaper from stored metadata; older records may lack some fields"""
+    return ResearchPaper(
+        title=metadata.get("title", ""),
+        summary=metadata.get("abstract", ""),
+        url=metadata.get("url", ""),
+        confidence=score,
+        source=metadata.get("source", "pinecone"),
+        categories=list(metadata.get("categories") or []),
+        authors=list(metadata.get("authors") or []),
+        year=int(metadata.get("year") or 0)  # Numbers come back from Pinecone as floats
+    )
+
 class SearchService:
-    def __init__(self):
-        self.pc = Pinecone(api_key=settings.PINECONE_API_KEY)
-        self.index = self.pc.Index(settings.PINECONE_INDEX)
-        self.embedding_service = EmbeddingService()
-    
-    async def search(self, query: str) -> List[ResearchPaper]:
-        # Convert query to vector
-        query_vector = self.embedding_service.get_embedding(query)
-        
-        # Search in Pinecone
-        results = self.index.query(
-            vector=query_vector,
-            top_k=3,
+    """
+    Low-latency retrieval of previously ingested papers from Pinecone.
+    Query vectors come from the shared query cache and micro-batcher, and
+    index queries run on a dedicated thread pool over one pooled client.
+    """
+
+    _pool: Optional[ThreadPoolExecutor] = None
+
+    def __init__(self, index=None, embedding_service: Optional[EmbeddingService] = None):
+        if index is None:
+            self.pc = Pinecone(api_key=settings.PINECONE_API_KEY)
+            # pool_threads sizes the client's HTTP connection pool
+            index = self.pc.Index(settings.PINECONE_INDEX, pool_threads=settings.PINECONE_POOL_THREADS)
+        self.index = index
+        self.embedding_service = embedding_service or EmbeddingService()
+
+    @classmethod
+    def _executor(cls) -> ThreadPoolExecutor:
+        if cls._pool is None:
+            cls._pool = ThreadPoolExecutor(
+                max_workers=settings.PINECONE_POOL_THREADS,
+                thread_name_prefix="pinecone-query"
+            )
+        return cls._pool
+
+    async def search(self, query: str, top_k: int = 3, filters: Optional[SearchFilters] = None) -> List[ResearchPaper]:
+        # Convert query to vector (cached, and batched with concurrent queries)
+        query_vector = await self.embedding_service.get_query_embedding_async(query)
+        return await self.search_vector(query_vector, top_k, filters)
+
+    async def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 3,
+        filters: Optional[SearchFilters] = None
+    ) -> List[List[ResearchPaper]]:
+        """
+        Search several queries at once; their vectors share forward passes
+        and their index queries run concurrently
+        """
+        query_vectors = await asyncio.gather(*(
+            self.embedding_service.get_query_embedding_async(query) for query in queries
+        ))
+        return await asyncio.gather(*(
+            self.search_vector(query_vector, top_k, filters) for query_vector in query_vectors
+        ))
+
+    async def search_vector(
+        self,
+        query_vector: List[float],
+        top_k: int = 3,
+        filters: Optional[SearchFilters] = None
+    ) -> List[ResearchPaper]:
+        """Search with an already computed query vector"""
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(self._executor(), partial(
+            self.index.query,
+            vector=list(query_vector),
+            top_k=top_k,
+            filter=build_filter(filters),
             include_metadata=True
-        )
-        
+        ))
+
         # Convert to ResearchPaper objects
-        papers = []
-        for match in results.matches:
-            papers.append(
-                ResearchPaper(
-                    title=match.metadata["title"],
-                    summary=match.metadata["abstract"],
-                    url=match.metadata["url"],
-                    confidence=match.score
-                )
-            )
-        
-        return papers
\ No newline at end of file
+        return [to_research_paper(match.metadata or {}, match.score) for match in results.matches]
+
+    @classmethod
+    def shutdown(cls):
+        if cls._pool is not None:
+            cls._pool.shutdown(wait=False)
+            cls._pool = None
@@ -0,0 +1,79 @@
+import re
+from typing import List, Tuple
+
+# Metadata and boilerplate that leaks into abstracts. Order matters: each
+# pattern runs over the output of the previous one. Every pattern is paired
+# with a lowercase literal that any match must contain, so the (expensive,
+# case-insensitive) pattern only runs when that literal is in the text.
+_NOISE_PATTERNS = [
+    (r'Journal of.*?\d+', 'journal of'),  # Journal references
+    (r'Volume \d+.*?\d+', 'volume '),  # Volume numbers
+    (r'First published:.*?(?=\n|$)', 'first published:'),  # Publication dates
+    (r'https?://\S+', 'http'),  # URLs
+    (r'DOI:.*?(?=\n|$)', 'doi:'),  # DOI references
+    (r'Citations:.*?(?=\n|$)', 'citations:'),  # Citation counts
+    (r'\(e-mail:.*?\)', '(e-mail:'),  # Email addresses
+    (r'Search for more papers.*?(?=\n|$)', 'search for more papers'),  # Search suggestions
+    (r'Please review.*?(?=\n|$)', 'please review'),  # Usage terms
+    (r'Share.*?(?=\n|$)', 'share'),  # Share buttons
+    (r'Copyright.*?(?=\n|$)', 'copyright'),  # Copyright notices
+    (r'\d+\.\s+\w+,\s+\d+', ','),  # Section numbers
+    (r'The Faculty of.*?publications:', 'the faculty of'),  # Dissertation headers
+    (r'The dissertation is based.*?publications:', 'the dissertation is based'),  # Publication lists
+    (r'Professor.*?Dean', 'professor'),  # Administrative text
+    (r'Public defence will.*?\d{4}', 'public defence will'),  # Defense details
+    (r'[A-Z][a-z]++ [A-Z][a-z]++\s+et al\.,?\s+\d{4}', 'et al.'),  # Citation patterns
+    (r'\([A-Za-z\s]+,\s+\d{4}\)', '('),  # Citation patterns
+    (r'Chapter \d+.*?(?=\n|$)', 'chapter '),  # Chapter headers
+    (r'Part [IVX]+.*?(?=\n|$)', 'part '),  # Part headers
+    (r'Preface.*?(?=\n|$)', 'preface'),  # Front matter
+    (r'Acknowledgments.*?(?=\n|$)', 'acknowledgments'),  # Front matter
+    (r'Abstract.*?(?=\n|$)', 'abstract'),  # Abstract headers
+    (r'\*Contributed equally.*?(?=\n|$)', '*contributed equally'),  # Author contributions
+]
+NOISE: List[Tuple[re.Pattern, str]] = [
+    (re.compile(pattern, re.IGNORECASE), trigger) for pattern, trigger in _NOISE_PATTERNS
+]
+
+# Citation markers left after whitespace is collapsed
+CITATIONS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r'\(\d{4}\)'), '('),  # Year citations
+    (re.compile(r'\[[\d,\s]+\]'), '['),  # Numbered citations
+]
+
+MARKUP = re.compile(r'<[^>]+>')
+
+def normalize_whitespace(text: str) -> str:
+    """Collapse runs of whitespace to single spaces and trim the ends"""
+    return " ".join(text.split())
+
+def _remove(text: str, patterns: List[Tuple[re.Pattern, str]]) -> str:
+    # Triggers are compared against lowercased text, which only mirrors
+    # IGNORECASE matching for ASCII; anything else runs every pattern
+    if not text.isascii():
+        for pattern, _ in patterns:
+            text = pattern.sub('', text)
+        return text
+
+    lowered = text.lower()
+    for pattern, trigger in patterns:
+        if trigger in lowered:
+            cleaned = pattern.sub('', text)
+            # A removal can splice a later trigger together, so re-check against the new text
+            if cleaned != text:
+                text = cleaned
+                lowered = text.lower()
+    return text
+
+def strip_abstract_noise(text: str) -> str:
+    """Remove journal metadata, URLs, front matter and citation markers from an abstract"""
+    if not text:
+        return ""
+    text = _remove(text.strip(), NOISE)
+    return _remove(normalize_whitespace(text), CITATIONS).strip()
+
+def strip_markup(text: str) -> str:
+    """Remove XML/JATS/HTML tags and normalize whitespace"""
+    if not text:
+        return ""
+    return normalize_whitespace(MARKUP.sub('', text))
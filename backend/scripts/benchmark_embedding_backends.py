@@ -0,0 +1,100 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import numpy as np
+from app.config import settings
+from app.services.inference.backends import BACKENDS, cosine_drift
+from app.services.inference.registry import ModelRegistry
+
+# Paper-like texts (title + abstract) similar to what the ranking stage embeds
+SAMPLE_TEXTS = [
+    "Social Bonds in Cattle: Evidence for Emotional Connections This study demonstrates that cattle form strong emotional bonds with other herd members. Through behavioral observations and physiological measurements, we found evidence of stress responses when bonded pairs were separated.",
+    "Understanding Bovine Social Networks Analysis of cattle social networks reveals complex relationships and hierarchies. This research shows that cows maintain consistent friendships over extended periods.",
+    "Attention Is All You Need The dominant sequence transduction models are based on complex recurrent or convolutional neural networks. We propose a new simple network architecture, the Transformer, based solely on attention mechanisms.",
+    "Quantum Supremacy Using a Programmable Superconducting Processor We report the use of a processor with programmable superconducting qubits to create quantum states on 53 qubits, occupying a state space of dimension 2^53.",
+    "Mindfulness-Based Stress Reduction for Healthy Individuals A meta-analysis of randomized controlled trials shows moderate effects of mindfulness programs on stress, anxiety and quality of life in non-clinical populations.",
+    "Graph Contrastive Learning with Augmentations We propose a graph contrastive learning framework for learning unsupervised representations of graph data, with four types of graph augmentations incorporating various priors.",
+    "Plant Communication via Volatile Organic Compounds Plants damaged by herbivores release volatile compounds that prime defenses in neighbouring plants, suggesting a form of airborne signalling between individuals.",
+    "Effects of Homeschooling on Academic Achievement Using longitudinal data we compare standardized test outcomes of homeschooled and traditionally schooled students after controlling for family background.",
+]
+
+def benchmark_backend(model_name: str, backend: str, texts, batch_size: int, repeats: int):
+    registry = ModelRegistry()
+    load_start = time.perf_counter()
+    model = registry.get(model_name, backend)
+    load_time = time.perf_counter() - load_start
+
+    # Warm up so one-off graph/kernel setup is excluded from latency
+    model.encode(texts[:batch_size], batch_size=batch_size, convert_to_numpy=True)
+
+    latencies = []
+    embeddings = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        embeddings = model.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+        latencies.append(time.perf_counter() - start)
+
+    single_latencies = []
+    for text in texts[:min(len(texts), 16)]:
+        start = time.perf_counter()
+        model.encode(text, convert_to_numpy=True)
+        single_latencies.append(time.perf_counter() - start)
+
+    return {
+        "backend": backend,
+        "load_s": load_time,
+        "memory_mb": registry.memory_usage()[f"{model_name}:{backend}"] / 1e6,
+        "batch_p50_ms": statistics.median(latencies) * 1000,
+        "texts_per_s": len(texts) / statistics.median(latencies),
+        "single_p50_ms": statistics.median(single_latencies) * 1000,
+        "embeddings": np.asarray(embeddings, dtype=np.float32),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare latency, memory and parity of embedding backends")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--texts", type=int, default=128, help="Number of texts per timed run")
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] + f" ({i})" for i in range(args.texts)]
+
+    results = []
+    for backend in args.backends:
+        print(f"Benchmarking {backend}...")
+        try:
+            results.append(benchmark_backend(args.model, backend, texts, args.batch_size, args.repeats))
+        except Exception as e:
+            print(f"  skipped: {str(e)}")
+
+    if not results:
+        return
+
+    reference = next((r for r in results if r["backend"] == "torch"), results[0])
+    print(f"\nParity is measured against the '{reference['backend']}' backend\n")
+    print(f"{'backend':<12}{'load s':>8}{'mem MB':>10}{'batch p50 ms':>14}{'texts/s':>10}{'single p50 ms':>15}{'min cos':>10}{'max drift':>11}")
+    for result in results:
+        parity = cosine_drift(reference["embeddings"], result["embeddings"])
+        print(
+            f"{result['backend']:<12}"
+            f"{result['load_s']:>8.1f}"
+            f"{result['memory_mb']:>10.0f}"
+            f"{result['batch_p50_ms']:>14.1f}"
+            f"{result['texts_per_s']:>10.1f}"
+            f"{result['single_p50_ms']:>15.1f}"
+            f"{parity['min_cosine']:>10.4f}"
+            f"{parity['max_drift']:>11.2e}"
+        )
+
+if __name__ == "__main__":
+    main()
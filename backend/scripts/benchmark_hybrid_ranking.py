@@ -0,0 +1,119 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.ingestion.dedup import PaperDeduplicator
+from app.services.ingestion.pipeline import SearchPipeline
+from app.services.ranking.bm25 import BM25Index, reciprocal_rank_fusion
+from app.services.ranking.engine import RankingEngine, top_k_indices
+
+QUERIES = [
+    "bovine social behavior",
+    "quantum error correction",
+    "graph neural networks for drug discovery",
+    "mindfulness meditation stress reduction",
+    "plant communication volatile organic compounds",
+]
+
+def doc_text(doc):
+    return f"{doc['title']} {(doc['abstract'] or '')[:1000]}"
+
+def rank_dense(pipeline, query_embedding, arrivals, top_k):
+    """Dense-only ranking: embed every candidate"""
+    documents = [doc for _, docs in arrivals for doc in docs]
+    start = time.perf_counter()
+    embeddings = pipeline.embedding_service.get_embeddings([doc_text(doc) for doc in documents])
+    embed_time = time.perf_counter() - start
+
+    engine = RankingEngine(query_embedding)
+    engine.add(documents, embeddings)
+    return [doc['url'] for doc in engine.top_k(top_k)], len(documents), embed_time
+
+def rank_hybrid(pipeline, query, query_embedding, arrivals, top_k, limit, rrf_k):
+    """Hybrid ranking: BM25-prune each source to `limit`, embed survivors, fuse with RRF"""
+    lexical = BM25Index()
+    start = time.perf_counter()
+    survivors = []
+    for _, docs in arrivals:
+        lexical.add(docs)
+        if len(docs) > limit:
+            keep = top_k_indices(lexical.score(query, docs), limit)
+            docs = [docs[i] for i in sorted(keep)]
+        survivors.extend(docs)
+    prune_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    embeddings = pipeline.embedding_service.get_embeddings([doc_text(doc) for doc in survivors])
+    embed_time = time.perf_counter() - start
+
+    engine = RankingEngine(query_embedding)
+    engine.add(survivors, embeddings)
+    fused = reciprocal_rank_fusion(engine.scores, lexical.score(query, engine.documents), k=rrf_k)
+    return [doc['url'] for doc in engine.top_k(top_k, order_by=fused)], len(survivors), prune_time + embed_time
+
+async def fetch_candidates(pipeline, query):
+    deduplicator = PaperDeduplicator()
+    arrivals = []
+    async for source_name, documents in pipeline._stream_from_all_sources(query):
+        documents = deduplicator.add(documents)
+        if documents:
+            arrivals.append((source_name, documents))
+    return arrivals
+
+async def main():
+    parser = argparse.ArgumentParser(description="Latency saved vs rank agreement of hybrid BM25 + dense ranking")
+    parser.add_argument("--limits", type=int, nargs="+", default=[10, 25, 40], help="Values of M to compare")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--rrf-k", type=int, default=60)
+    args = parser.parse_args()
+
+    pipeline = SearchPipeline()
+    # Warm up the model so the first query isn't charged for lazy initialization
+    pipeline.embedding_service.get_embeddings(["warm up"])
+
+    totals = {limit: {"saved": 0.0, "dense": 0.0, "overlap": 0.0, "top1": 0} for limit in args.limits}
+    measured = 0
+    for query in QUERIES:
+        arrivals = await fetch_candidates(pipeline, query)
+        if not arrivals:
+            print(f"\n{query}: no candidates, skipped")
+            continue
+        measured += 1
+
+        query_embedding = pipeline.embedding_service.get_embedding(query)
+        dense_top, dense_count, dense_time = rank_dense(pipeline, query_embedding, arrivals, args.top_k)
+
+        print(f"\n{query}: {dense_count} candidates, dense-only embedding {dense_time * 1000:.0f} ms")
+        print(f"{'M':>5}{'embedded':>10}{'ms':>8}{'saved':>8}{'overlap@k':>11}{'top-1':>7}")
+        for limit in args.limits:
+            hybrid_top, count, hybrid_time = rank_hybrid(
+                pipeline, query, query_embedding, arrivals, args.top_k, limit, args.rrf_k
+            )
+            overlap = len(set(hybrid_top) & set(dense_top)) / max(len(dense_top), 1)
+            top1 = bool(hybrid_top and dense_top and hybrid_top[0] == dense_top[0])
+            saved = 1 - hybrid_time / dense_time if dense_time else 0.0
+            print(f"{limit:>5}{count:>10}{hybrid_time * 1000:>8.0f}{saved:>8.0%}{overlap:>11.2f}{'yes' if top1 else 'no':>7}")
+
+            totals[limit]["saved"] += dense_time - hybrid_time
+            totals[limit]["dense"] += dense_time
+            totals[limit]["overlap"] += overlap
+            totals[limit]["top1"] += top1
+
+    skipped = len(QUERIES) - measured
+    print(f"\nSummary over {measured} measured queries ({skipped} skipped for having no candidates)")
+    if not measured:
+        return
+    print(f"{'M':>5}{'latency saved':>15}{'mean overlap@k':>16}{'top-1 agreement':>17}")
+    for limit, total in totals.items():
+        saved = total["saved"] / total["dense"] if total["dense"] else 0.0
+        print(f"{limit:>5}{saved:>15.0%}{total['overlap'] / measured:>16.2f}{total['top1'] / measured:>17.0%}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.ingestion.sources.open_alex import reconstruct_abstract, reconstruct_abstract_json
+from tests.test_open_alex import legacy_convert, random_inverted_index
+
+def best_time(fn, items, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items)
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAlex abstract reconstruction: sorted pairs vs slot array")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[200, 1000, 5000], help="Abstract lengths in words")
+    parser.add_argument("--works", type=int, default=100, help="Works per length, as in one OpenAlex page")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'words':>7}{'sorted us':>11}{'slots us':>10}{'speedup':>9}{'json+sorted':>13}{'from bytes':>12}{'speedup':>9}")
+    for length in args.lengths:
+        indexes = [random_inverted_index(rng, length, gaps=True) for _ in range(args.works)]
+        raws = [json.dumps(index).encode() for index in indexes]
+        assert all(reconstruct_abstract(index) == legacy_convert(index) for index in indexes)
+
+        before = best_time(legacy_convert, indexes, args.rounds)
+        after = best_time(reconstruct_abstract, indexes, args.rounds)
+        raw_before = best_time(lambda raw: legacy_convert(json.loads(raw)), raws, args.rounds)
+        raw_after = best_time(reconstruct_abstract_json, raws, args.rounds)
+        print(f"{length:>7}{before * 1e6:>11.0f}{after * 1e6:>10.0f}{before / after:>8.1f}x"
+              f"{raw_before * 1e6:>13.0f}{raw_after * 1e6:>12.0f}{raw_before / raw_after:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
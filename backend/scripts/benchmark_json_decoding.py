@@ -0,0 +1,58 @@
+import argparse
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.ingestion.decoding import BACKENDS, ResponseDecoder, orjson
+from app.services.ingestion.sources.crossref import CrossrefResponse
+from app.services.ingestion.sources.open_alex import OpenAlexConnector, OpenAlexResponse
+from app.services.ingestion.sources.semantic_scholar import SemanticScholarConnector, SemanticScholarResponse
+from tests.fixtures.payloads import crossref_payload, open_alex_payload, semantic_scholar_payload
+
+def best_ms(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def load_payload(payload_dir, name, build, works):
+    """A recorded response body if one was saved as <payload_dir>/<name>.json, else a built one"""
+    path = os.path.join(payload_dir or "", f"{name}.json")
+    if payload_dir and os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read(), "recorded"
+    return build(works), "built"
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-connector response decoding: stdlib dicts vs typed structs")
+    parser.add_argument("--payload-dir", help="Directory of recorded open_alex.json, crossref.json, semantic_scholar.json")
+    parser.add_argument("--works", type=int, default=100, help="Works per built payload")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    open_alex = OpenAlexConnector()
+    scholar = SemanticScholarConnector()
+    connectors = [
+        ("open_alex", open_alex_payload, OpenAlexResponse, lambda r: open_alex._to_papers(r)),
+        ("crossref", crossref_payload, CrossrefResponse, None),
+        ("semantic_scholar", semantic_scholar_payload, SemanticScholarResponse, lambda r: scholar._to_papers(r.data)),
+    ]
+    backends = [backend for backend in BACKENDS if backend != "orjson" or orjson is not None]
+
+    for name, build, response_type, to_papers in connectors:
+        raw, origin = load_payload(args.payload_dir, name, build, args.works)
+        print(f"\n{name}: {len(raw) / 1024:.0f} KB {origin} payload")
+        print(f"{'decoder':<22}{'decode ms':>11}{'+ papers ms':>13}")
+        print(f"{'json.loads (dicts)':<22}{best_ms(lambda: json.loads(raw), args.rounds):>11.2f}{'':>13}")
+        for backend in backends:
+            decoder = ResponseDecoder(response_type, backend)
+            decode = best_ms(lambda: decoder.decode(raw), args.rounds)
+            full = best_ms(lambda: to_papers(decoder.decode(raw)), args.rounds) if to_papers else None
+            print(f"{backend + ' (structs)':<22}{decode:>11.2f}{f'{full:.2f}' if full is not None else '-':>13}")
+
+if __name__ == "__main__":
+    main()
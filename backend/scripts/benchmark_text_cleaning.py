@@ -0,0 +1,40 @@
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.text import strip_abstract_noise, strip_markup
+from tests.fixtures.payloads import load_corpus
+from tests.test_text import legacy_clean_abstract, legacy_strip_markup
+
+def throughput(clean, texts, rounds):
+    """Abstracts cleaned per second, best of `rounds` passes over the corpus"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for text in texts:
+            clean(text)
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best
+
+def main():
+    parser = argparse.ArgumentParser(description="Abstract cleaning throughput before and after the shared text module")
+    parser.add_argument("--repeat", type=int, default=20, help="Copies of the fixture corpus per pass")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    print(f"{'cleaner':<12}{'abstracts':>10}{'before/s':>12}{'after/s':>12}{'speedup':>9}")
+    for name, texts, before, after in [
+        ("open_alex", corpus["open_alex"], legacy_clean_abstract, strip_abstract_noise),
+        ("crossref", corpus["crossref"], legacy_strip_markup, strip_markup),
+    ]:
+        assert all(before(text) == after(text) for text in texts), f"{name}: outputs differ"
+        texts = texts * args.repeat
+        old = throughput(before, texts, args.rounds)
+        new = throughput(after, texts, args.rounds)
+        print(f"{name:<12}{len(texts):>10}{old:>12,.0f}{new:>12,.0f}{new / old:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
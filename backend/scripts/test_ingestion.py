@@ -15,13 +15,21 @@ sample_papers = [
         "id": "paper1",
         "title": "Social Bonds in Cattle: Evidence for Emotional Connections",
         "abstract": "This study demonstrates that cattle form strong emotional bonds with other herd members. Through behavioral observations and physiological measurements, we found evidence of stress responses when bonded pairs were separated.",
-        "url": "https://example.com/paper1"
+        "url": "https://example.com/paper1",
+        "source": "example",
+        "categories": ["Animal Behavior"],
+        "authors": ["Jane Doe"],
+        "year": 2021
     },
     {
         "id": "paper2",
         "title": "Understanding Bovine Social Networks",
         "abstract": "Analysis of cattle social networks reveals complex relationships and hierarchies. This research shows that cows maintain consistent friendships over extended periods.",
-        "url": "https://example.com/paper2"
+        "url": "https://example.com/paper2",
+        "source": "example",
+        "categories": ["Animal Behavior", "Network Science"],
+        "authors": ["John Roe"],
+        "year": 2023
     }
 ]
 
@@ -2,11 +2,11 @@ import asyncio
 import sys
 import os
 from datetime import datetime
-import aiohttp
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.services.ingestion.pipeline import SearchPipeline
+from app.services.http.pool import http_pool
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -49,21 +49,8 @@ async def main():
         print(f"Error during pipeline execution: {str(e)}")
         raise
     finally:
-        # Close any remaining sessions
-        for task in asyncio.all_tasks():
-            if not task.done():
-                task.cancel()
-        
-        # Close aiohttp sessions
-        for attr in dir(pipeline):
-            obj = getattr(pipeline, attr)
-            if isinstance(obj, aiohttp.ClientSession):
-                await obj.close()
-        
-        # Close sessions in connectors
-        for connector in pipeline.sources.values():
-            if hasattr(connector, 'session') and isinstance(connector.session, aiohttp.ClientSession):
-                await connector.session.close()
+        await pipeline.close()
+        await http_pool.close()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
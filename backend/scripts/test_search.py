@@ -7,6 +7,7 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+from app.schemas.search import SearchFilters
 from app.services.search.search import SearchService
 
 async def main():
@@ -29,5 +30,10 @@ async def main():
             print(f"Confidence: {paper.confidence:.2f}")
             print(f"Summary: {paper.summary[:200]}...")
 
+    # Restrict to recent papers from one source
+    filters = SearchFilters(year_min=2020, sources=["example"])
+    for query, results in zip(queries, await search_service.search_many(queries, filters=filters)):
+        print(f"\n{query} (2020+, example only): {[paper.title for paper in results]}")
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
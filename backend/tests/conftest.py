@@ -0,0 +1,29 @@
+import httpx
+from pytest_asyncio import fixture
+from app.services.http.health import HealthTransport
+from app.services.http.pool import http_pool
+from app.services.ingestion.sources.base import BaseSourceConnector
+
+@fixture
+async def mock_http(monkeypatch):
+    """
+    Serves the shared HTTP client from a handler instead of the network.
+    Call it with the handler (and optionally a HealthTracker to put in
+    front); connectors skip their rate limit waits.
+    """
+    clients = []
+
+    def serve(handler, tracker=None) -> httpx.AsyncClient:
+        transport = httpx.MockTransport(handler)
+        client = httpx.AsyncClient(transport=HealthTransport(transport, tracker) if tracker else transport)
+        monkeypatch.setattr(http_pool, "client", lambda: client)
+        clients.append(client)
+        return client
+
+    async def no_wait(self):
+        pass
+
+    monkeypatch.setattr(BaseSourceConnector, "rate_limit_wait", no_wait)
+    yield serve
+    for client in clients:
+        await client.aclose()
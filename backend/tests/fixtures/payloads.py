@@ -0,0 +1,87 @@
+"""Response bodies in the shapes the source APIs return, built from real abstracts"""
+import json
+import os
+import random
+from typing import List
+
+CORPUS = os.path.join(os.path.dirname(__file__), "abstracts.json")
+
+def load_corpus():
+    with open(CORPUS, encoding="utf-8") as f:
+        return json.load(f)
+
+def abstracts(n: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    corpus = load_corpus()["open_alex"]
+    return [rng.choice(corpus) for _ in range(n)]
+
+def open_alex_payload(n: int = 100) -> bytes:
+    """A /works page in the shape OpenAlex returns for the connector's search field profile"""
+    results = []
+    for i, abstract in enumerate(abstracts(n)):
+        inverted_index = {}
+        for pos, word in enumerate(abstract.split()):
+            inverted_index.setdefault(word, []).append(pos)
+        results.append({
+            'id': f"https://openalex.org/W{4000000 + i}",
+            'doi': f"https://doi.org/10.1000/oa.{i}",
+            'title': f"Work {i}: {abstract[:60]}",
+            'publication_year': 2000 + i % 25,
+            'type': "article",
+            'cited_by_count': i * 3,
+            'authorships': [{
+                'author_position': "first" if a == 0 else "middle",
+                'author': {'id': f"https://openalex.org/A{i}{a}", 'display_name': f"Author {a}", 'orcid': None},
+                'institutions': [{'id': "https://openalex.org/I1", 'display_name': "University", 'ror': None, 'country_code': "GB", 'type': "education"}],
+                'countries': ["GB"],
+                'is_corresponding': a == 0,
+                'raw_author_name': f"Author {a}",
+                'raw_affiliation_strings': ["Department of Animal Science, University"]
+            } for a in range(4)],
+            'primary_topic': {
+                'id': "https://openalex.org/T10001", 'display_name': "Animal Behavior and Welfare", 'score': 0.99,
+                'subfield': {'id': "https://openalex.org/subfields/1103", 'display_name': "Animal Science and Zoology"},
+                'field': {'id': "https://openalex.org/fields/11", 'display_name': "Agricultural and Biological Sciences"},
+                'domain': {'id': "https://openalex.org/domains/1", 'display_name': "Life Sciences"}
+            },
+            'abstract_inverted_index': inverted_index
+        })
+    return json.dumps({'meta': {'count': 12345, 'db_response_time_ms': 48, 'page': 1, 'per_page': n, 'groups_count': None},
+                       'results': results, 'group_by': []}).encode()
+
+def crossref_payload(n: int = 100) -> bytes:
+    """A /works page in the shape Crossref returns for the connector's ingestion field profile"""
+    items = []
+    for i, abstract in enumerate(abstracts(n, seed=1)):
+        items.append({
+            'DOI': f"10.1000/cr.{i}",
+            'title': [f"Work {i}"],
+            'abstract': f"<jats:p>{abstract}</jats:p>",
+            'author': [{'given': "Jane", 'family': f"Doe {a}", 'sequence': "first", 'affiliation': [{'name': "University"}]}
+                       for a in range(4)],
+            'published-print': {'date-parts': [[2000 + i % 25, 1, 1]]},
+            'type': "journal-article",
+            'reference': [{'key': f"ref{r}", 'doi-asserted-by': "crossref", 'DOI': f"10.9999/{r}", 'unstructured': "A reference"}
+                          for r in range(25)],
+            'is-referenced-by-count': i
+        })
+    return json.dumps({'status': "ok", 'message-type': "work-list", 'message-version': "1.0.0",
+                       'message': {'facets': {}, 'total-results': 9876, 'items': items, 'items-per-page': n, 'query': {}}}).encode()
+
+def semantic_scholar_payload(n: int = 100) -> bytes:
+    """A /paper/search page in the shape Semantic Scholar returns for the connector's ingestion field profile"""
+    data = []
+    for i, abstract in enumerate(abstracts(n, seed=2)):
+        data.append({
+            'paperId': f"{i:040x}",
+            'externalIds': {'DOI': f"10.1000/s2.{i}", 'CorpusId': 100000 + i, 'MAG': str(i)},
+            'url': f"https://www.semanticscholar.org/paper/{i:040x}",
+            'title': f"Paper {i}",
+            'abstract': abstract,
+            'year': 2000 + i % 25,
+            'citationCount': i * 2,
+            'fieldsOfStudy': ["Biology", "Medicine"],
+            'publicationTypes': ["JournalArticle"],
+            'authors': [{'authorId': str(a), 'name': f"Author {a}"} for a in range(4)]
+        })
+    return json.dumps({'total': 5000, 'offset': 0, 'next': n, 'data': data}).encode()
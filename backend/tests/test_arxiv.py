@@ -2,10 +2,13 @@ import pytest
 import asyncio
 from datetime import datetime
 from unittest.mock import patch
-from app.services.ingestion.sources.arxiv import ArxivConnector
+import httpx
+from app.services.ingestion.sources.arxiv import ArxivConnector, AtomFeedParser
+from app.services.http.health import HealthTracker
 from pytest_asyncio import fixture
 from typing import List, Dict, Any
 from app.schemas.paper import Paper, PaperMetadata
+from app.services.http.rate_limit import RateLimiter
 
 class MockSettings:
     ARXIV_RATE_LIMIT = 0.1  # Faster rate limit for testing
@@ -13,11 +16,14 @@ class MockSettings:
 @fixture
 async def arxiv_connector():
     """
-    Fixture that provides an ArxivConnector instance with mock settings
+    Fixture that provides an ArxivConnector instance with mock settings,
+    rate limited at the mocked interval
     """
     with patch('app.services.ingestion.sources.arxiv.settings', MockSettings()):
         connector = ArxivConnector()
-        return connector
+    limiter = RateLimiter({"export.arxiv.org": MockSettings.ARXIV_RATE_LIMIT})
+    with patch('app.services.ingestion.sources.base.rate_limiter', limiter):
+        yield connector
 
 @pytest.mark.asyncio
 async def test_fetch_papers_basic(arxiv_connector):
@@ -84,17 +90,15 @@ async def test_metadata_structure(arxiv_connector):
 
 @pytest.mark.asyncio
 async def test_rate_limiting(arxiv_connector):
-    """Test that rate limiting is respected"""
+    """Test that back-to-back requests are spaced by the shared rate limit"""
+    await arxiv_connector.fetch_papers("physics", max_results=3)
     start_time = datetime.now()
     
-    # Fetch multiple results to trigger rate limiting
+    # The first request used the budget, so this one has to wait for a token
     results = await arxiv_connector.fetch_papers("physics", max_results=3)
     
-    end_time = datetime.now()
-    time_taken = (end_time - start_time).total_seconds()
-    
-    # Should take at least 0.2 seconds (3 results * 0.1 second mock rate limit)
-    assert time_taken >= 0.2
+    time_taken = (datetime.now() - start_time).total_seconds()
+    assert time_taken >= MockSettings.ARXIV_RATE_LIMIT
     assert len(results) == 3
 
 @pytest.mark.asyncio
@@ -116,3 +120,110 @@ async def test_concurrent_requests(arxiv_connector):
     for result in results:
         assert isinstance(result, list)
         assert len(result) <= 2
+
+
+def make_feed(start: int, count: int, total: int) -> bytes:
+    entries = "".join(f"""
+  <entry>
+    <id>http://arxiv.org/abs/2401.{i:05d}v1</id>
+    <published>2024-01-02T03:04:05Z</published>
+    <title>Paper
+      number {i}</title>
+    <summary>  Abstract {i}.
+    </summary>
+    <author><name>Ada Lovelace</name></author>
+    <author><name>Alan Turing</name></author>
+    <arxiv:doi>10.1000/{i}</arxiv:doi>
+    <category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="stat.ML" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>""" for i in range(start, start + count))
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <opensearch:totalResults>{total}</opensearch:totalResults>{entries}
+</feed>""".encode()
+
+@fixture
+async def mock_arxiv(mock_http):
+    """
+    Serves paged feeds from a mock transport instead of the export API
+    """
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(dict(request.url.params))
+        start, count = int(request.url.params['start']), int(request.url.params['max_results'])
+        return httpx.Response(200, content=make_feed(start, min(count, max(0, 25 - start)), total=25))
+
+    mock_http(handler)
+    return ArxivConnector(), requests
+
+def test_feed_parser_handles_arbitrary_chunks():
+    """Test that entries split across chunks parse into the same Papers"""
+    feed = make_feed(0, 3, total=3)
+    parser = AtomFeedParser()
+    papers = []
+    for i in range(0, len(feed), 7):
+        papers.extend(parser.feed(feed[i:i + 7]))
+
+    assert parser.total_results == 3
+    assert len(papers) == 3
+    paper = papers[1]
+    assert paper.title == "Paper number 1"
+    assert paper.url == "http://arxiv.org/abs/2401.00001v1"
+    assert paper.metadata.abstract == "Abstract 1."
+    assert paper.metadata.authors == ["Ada Lovelace", "Alan Turing"]
+    assert paper.metadata.categories == ["cs.LG", "stat.ML"]
+    assert paper.metadata.doi == "10.1000/1"
+    assert paper.metadata.year == 2024
+    assert isinstance(paper.metadata.published_date, datetime)
+
+@pytest.mark.asyncio
+async def test_fetch_pages_stops_at_total(mock_arxiv):
+    """Test paging for ingestion-sized pulls"""
+    connector, requests = mock_arxiv
+
+    pages = [page async for page in connector.fetch_pages("physics", max_results=100, page_size=10)]
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [r['start'] for r in requests] == ['0', '10', '20']
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_slow_response(mock_http, monkeypatch):
+    """Test that a stalled response is abandoned at the deadline without blocking the loop"""
+    async def stalled_body():
+        feed = make_feed(0, 2, total=2)
+        yield feed[:feed.rindex(b"</entry>") + len(b"</entry>")]
+        await asyncio.sleep(10)
+
+    mock_http(lambda request: httpx.Response(200, content=stalled_body()))
+    connector = ArxivConnector()
+    monkeypatch.setattr(connector, "request_timeout", lambda: 0.2)
+
+    start = asyncio.get_running_loop().time()
+    ticker = asyncio.create_task(asyncio.sleep(0.05))
+    papers = await connector.fetch_papers("physics", max_results=5)
+
+    assert asyncio.get_running_loop().time() - start < 1.0
+    assert ticker.done()
+    assert len(papers) == 2  # Entries parsed before the deadline are kept
+
+@pytest.mark.asyncio
+async def test_deadline_counts_against_arxiv_and_starts_after_rate_limit(mock_http, monkeypatch):
+    """Test that a page cut off at the deadline is an arXiv failure, and queueing doesn't use the deadline"""
+    async def stalled_body():
+        yield make_feed(0, 2, total=2)
+        await asyncio.sleep(10)
+
+    async def slow_wait():
+        await asyncio.sleep(0.3)
+
+    tracker = HealthTracker(default_timeout=30.0)
+    mock_http(lambda request: httpx.Response(200, content=stalled_body()), tracker)
+    connector = ArxivConnector()
+    monkeypatch.setattr(connector, "request_timeout", lambda: 0.2)
+    monkeypatch.setattr(connector, "rate_limit_wait", slow_wait)
+
+    papers = await connector.fetch_papers("physics", max_results=5)
+
+    assert len(papers) == 2
+    assert tracker.upstream("export.arxiv.org").stats()['failures'] == 1
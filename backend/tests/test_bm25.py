@@ -0,0 +1,44 @@
+import numpy as np
+from app.services.ranking.bm25 import BM25Index, reciprocal_rank_fusion, tokenize
+
+DOCS = [
+    {'title': "Social bonds in cattle", 'abstract': "Cows form stable friendships within the herd."},
+    {'title': "Quantum error correction", 'abstract': "Surface codes protect logical qubits."},
+    {'title': "Cattle grazing and pasture", 'abstract': "Grazing pressure of cattle on grassland soils."},
+]
+
+def test_tokenize():
+    """Test lowercasing, stopword and single-character removal"""
+    assert tokenize("The Social Bonds of a Cow (2024)") == ["social", "bonds", "cow", "2024"]
+
+def test_relevant_documents_score_higher():
+    """Test that documents matching more query terms rank first"""
+    index = BM25Index()
+    index.add(DOCS)
+
+    scores = index.score("cattle social bonds", DOCS)
+
+    assert scores[0] > scores[2] > scores[1]
+    assert scores[1] == 0
+
+def test_incremental_statistics():
+    """Test that scores use statistics of every document added so far"""
+    index = BM25Index()
+    index.add(DOCS[:1])
+    alone = index.score("cattle", DOCS[:1])[0]
+    index.add(DOCS[2:])
+
+    # "cattle" is now in every document, so it is less discriminative
+    assert index.score("cattle", DOCS[:1])[0] < alone
+    assert len(index) == 2
+
+def test_reciprocal_rank_fusion():
+    """Test RRF ordering and that an all-tied list doesn't reorder"""
+    dense = np.array([0.9, 0.5, 0.1])
+    lexical = np.array([0.0, 3.0, 1.0])
+
+    fused = reciprocal_rank_fusion(dense, lexical, k=60)
+    assert np.argmax(fused) == 1  # ranks 2 + 1 beat ranks 1 + 3
+
+    untouched = reciprocal_rank_fusion(dense, np.zeros(3), k=60)
+    assert list(np.argsort(-untouched)) == [0, 1, 2]
@@ -0,0 +1,29 @@
+from app.orchestration.budget import LatencyBudget
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_stage_deadlines_are_cumulative_shares():
+    """Test that each stage's deadline is a share of the total from the start"""
+    clock = FakeClock()
+    budget = LatencyBudget(10.0, clock=clock)
+
+    assert budget.deadline(0.6) == 106.0
+    assert budget.deadline() == 110.0
+
+def test_remaining_counts_down_and_stops_at_zero():
+    """Test that remaining time shrinks with the clock and never goes negative"""
+    clock = FakeClock()
+    budget = LatencyBudget(10.0, clock=clock)
+
+    clock.now += 4.0
+    assert budget.elapsed() == 4.0
+    assert budget.remaining() == 6.0
+    assert budget.remaining(0.6) == 2.0
+
+    clock.now += 3.0
+    assert budget.remaining(0.6) == 0.0
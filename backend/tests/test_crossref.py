@@ -1,8 +1,9 @@
 import pytest
+import httpx
 from app.services.ingestion.sources.crossref import CrossrefConnector
 from pytest_asyncio import fixture
 from typing import List, Dict
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock
 
 class MockSettings:
     CROSSREF_EMAIL = "test@example.com"
@@ -13,9 +14,7 @@ async def crossref_connector():
     """Fixture that provides a CrossrefConnector instance"""
     with patch('app.services.ingestion.sources.crossref.settings', MockSettings()):
         connector = CrossrefConnector()
-        yield connector
-        if connector.session:
-            await connector.session.close()
+        return connector
 
 @pytest.mark.asyncio
 async def test_real_crossref_search(crossref_connector):
@@ -61,12 +60,8 @@ async def test_crossref_error_handling(crossref_connector):
     """Test error handling with invalid queries"""
     # Mock empty query response
     empty_response = {'message': {'items': []}}
-    with patch('aiohttp.ClientSession.get') as mock_get:
-        mock_response = MagicMock()
-        mock_response.status = 200
-        mock_response.__aenter__.return_value = mock_response
-        mock_response.json.return_value = empty_response
-        mock_get.return_value = mock_response
+    with patch('httpx.AsyncClient.get', new_callable=AsyncMock) as mock_get:
+        mock_get.return_value = httpx.Response(200, json=empty_response)
         
         # Test with empty query
         results = await crossref_connector.fetch_papers("", max_results=5)
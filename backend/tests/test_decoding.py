@@ -0,0 +1,50 @@
+import pytest
+from app.services.ingestion.decoding import BACKENDS, ResponseDecoder, loads, resolve_backend
+from app.services.ingestion.sources.crossref import CrossrefResponse
+from app.services.ingestion.sources.open_alex import OpenAlexConnector, OpenAlexResponse
+from app.services.ingestion.sources.semantic_scholar import SemanticScholarConnector, SemanticScholarResponse
+from tests.fixtures.payloads import crossref_payload, open_alex_payload, semantic_scholar_payload
+
+PAYLOADS = [
+    (OpenAlexResponse, open_alex_payload),
+    (CrossrefResponse, crossref_payload),
+    (SemanticScholarResponse, semantic_scholar_payload),
+]
+
+@pytest.mark.parametrize("response_type,payload", PAYLOADS)
+def test_backends_decode_identically(response_type, payload):
+    """Test every backend produces the same typed response"""
+    raw = payload(20)
+    decoded = [ResponseDecoder(response_type, backend).decode(raw) for backend in BACKENDS]
+    assert decoded[0] == decoded[1] == decoded[2]
+
+def test_decodes_renamed_fields():
+    """Test Crossref's hyphenated keys map onto struct fields"""
+    work = ResponseDecoder(CrossrefResponse).decode(crossref_payload(2)).message.items[1]
+    assert work.is_referenced_by_count == 1
+    assert work.published_print.date_parts == [[2001, 1, 1]]
+
+def test_connectors_map_decoded_structs_to_papers():
+    """Test decoded structs become the same Papers as validated construction would"""
+    open_alex = OpenAlexConnector()
+    papers = open_alex._to_papers(open_alex.decoder.decode(open_alex_payload(5)))
+    # Abstracts that clean down to under 50 characters are dropped
+    assert 0 < len(papers) <= 5
+    assert papers[0].metadata.authors == ["Author 0", "Author 1", "Author 2", "Author 3"]
+    assert papers[0].metadata.categories == [
+        "Animal Behavior and Welfare", "Animal Science and Zoology", "Agricultural and Biological Sciences"
+    ]
+    assert papers[0].url == "https://doi.org/10.1000/oa.0" and papers[0].metadata.doi == "10.1000/oa.0"
+    assert papers[0].metadata.abstract
+    for paper in papers:
+        assert type(paper).model_validate(paper.model_dump()) == paper
+
+    scholar = SemanticScholarConnector()
+    papers = scholar._to_papers(scholar.search_decoder.decode(semantic_scholar_payload(5)).data)
+    assert [paper.metadata.doi for paper in papers] == [f"10.1000/s2.{i}" for i in range(5)]
+
+def test_backend_selection():
+    assert resolve_backend("json") == "json"
+    assert loads(b'{"a": [1]}', "json") == loads(b'{"a": [1]}', "msgspec") == {'a': [1]}
+    with pytest.raises(ValueError):
+        resolve_backend("simdjson")
@@ -0,0 +1,87 @@
+from app.services.ingestion.dedup import PaperDeduplicator, normalize_doi, extract_arxiv_id, title_fingerprint, paper_key
+
+def test_normalizers():
+    """Test DOI, arXiv id and title normalization"""
+    assert normalize_doi("https://doi.org/10.1038/NATURE14539") == "10.1038/nature14539"
+    assert normalize_doi("doi: 10.1038/nature14539") == "10.1038/nature14539"
+    assert normalize_doi("") is None
+
+    assert extract_arxiv_id({'url': "http://arxiv.org/abs/1706.03762v7"}) == "1706.03762"
+    assert extract_arxiv_id({'url': "https://arxiv.org/abs/hep-th/9901001v2"}) == "hep-th/9901001"
+    assert extract_arxiv_id({'url': '', 'doi': "https://doi.org/10.48550/arXiv.1706.03762"}) == "1706.03762"
+
+    assert title_fingerprint("Attention Is All You Need!") == title_fingerprint("attention is all  you need")
+    assert title_fingerprint("Preface") is None
+
+def test_paper_key():
+    """Test that DOI and arXiv id take precedence over the URL"""
+    assert paper_key({'doi': "https://doi.org/10.1/ABC", 'url': "x"}) == "doi:10.1/abc"
+    assert paper_key({'url': "http://arxiv.org/abs/1706.03762v7"}) == "arxiv:1706.03762"
+    assert paper_key({'url': "https://example.com/a"}) == "url:https://example.com/a"
+
+def test_preprint_and_published_version_collapse():
+    """Test that an arXiv preprint and its OpenAlex record merge into one"""
+    arxiv_doc = {
+        'title': "Attention Is All You Need",
+        'url': "http://arxiv.org/abs/1706.03762v7",
+        'source': 'arxiv',
+        'categories': ['cs.CL', 'cs.LG'],
+        'authors': ['Ashish Vaswani'],
+        'year': 2017,
+        'doi': None,
+        'citations': None,
+    }
+    open_alex_doc = {
+        'title': "Attention is All you Need",
+        'url': "https://doi.org/10.48550/arxiv.1706.03762",
+        'source': 'open_alex',
+        'categories': ['Computer science', 'cs.CL'],
+        'authors': ['Ashish Vaswani', 'Noam Shazeer'],
+        'year': 2017,
+        'doi': "https://doi.org/10.48550/arxiv.1706.03762",
+        'citations': 90000,
+    }
+
+    deduplicator = PaperDeduplicator()
+    assert deduplicator.add([arxiv_doc]) == [arxiv_doc]
+    assert deduplicator.add([open_alex_doc]) == []
+
+    assert deduplicator.duplicates == 1
+    assert arxiv_doc['citations'] == 90000
+    assert arxiv_doc['categories'] == ['cs.CL', 'cs.LG', 'Computer science']
+    assert arxiv_doc['doi'] == "https://doi.org/10.48550/arxiv.1706.03762"
+    assert arxiv_doc['source'] == 'arxiv'
+
+def test_distinct_papers_kept():
+    """Test that different papers with no shared keys are all kept"""
+    docs = [
+        {'title': "Graph neural networks for molecules", 'url': "https://doi.org/10.1/a", 'doi': "10.1/a"},
+        {'title': "Graph neural networks for proteins", 'url': "https://doi.org/10.1/b", 'doi': "10.1/b"},
+        {'title': "Intro", 'url': "", 'doi': None},
+        {'title': "Intro", 'url': "", 'doi': None},
+    ]
+
+    assert len(PaperDeduplicator().add(docs)) == 4
+
+def test_transitive_match_through_merged_keys():
+    """Test that keys learned from a duplicate catch later copies"""
+    deduplicator = PaperDeduplicator()
+    deduplicator.add([{'title': "Deep residual learning for image recognition", 'url': "https://arxiv.org/abs/1512.03385"}])
+    deduplicator.add([{'title': "Deep Residual Learning for Image Recognition", 'url': "x", 'doi': "10.1109/CVPR.2016.90"}])
+
+    # Same DOI, different title formatting that no longer fingerprints the same
+    third = {'title': "ResNet (CVPR version)", 'url': "y", 'doi': "https://doi.org/10.1109/cvpr.2016.90"}
+    assert deduplicator.add([third]) == []
+    assert deduplicator.duplicates == 2
+
+def test_forgotten_records_no_longer_match():
+    """Test that a forgotten record's later copies are kept as new"""
+    deduplicator = PaperDeduplicator()
+    pruned = {'title': "Deep residual learning for image recognition", 'url': "a", 'doi': "10.1109/CVPR.2016.90"}
+    kept = {'title': "Attention is all you need in every single case", 'url': "b"}
+    deduplicator.add([pruned, kept])
+
+    deduplicator.forget([pruned])
+
+    again = [dict(pruned, url="c"), dict(kept, url="d")]
+    assert deduplicator.add(again) == [again[0]]
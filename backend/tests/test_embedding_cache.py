@@ -0,0 +1,65 @@
+import numpy as np
+from app.services.cache.embedding_cache import EmbeddingCache
+
+def make_cache(tmp_path, max_entries: int = 100) -> EmbeddingCache:
+    return EmbeddingCache(path=str(tmp_path / "embeddings.sqlite3"), max_entries=max_entries)
+
+def test_round_trip(tmp_path):
+    """Test that stored vectors come back in input order with misses as None"""
+    cache = make_cache(tmp_path)
+    vectors = np.random.rand(2, 768).astype(np.float32)
+    cache.put_many("specter", ["paper one", "paper two"], vectors)
+
+    results = cache.get_many("specter", ["paper two", "unknown", "paper one"])
+
+    assert results[1] is None
+    assert results[0].dtype == np.float32
+    np.testing.assert_allclose(results[0], vectors[1], atol=1e-3)
+    np.testing.assert_allclose(results[2], vectors[0], atol=1e-3)
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+def test_keys_normalize_whitespace_and_model(tmp_path):
+    """Test that keys ignore whitespace differences but not the model"""
+    cache = make_cache(tmp_path)
+    cache.put_many("specter", ["Graph  neural\nnetworks "], np.ones((1, 4), dtype=np.float32))
+
+    assert cache.get_many("specter", ["Graph neural networks"])[0] is not None
+    assert cache.get_many("other-model", ["Graph neural networks"])[0] is None
+
+def test_lru_eviction(tmp_path):
+    """Test that the least recently used entries are evicted past capacity"""
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put_many("specter", ["a"], np.ones((1, 4)))
+    cache.put_many("specter", ["b"], np.ones((1, 4)))
+    cache.get_many("specter", ["a"])  # "b" is now the oldest
+    cache.put_many("specter", ["c"], np.ones((1, 4)))
+
+    assert len(cache) == 2
+    assert cache.get_many("specter", ["b"])[0] is None
+    assert cache.get_many("specter", ["a"])[0] is not None
+    assert cache.stats()["evictions"] == 1
+
+def test_persists_across_instances(tmp_path):
+    """Test that a new cache on the same file sees earlier entries"""
+    cache = make_cache(tmp_path)
+    cache.put_many("specter", ["persisted"], np.ones((1, 4)))
+    cache.close()
+
+    reopened = make_cache(tmp_path)
+    assert reopened.get_many("specter", ["persisted"])[0] is not None
+
+def test_count_tracks_upserts_and_evictions(tmp_path):
+    """Test that the maintained row count matches the table through overwrites and evictions"""
+    cache = make_cache(tmp_path, max_entries=3)
+    cache.put_many("specter", ["a", "b"], np.ones((2, 4)))
+    cache.put_many("specter", ["a", "c"], np.zeros((2, 4)))  # "a" is overwritten, not added
+    assert len(cache) == 3
+
+    cache.put_many("specter", ["d", "e"], np.ones((2, 4)))
+    conn = cache._connect()
+    assert len(cache) == 3 == conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    cache.close()
+
+    # Another process opening the same file sees the same count without rescanning
+    assert len(make_cache(tmp_path, max_entries=3)) == 3
@@ -0,0 +1,261 @@
+import pytest
+import asyncio
+import time
+import httpx
+from app.services.http.health import (
+    CLOSED, HALF_OPEN, OPEN, CircuitOpenError, HealthTracker, HealthTransport, UpstreamHealth, request_deadline
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def make_upstream(clock: FakeClock, **options) -> UpstreamHealth:
+    defaults = dict(failure_threshold=3, error_rate=0.5, min_requests=10, open_seconds=30.0, min_samples=5)
+    defaults.update(options)
+    return UpstreamHealth(default_timeout=30.0, clock=clock, **defaults)
+
+def test_consecutive_failures_open_the_circuit():
+    """Test that repeated failures open the circuit and requests fail fast"""
+    upstream = make_upstream(FakeClock())
+
+    for _ in range(3):
+        permit = upstream.allow()
+        assert permit
+        upstream.record_failure(permit)
+
+    assert upstream.state == OPEN
+    assert not upstream.allow()
+    assert upstream.stats()['rejected'] == 1
+
+def test_error_rate_opens_the_circuit():
+    """Test that a high error rate opens the circuit without a failure streak"""
+    upstream = make_upstream(FakeClock())
+
+    for _ in range(5):
+        upstream.record_success(upstream.allow(), 0.1)
+        upstream.record_failure(upstream.allow())
+
+    assert upstream.state == OPEN
+
+def test_half_open_allows_one_probe():
+    """Test that after the cooldown a single probe decides the circuit's state"""
+    clock = FakeClock()
+    upstream = make_upstream(clock)
+    for _ in range(3):
+        upstream.record_failure(upstream.allow())
+
+    clock.now += 30.0
+    probe = upstream.allow()
+    assert probe
+    assert upstream.state == HALF_OPEN
+    assert not upstream.allow()
+
+    # A failed probe reopens for another cooldown
+    upstream.record_failure(probe)
+    assert upstream.state == OPEN
+    assert not upstream.allow()
+
+    clock.now += 30.0
+    probe = upstream.allow()
+    upstream.record_success(probe, 0.2)
+    assert upstream.state == CLOSED
+    assert upstream.allow() and upstream.allow()
+
+def test_only_the_probe_releases_itself():
+    """Test that a request other than the half-open probe can't give the probe back"""
+    clock = FakeClock()
+    upstream = make_upstream(clock)
+    earlier = upstream.allow()  # Sent while the circuit was closed
+    for _ in range(3):
+        upstream.record_failure(upstream.allow())
+
+    clock.now += 30.0
+    probe = upstream.allow()
+    upstream.release(earlier)
+    assert not upstream.allow()
+
+    upstream.release(probe)
+    assert upstream.allow()
+
+def test_stragglers_do_not_close_the_circuit():
+    """Test that a request sent before the circuit opened can't close it, open or half-open"""
+    clock = FakeClock()
+    upstream = make_upstream(clock)
+    straggler = upstream.allow()
+    for _ in range(3):
+        upstream.record_failure(upstream.allow())
+
+    upstream.record_success(straggler, 0.5)
+    assert upstream.state == OPEN
+
+    clock.now += 30.0
+    probe = upstream.allow()
+    upstream.record_success(straggler, 0.5)
+    assert upstream.state == HALF_OPEN
+    assert upstream.stats()['requests'] == 3
+
+    upstream.record_success(probe, 0.2)
+    assert upstream.state == CLOSED
+
+def test_timeout_follows_p95_latency():
+    """Test the configured timeout until there are samples, then a clamped multiple of p95"""
+    upstream = make_upstream(FakeClock(), timeout_multiplier=2.0, min_timeout=1.0)
+    assert upstream.timeout() == 30.0
+
+    for latency in [0.2] * 19 + [1.5]:
+        upstream.record_success(upstream.allow(), latency)
+    assert upstream.percentile(0.95) == 0.2
+    assert upstream.timeout() == 1.0
+
+    for _ in range(5):
+        upstream.record_success(upstream.allow(), 4.0)
+    assert upstream.timeout() == 8.0
+
+    for _ in range(20):
+        upstream.record_success(upstream.allow(), 40.0)
+    assert upstream.timeout() == 30.0
+
+def test_tracker_starts_hosts_at_their_configured_timeout():
+    """Test per-host starting timeouts and that hosts are tracked separately"""
+    tracker = HealthTracker(default_timeout=30.0, timeouts={"export.arxiv.org": 5.0})
+
+    assert tracker.timeout("export.arxiv.org") == 5.0
+    assert tracker.timeout("api.openalex.org") == 30.0
+    assert tracker.upstream("api.openalex.org") is tracker.upstream("api.openalex.org")
+    assert set(tracker.stats()) == {"export.arxiv.org", "api.openalex.org"}
+
+@pytest.mark.asyncio
+async def test_transport_records_outcomes_and_fails_fast():
+    """Test that 5xx responses open the circuit and later requests never reach the upstream"""
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request.extensions["timeout"]["read"])
+        return httpx.Response(503 if request.url.path == "/down" else 200, content=b"ok")
+
+    tracker = HealthTracker(default_timeout=7.0, failure_threshold=2, min_samples=1)
+    client = httpx.AsyncClient(transport=HealthTransport(httpx.MockTransport(handler), tracker))
+
+    response = await client.get("https://up.example.com/")
+    assert response.text == "ok"
+    assert tracker.upstream("up.example.com").stats()['requests'] == 1
+    assert sent == [7.0]
+
+    for _ in range(2):
+        await client.get("https://down.example.com/down")
+    with pytest.raises(CircuitOpenError):
+        await client.get("https://down.example.com/down")
+    assert len(sent) == 3
+
+    # Other hosts are unaffected, and their timeout now follows latency
+    await client.get("https://up.example.com/")
+    assert sent[-1] == tracker.timeout("up.example.com") < 7.0
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_transport_counts_timeouts_as_failures():
+    """Test that transport errors count against the upstream"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    tracker = HealthTracker(default_timeout=1.0)
+    client = httpx.AsyncClient(transport=HealthTransport(httpx.MockTransport(handler), tracker))
+
+    with pytest.raises(httpx.ReadTimeout):
+        await client.get("https://slow.example.com/")
+    assert tracker.upstream("slow.example.com").stats()['failures'] == 1
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_is_released():
+    """Test that a half-open probe cancelled by its caller doesn't wedge the circuit"""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(10.0)
+        return httpx.Response(200)
+
+    clock = FakeClock()
+    tracker = HealthTracker(default_timeout=30.0, clock=clock, failure_threshold=1, open_seconds=1.0)
+    upstream = tracker.upstream("flaky.example.com")
+    upstream.record_failure(upstream.allow())
+    clock.now += 1.0
+
+    client = httpx.AsyncClient(transport=HealthTransport(httpx.MockTransport(handler), tracker))
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(client.get("https://flaky.example.com/"), timeout=0.05)
+
+    assert upstream.state == HALF_OPEN
+    assert upstream.allow()
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_streamed_body_latency_includes_the_body():
+    """Test that a streamed response is timed until its body has been read"""
+    async def slow_body():
+        yield b"first"
+        await asyncio.sleep(0.1)
+        yield b"second"
+
+    tracker = HealthTracker(default_timeout=30.0)
+    client = httpx.AsyncClient(transport=HealthTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200, content=slow_body())), tracker
+    ))
+
+    async with client.stream("GET", "https://stream.example.com/") as response:
+        assert tracker.upstream("stream.example.com").stats()['requests'] == 0
+        assert b"".join([chunk async for chunk in response.aiter_bytes()]) == b"firstsecond"
+
+    upstream = tracker.upstream("stream.example.com")
+    assert upstream.stats()['requests'] == 1
+    assert upstream.percentile(0.95) >= 0.1
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_abandoned_hanging_requests_open_the_circuit():
+    """Test that requests cancelled after their timeout count as failures"""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(10.0)  # MockTransport doesn't enforce httpx timeouts
+        return httpx.Response(200)
+
+    tracker = HealthTracker(default_timeout=0.02, failure_threshold=2)
+    client = httpx.AsyncClient(transport=HealthTransport(httpx.MockTransport(handler), tracker))
+
+    for _ in range(2):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.get("https://hung.example.com/"), timeout=0.05)
+
+    assert tracker.upstream("hung.example.com").state == OPEN
+    with pytest.raises(CircuitOpenError):
+        await client.get("https://hung.example.com/")
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_request_deadline_clamps_the_timeout():
+    """Test that requests time out by the caller's deadline, and count as failed if cancelled at it"""
+    sent = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request.extensions["timeout"]["read"])
+        await asyncio.sleep(10.0)
+        return httpx.Response(200)
+
+    tracker = HealthTracker(default_timeout=30.0)
+    client = httpx.AsyncClient(transport=HealthTransport(httpx.MockTransport(handler), tracker))
+
+    with request_deadline(time.monotonic() + 0.05):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.get("https://hung.example.com/"), timeout=0.1)
+
+    assert 0 < sent[0] <= 0.05
+    assert tracker.upstream("hung.example.com").stats()['failures'] == 1
+
+    # Out of time before sending: not held against the upstream
+    with request_deadline(time.monotonic() - 1.0):
+        with pytest.raises(httpx.TimeoutException):
+            await client.get("https://hung.example.com/")
+    assert len(sent) == 1
+    assert tracker.upstream("hung.example.com").stats()['failures'] == 1
+    await client.aclose()
@@ -0,0 +1,69 @@
+import pytest
+import asyncio
+from collections import Counter
+import httpx
+from app.services.http.pool import HostLimitTransport, HttpPool, http_pool
+
+@pytest.mark.asyncio
+async def test_connectors_share_one_client():
+    """Test that every caller on the event loop gets the same pooled client"""
+    client = http_pool.client()
+
+    assert client is http_pool.client()
+    assert isinstance(client._transport, HostLimitTransport)
+    await http_pool.close()
+
+@pytest.mark.asyncio
+async def test_reopens_after_close():
+    """Test that a closed pool hands out a fresh client"""
+    pool = HttpPool(limit=20)
+    await pool.start()
+    client = pool.client()
+
+    assert client is pool.client()
+    assert "gzip" in client.headers["Accept-Encoding"]
+
+    await pool.close()
+    assert client.is_closed
+    assert not pool.client().is_closed
+    assert pool.stats()['clients_created'] == 2
+    await pool.close()
+
+def test_new_event_loop_gets_new_client():
+    """Test that a client is never reused from another event loop"""
+    pool = HttpPool()
+
+    async def open_client():
+        return pool.client()
+
+    first = asyncio.run(open_client())
+    second = asyncio.run(open_client())
+
+    assert first is not second
+    asyncio.run(pool.close())
+
+@pytest.mark.asyncio
+async def test_requests_in_flight_are_capped_per_host():
+    """Test that each host gets at most limit_per_host requests at once, independently"""
+    in_flight = Counter()
+    peak = Counter()
+
+    async def slow_body(host):
+        yield b"ok"
+        await asyncio.sleep(0.02)
+        in_flight[host] -= 1
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        in_flight[host] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, content=slow_body(host))
+
+    client = httpx.AsyncClient(transport=HostLimitTransport(httpx.MockTransport(handler), limit_per_host=2))
+    await asyncio.gather(*(
+        client.get(f"https://{host}.example.com/") for host in ["a", "b"] for _ in range(5)
+    ))
+
+    assert peak == {"a.example.com": 2, "b.example.com": 2}
+    await client.aclose()
@@ -0,0 +1,78 @@
+import pytest
+import asyncio
+import threading
+import time
+from app.services.inference.executor import InferenceExecutor, InferenceQueueFullError
+
+@pytest.mark.asyncio
+async def test_runs_off_event_loop():
+    """Test that jobs run on a worker thread, not the loop thread"""
+    executor = InferenceExecutor(max_workers=1, max_queue=4)
+    loop_thread = threading.get_ident()
+
+    worker_thread = await executor.run(threading.get_ident)
+
+    assert worker_thread != loop_thread
+    assert executor.stats()["completed"] == 1
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_loop_stays_responsive():
+    """Test that the loop keeps ticking while a slow job runs"""
+    executor = InferenceExecutor(max_workers=1, max_queue=4)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    tick_task = asyncio.create_task(ticker())
+    await executor.run(time.sleep, 0.2)
+    tick_task.cancel()
+
+    assert ticks >= 5
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_queue_limit():
+    """Test that jobs beyond the queue bound are rejected"""
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    running = asyncio.create_task(executor.run(release.wait))
+    await asyncio.sleep(0.05)  # Let the first job reach the worker
+    queued = asyncio.create_task(executor.run(lambda: "queued"))
+    await asyncio.sleep(0)
+
+    assert executor.stats()["queue_depth"] == 1
+    with pytest.raises(InferenceQueueFullError):
+        await executor.run(lambda: "rejected")
+
+    release.set()
+    await running
+    assert await queued == "queued"
+
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["completed"] == 2
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_failed_jobs_counted_separately():
+    """Test that a job that raises counts as failed, not completed"""
+    executor = InferenceExecutor(max_workers=1, max_queue=4)
+
+    def boom():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        await executor.run(boom)
+    await executor.run(lambda: None)
+
+    stats = executor.stats()
+    assert stats["completed"] == 1
+    assert stats["failed"] == 1
+    executor.shutdown()
@@ -0,0 +1,153 @@
+import pytest
+import time
+import numpy as np
+from app.services.search.local_index import LocalPaperIndex
+from tests.test_pipeline_streaming import FakeConnector, make_pipeline
+
+def make_docs(n: int, prefix: str = "paper"):
+    return [{'title': f"{prefix} {i}", 'url': f"https://example.com/{prefix}/{i}", 'abstract': "abstract"} for i in range(n)]
+
+def brute_force(vectors: np.ndarray, query: np.ndarray, k: int):
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return list(np.argsort(-(vectors @ (query / np.linalg.norm(query))))[:k])
+
+def test_exact_search_and_upsert(tmp_path):
+    """Test flat search before training and that re-adding a paper updates it in place"""
+    index = LocalPaperIndex(str(tmp_path / "index"))
+    docs = make_docs(3)
+    index.add(docs, np.array([[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]]))
+
+    results = index.search(np.array([1.0, 0.1]), k=2)
+    assert [paper['title'] for paper, _, _ in results] == ["paper 0", "paper 2"]
+
+    index.add(docs[1:2], np.array([[1.0, 0.0]]))
+    assert len(index) == 3
+    assert index.search(np.array([1.0, 0.0]), k=2)[1][1] == pytest.approx(1.0)
+
+def test_persists_across_reopen(tmp_path):
+    """Test that vectors and metadata survive closing the index"""
+    index = LocalPaperIndex(str(tmp_path / "index"))
+    index.add(make_docs(2), np.array([[1.0, 0.0], [0.0, 1.0]]))
+    index.close()
+
+    reopened = LocalPaperIndex(str(tmp_path / "index"))
+    results = reopened.search(np.array([0.0, 1.0]), k=1)
+    assert len(reopened) == 2
+    assert results[0][0]['url'] == "https://example.com/paper/1"
+
+def test_ivf_matches_brute_force_on_clustered_data(tmp_path):
+    """Test that IVF search finds the exact neighbours on well-separated clusters"""
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(8, 16))
+    vectors = np.vstack([center + 0.05 * rng.normal(size=(100, 16)) for center in centers]).astype(np.float32)
+
+    index = LocalPaperIndex(str(tmp_path / "index"), n_lists=8, n_probe=2, train_threshold=400)
+    index.add(make_docs(len(vectors)), vectors)
+    index.wait_for_training()  # Trained on a background thread, off the add path
+    assert index.stats()['ivf_lists'] == 8
+
+    for query in centers + 0.05 * rng.normal(size=centers.shape):
+        expected = brute_force(vectors, query, 5)
+        found = [int(paper['title'].split()[-1]) for paper, _, _ in index.search(query, k=5)]
+        assert found == expected
+
+def test_workers_sharing_a_path_get_distinct_rows(tmp_path):
+    """Test that two indexes on one path (as two workers would open) never overwrite each other's rows"""
+    first = LocalPaperIndex(str(tmp_path / "index"))
+    second = LocalPaperIndex(str(tmp_path / "index"))
+    first.add(make_docs(1, "a"), np.array([[1.0, 0.0]]))
+    second.add(make_docs(1, "b"), np.array([[0.0, 1.0]]))
+    first.add(make_docs(1, "c"), np.array([[-1.0, 0.0]]))
+
+    for index in (first, second):
+        assert len(index) == 3
+        assert index.search(np.array([1.0, 0.0]), k=1)[0][0]['title'] == "a 0"
+        assert index.search(np.array([0.0, 1.0]), k=1)[0][0]['title'] == "b 0"
+        assert index.search(np.array([-1.0, 0.0]), k=1)[0][0]['title'] == "c 0"
+
+def test_lookup_rejects_weak_or_stale_results(tmp_path):
+    """Test the min-score and max-age fallbacks"""
+    index = LocalPaperIndex(str(tmp_path / "index"))
+    index.add(make_docs(1, "fresh"), np.array([[1.0, 0.0]]))
+    index.add(make_docs(1, "old"), np.array([[0.0, 1.0]]), fetched_at=time.time() - 3600)
+
+    assert index.lookup(np.array([1.0, 0.0]), k=1, min_score=0.9, max_age_seconds=60)[0]['title'] == "fresh 0"
+    assert index.lookup(np.array([0.6, 0.8]), k=1, min_score=0.9, max_age_seconds=60) is None
+    assert index.lookup(np.array([0.0, 1.0]), k=1, min_score=0.9, max_age_seconds=60) is None
+    assert index.lookup(np.array([1.0, 0.0]), k=2, min_score=0.0, max_age_seconds=60) is None
+    assert (index.hits, index.misses) == (1, 3)
+
+@pytest.mark.asyncio
+async def test_pipeline_serves_repeat_queries_locally(tmp_path):
+    """Test that ranked candidates are indexed and a strong local match skips the sources"""
+    connector = FakeConnector(['exact match', 'close match'], delay=0.0)
+    pipeline = make_pipeline({'source': connector})
+    pipeline.local_index = LocalPaperIndex(str(tmp_path / "index"))
+
+    first = await pipeline.search("query", top_k=1)
+    await pipeline.wait_for_indexing()  # Written in the background, off the request path
+    assert len(pipeline.local_index) == 2
+
+    connector.fail = True  # A live fetch would now return nothing
+    second = await pipeline.search("query", top_k=1)
+
+    assert [r['title'] for r in second] == [r['title'] for r in first] == ['exact match']
+    assert second[0]['score'] == pytest.approx(1.0)
+    assert pipeline.local_index.hits == 1
+
+class SlowLocalIndex:
+    """Local index whose lookup takes a while and returns a fixed answer"""
+    def __init__(self, answer):
+        self.answer = answer
+
+    def lookup(self, *args):
+        time.sleep(0.2)
+        return self.answer
+
+    def add(self, documents, embeddings):
+        pass
+
+@pytest.mark.asyncio
+async def test_sources_fetch_while_local_index_is_consulted():
+    """Test that a local miss doesn't delay the live fan-out"""
+    pipeline = make_pipeline({'source': FakeConnector(['exact match'], delay=0.2)})
+    pipeline.local_index = SlowLocalIndex(None)
+
+    start = time.perf_counter()
+    results = await pipeline.search("query", top_k=1)
+
+    assert [r['title'] for r in results] == ['exact match']
+    assert time.perf_counter() - start < 0.35
+
+@pytest.mark.asyncio
+async def test_local_hit_cancels_live_fetches():
+    """Test that fetches started alongside the local lookup are cancelled when it answers"""
+    connector = FakeConnector(['exact match'], delay=10.0)
+    pipeline = make_pipeline({'source': connector})
+    pipeline.local_index = SlowLocalIndex([{'title': 'cached', 'score': 0.99}])
+
+    results = await pipeline.search("query", top_k=1)
+
+    assert [r['title'] for r in results] == ['cached']
+    assert connector.cancelled
+
+@pytest.mark.asyncio
+async def test_local_index_write_is_off_the_request_path():
+    """Test that a slow local index write doesn't delay the response"""
+    class SlowWriteIndex(SlowLocalIndex):
+        def lookup(self, *args):
+            return None
+
+        def add(self, documents, embeddings):
+            time.sleep(0.3)
+
+    pipeline = make_pipeline({'source': FakeConnector(['exact match'], delay=0.0)})
+    pipeline.local_index = SlowWriteIndex(None)
+
+    start = time.perf_counter()
+    await pipeline.search("query", top_k=1)
+    assert time.perf_counter() - start < 0.2
+    assert pipeline._indexing
+
+    await pipeline.wait_for_indexing()
+    assert not pipeline._indexing
@@ -0,0 +1,68 @@
+import pytest
+import asyncio
+import numpy as np
+from typing import List
+from app.services.inference.batcher import MicroBatcher
+from app.services.inference.executor import InferenceExecutor
+
+class CountingEncoder:
+    """Fake model that encodes each text as [len(text), batch_index]"""
+
+    def __init__(self):
+        self.batches: List[List[str]] = []
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        self.batches.append(list(texts))
+        batch_index = len(self.batches) - 1
+        return np.array([[len(text), batch_index] for text in texts], dtype=np.float32)
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_a_batch():
+    """Test that concurrent callers are served by one forward pass"""
+    encoder = CountingEncoder()
+    executor = InferenceExecutor(max_workers=1, max_queue=8)
+    batcher = MicroBatcher(encoder, executor, max_batch_size=64, max_wait_ms=20)
+
+    results = await asyncio.gather(
+        batcher.submit(["a", "bb"]),
+        batcher.submit(["ccc"]),
+        batcher.submit(["dddd", "eeeee", "ffffff"])
+    )
+
+    assert len(encoder.batches) == 1
+    assert [row[0] for row in results[0]] == [1, 2]
+    assert [row[0] for row in results[1]] == [3]
+    assert [row[0] for row in results[2]] == [4, 5, 6]
+    assert batcher.stats()["avg_batch_size"] == 6
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting():
+    """Test that reaching max_batch_size dispatches immediately"""
+    encoder = CountingEncoder()
+    executor = InferenceExecutor(max_workers=1, max_queue=8)
+    batcher = MicroBatcher(encoder, executor, max_batch_size=2, max_wait_ms=10_000)
+
+    result = await asyncio.wait_for(batcher.submit(["a", "b", "c", "d"]), timeout=1)
+
+    assert result.shape == (4, 2)
+    assert encoder.batches == [["a", "b"], ["c", "d"]]
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    """Test that a failed forward pass is raised to all waiting callers"""
+    def failing_encoder(texts):
+        raise RuntimeError("model exploded")
+
+    executor = InferenceExecutor(max_workers=1, max_queue=8)
+    batcher = MicroBatcher(failing_encoder, executor, max_batch_size=8, max_wait_ms=5)
+
+    results = await asyncio.gather(
+        batcher.submit(["a"]),
+        batcher.submit(["b"]),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    executor.shutdown()
@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+from unittest.mock import patch, MagicMock
+from app.services.inference.registry import ModelRegistry
+from app.services.inference.backends import load_model, cosine_drift
+
+def test_model_loaded_once():
+    """Test that repeated lookups share one model instance"""
+    registry = ModelRegistry()
+    with patch('app.services.inference.registry.load_model') as mock_load:
+        mock_load.side_effect = lambda name, backend: MagicMock(name=name)
+        first = registry.get("allenai/specter")
+        second = registry.get("allenai/specter")
+
+    assert first is second
+    assert mock_load.call_count == 1
+    assert registry.is_loaded("allenai/specter")
+
+def test_backends_loaded_separately():
+    """Test that each backend of a model gets its own handle"""
+    registry = ModelRegistry()
+    with patch('app.services.inference.registry.load_model') as mock_load:
+        mock_load.side_effect = lambda name, backend: MagicMock(name=f"{name}:{backend}")
+        fp32 = registry.get("allenai/specter", "torch")
+        int8 = registry.get("allenai/specter", "torch_int8")
+
+    assert fp32 is not int8
+    assert registry.is_loaded("allenai/specter", "torch_int8")
+
+def test_memory_usage():
+    """Test that memory usage sums parameter and buffer bytes"""
+    registry = ModelRegistry()
+    tensor = MagicMock()
+    tensor.numel.return_value = 768
+    tensor.element_size.return_value = 4
+    model = MagicMock()
+    model.parameters.return_value = [tensor, tensor]
+    model.buffers.return_value = [tensor]
+
+    with patch('app.services.inference.registry.load_model', return_value=model), \
+            patch('app.services.inference.registry._rss_bytes', return_value=0):
+        registry.get("allenai/specter")
+
+    stats = registry.stats()
+    assert stats["memory_bytes"]["allenai/specter:torch"] == 3 * 768 * 4
+    assert stats["total_memory_bytes"] == 3 * 768 * 4
+
+def test_unknown_backend():
+    """Test that an unsupported backend is rejected"""
+    with pytest.raises(ValueError):
+        load_model("allenai/specter", "tensorrt")
+
+def test_cosine_drift():
+    """Test parity metrics between two sets of embeddings"""
+    reference = np.array([[1.0, 0.0], [0.0, 2.0]])
+    identical = cosine_drift(reference, reference * 3)
+    assert identical["min_cosine"] == pytest.approx(1.0)
+    assert identical["max_drift"] == pytest.approx(0.0)
+
+    rotated = cosine_drift(reference, np.array([[1.0, 1.0], [0.0, 1.0]]))
+    assert rotated["min_cosine"] == pytest.approx(np.sqrt(0.5))
+    assert rotated["max_drift"] == pytest.approx(1 - np.sqrt(0.5))
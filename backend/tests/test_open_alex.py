@@ -1,5 +1,11 @@
+import gzip
+import json
+import random
+import httpx
 import pytest
-from app.services.ingestion.sources.open_alex import OpenAlexConnector
+from app.services.ingestion.sources.base import INGEST, SEARCH
+from app.services.ingestion.sources.open_alex import OpenAlexConnector, reconstruct_abstract_json
+from tests.fixtures.payloads import open_alex_payload
 from pytest_asyncio import fixture
 from typing import List, Dict
 from unittest.mock import patch
@@ -14,9 +20,7 @@ async def open_alex_connector():
     """Fixture that provides an OpenAlexConnector instance"""
     with patch('app.services.ingestion.sources.open_alex.settings', MockSettings()):
         connector = OpenAlexConnector()
-        yield connector
-        if connector.session:
-            await connector.session.close()
+        return connector
 
 @pytest.mark.asyncio
 async def test_real_open_alex_search(open_alex_connector: OpenAlexConnector):
@@ -76,4 +80,75 @@ async def test_real_open_alex_search(open_alex_connector: OpenAlexConnector):
     #         abstract = paper['metadata']['abstract']
     #         assert len(abstract) > 50, "Abstract too short"
     #         assert not any(marker in abstract.lower() for marker in ['http', 'doi', 'citation']), \
-    #             "Abstract contains metadata markers"
\ No newline at end of file
+    #             "Abstract contains metadata markers"
+
+
+def legacy_convert(inverted_index) -> str:
+    """The sort-based conversion the slot array replaced, kept as the reference"""
+    if not inverted_index:
+        return ""
+    try:
+        word_positions = []
+        for word, positions in inverted_index.items():
+            for pos in positions:
+                word_positions.append((pos, word))
+        return ' '.join(word for _, word in sorted(word_positions))
+    except Exception:
+        return ""
+
+def random_inverted_index(rng: random.Random, length: int, gaps: bool = False, shared: bool = False) -> dict:
+    inverted_index = {}
+    for pos in range(length):
+        if gaps and rng.random() < 0.1:
+            continue
+        inverted_index.setdefault(f"w{rng.randrange(length // 2 + 1)}", []).append(pos)
+        if shared and rng.random() < 0.05:
+            inverted_index.setdefault(f"x{rng.randrange(5)}", []).append(pos)
+    return inverted_index
+
+@pytest.mark.parametrize("gaps,shared", [(False, False), (True, False), (False, True), (True, True)])
+def test_reconstruct_matches_sorted_conversion(open_alex_connector: OpenAlexConnector, gaps, shared):
+    """Test slot-array reconstruction against the sort-based conversion"""
+    rng = random.Random(3)
+    for length in [0, 1, 2, 17, 250, 1500]:
+        inverted_index = random_inverted_index(rng, length, gaps, shared)
+        expected = legacy_convert(inverted_index)
+        assert open_alex_connector.convert_inverted_index_to_text(inverted_index) == expected
+        assert reconstruct_abstract_json(json.dumps(inverted_index).encode()) == expected
+
+@pytest.mark.parametrize("inverted_index", [
+    None,
+    {},
+    {"Cows": [0], "make": [1], "": [2], "friends": [3]},
+    {"late": [10 ** 6], "early": [0]},
+    {"minus": [-1], "zero": [0]},
+    {"float": [1.0], "int": [0]},
+    {"empty": [], "word": [0]},
+    {"bad": 3},
+])
+def test_reconstruct_edge_cases(open_alex_connector: OpenAlexConnector, inverted_index):
+    """Test empty words, sparse, negative and malformed positions"""
+    assert open_alex_connector.convert_inverted_index_to_text(inverted_index) == legacy_convert(inverted_index)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode,selected,skipped", [(SEARCH, "primary_topic", "topics"), (INGEST, "topics", "primary_topic")])
+async def test_field_profile_and_transfer_metrics(open_alex_connector: OpenAlexConnector, mock_http, mode, selected, skipped):
+    """Test each mode selects its field profile and gzipped bytes are counted as received"""
+    body = open_alex_payload(5)
+    selects = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        selects.append(request.url.params['select'].split(','))
+        return httpx.Response(200, content=gzip.compress(body), headers={'Content-Encoding': 'gzip'})
+
+    mock_http(handler)
+
+    papers = await open_alex_connector.fetch_papers("cows", max_results=5, mode=mode)
+
+    assert papers
+    assert selected in selects[0] and skipped not in selects[0]
+    assert 'concepts' not in selects[0] and 'open_access' not in selects[0]
+    stats = open_alex_connector.transfer_stats()
+    assert stats['responses'] == 1
+    assert stats['body_bytes'] == len(body)
+    assert stats['wire_bytes'] < stats['body_bytes']
@@ -0,0 +1,185 @@
+import pytest
+import asyncio
+import time
+import numpy as np
+from typing import Dict, List
+from collections import Counter
+from app.services.ingestion.pipeline import SearchPipeline
+from app.orchestration.budget import LatencyBudget
+from app.schemas.paper import Paper, PaperMetadata
+
+# Each title embeds to a fixed 2-d direction; the query points along x
+VECTORS = {
+    'exact match': [1.0, 0.0],
+    'close match': [0.9, 0.1],
+    'loose match': [0.5, 0.5],
+    'unrelated': [0.0, 1.0],
+}
+
+class FakeConnector:
+    def __init__(self, titles: List[str], delay: float, fail: bool = False):
+        self.titles = titles
+        self.delay = delay
+        self.fail = fail
+        self.cancelled = False
+
+    async def fetch_papers(self, query: str, max_results: int = 50) -> List[Paper]:
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise RuntimeError("source is down")
+        return [
+            Paper(title=title, url=f"https://example.com/{i}", metadata=PaperMetadata(abstract="abstract", year=2024))
+            for i, title in enumerate(self.titles)
+        ]
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.embed_times: List[float] = []
+
+    async def get_query_embedding_async(self, query: str) -> List[float]:
+        return [1.0, 0.0]
+
+    async def get_cached_embeddings_async(self, texts: List[str]) -> np.ndarray:
+        self.embed_times.append(time.perf_counter())
+        return np.array([VECTORS[text.split(' abstract')[0]] for text in texts], dtype=np.float32)
+
+def make_pipeline(sources: Dict[str, FakeConnector]) -> SearchPipeline:
+    pipeline = SearchPipeline.__new__(SearchPipeline)
+    pipeline.sources = sources
+    pipeline.embedding_service = FakeEmbeddingService()
+    pipeline.local_index = None
+    pipeline.vector_search = None
+    pipeline.write_behind = None
+    pipeline.deadline_misses = Counter()
+    pipeline._indexing = set()
+    return pipeline
+
+@pytest.mark.asyncio
+async def test_ranks_across_sources():
+    """Test that the running top-k spans every source"""
+    pipeline = make_pipeline({
+        'fast': FakeConnector(['loose match', 'unrelated'], delay=0.01),
+        'slow': FakeConnector(['exact match', 'close match'], delay=0.05),
+    })
+
+    results = await pipeline.search("query", top_k=3)
+
+    assert [r['title'] for r in results] == ['exact match', 'close match', 'loose match']
+    assert results[0]['score'] == pytest.approx(1.0)
+
+@pytest.mark.asyncio
+async def test_fast_source_embedded_before_slow_source_finishes():
+    """Test that embedding starts as soon as the first source arrives"""
+    pipeline = make_pipeline({
+        'fast': FakeConnector(['close match'], delay=0.0),
+        'slow': FakeConnector(['exact match'], delay=0.2),
+    })
+
+    start = time.perf_counter()
+    await pipeline.search("query", top_k=2)
+
+    first_embed = pipeline.embedding_service.embed_times[0] - start
+    assert first_embed < 0.1
+
+@pytest.mark.asyncio
+async def test_failed_source_is_skipped():
+    """Test that one failing source doesn't sink the search"""
+    pipeline = make_pipeline({
+        'down': FakeConnector(['exact match'], delay=0.0, fail=True),
+        'up': FakeConnector(['close match'], delay=0.01),
+    })
+
+    results = await pipeline.search("query", top_k=3)
+
+    assert [r['title'] for r in results] == ['close match']
+
+@pytest.mark.asyncio
+async def test_late_source_is_cancelled_and_reported():
+    """Test that a source missing its budget slice is dropped, not waited on"""
+    pipeline = make_pipeline({
+        'fast': FakeConnector(['close match'], delay=0.0),
+        'hung': FakeConnector(['exact match'], delay=10.0),
+    })
+
+    start = time.perf_counter()
+    results, missing = await pipeline.search_within_budget("query", LatencyBudget(0.2), top_k=3)
+
+    assert time.perf_counter() - start < 1.0
+    assert [r['title'] for r in results] == ['close match']
+    assert missing == ['hung']
+    assert pipeline.sources['hung'].cancelled
+    assert pipeline.deadline_misses == {'hung': 1}
+
+@pytest.mark.asyncio
+async def test_slow_embedding_is_cut_at_ranking_deadline():
+    """Test that a source whose embedding overruns the ranking slice is reported missing"""
+    class SlowEmbeddingService(FakeEmbeddingService):
+        async def get_cached_embeddings_async(self, texts: List[str]) -> np.ndarray:
+            if any(text.startswith('exact match') for text in texts):
+                await asyncio.sleep(10.0)
+            return await super().get_cached_embeddings_async(texts)
+
+    pipeline = make_pipeline({
+        'fast': FakeConnector(['close match'], delay=0.0),
+        'slow_to_embed': FakeConnector(['exact match'], delay=0.0),
+    })
+    pipeline.embedding_service = SlowEmbeddingService()
+
+    results, missing = await pipeline.search_within_budget("query", LatencyBudget(0.2), top_k=3)
+
+    assert [r['title'] for r in results] == ['close match']
+    assert missing == ['slow_to_embed']
+
+@pytest.mark.asyncio
+async def test_no_missing_sources_within_budget():
+    """Test that a comfortable budget changes nothing"""
+    pipeline = make_pipeline({
+        'fast': FakeConnector(['loose match'], delay=0.0),
+        'slow': FakeConnector(['exact match'], delay=0.05),
+    })
+
+    results, missing = await pipeline.search_within_budget("query", LatencyBudget(5.0), top_k=3)
+
+    assert [r['title'] for r in results] == ['exact match', 'loose match']
+    assert missing == []
+
+@pytest.mark.asyncio
+async def test_slow_query_embedding_returns_nothing_at_ranking_deadline():
+    """Test that a query embedding overrunning the ranking slice marks every source missing"""
+    class SlowQueryEmbeddingService(FakeEmbeddingService):
+        async def get_query_embedding_async(self, query: str) -> List[float]:
+            await asyncio.sleep(10.0)
+            return await super().get_query_embedding_async(query)
+
+    pipeline = make_pipeline({
+        'fast': FakeConnector(['exact match'], delay=0.0),
+        'slow': FakeConnector(['close match'], delay=10.0),
+    })
+    pipeline.embedding_service = SlowQueryEmbeddingService()
+
+    started = time.monotonic()
+    results, missing = await pipeline.search_within_budget("query", LatencyBudget(0.2), top_k=3)
+
+    assert time.monotonic() - started < 1.0
+    assert results == []
+    assert missing == ['fast', 'slow']
+    assert pipeline.sources['slow'].cancelled
+
+@pytest.mark.asyncio
+async def test_paper_pruned_from_one_source_is_ranked_from_another(monkeypatch):
+    """Test that lexical pruning doesn't leave a paper registered as seen"""
+    monkeypatch.setitem(VECTORS, 'query terms appear in this title', [0.5, 0.5])
+    monkeypatch.setitem(VECTORS, 'a paper that is pruned at first', [1.0, 0.0])
+    monkeypatch.setattr('app.services.ingestion.pipeline.settings.RANKING_DENSE_CANDIDATES', 1)
+    pipeline = make_pipeline({
+        'first': FakeConnector(['query terms appear in this title', 'a paper that is pruned at first'], delay=0.0),
+        'second': FakeConnector(['a paper that is pruned at first'], delay=0.05),
+    })
+
+    results = await pipeline.search("query terms", top_k=3)
+
+    assert sorted(r['title'] for r in results) == ['a paper that is pruned at first', 'query terms appear in this title']
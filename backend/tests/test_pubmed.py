@@ -1,12 +1,16 @@
 import pytest
-from app.services.ingestion.sources.pubmed import PubMedConnector
+import httpx
+from app.services.ingestion.sources.pubmed import PubMedConnector, PubMedXmlParser
+from app.schemas.paper import Paper
 from pytest_asyncio import fixture
-from typing import List, Dict
+from typing import List
 from unittest.mock import patch
 
 class MockSettings:
     PUBMED_EMAIL = "test@example.com"
+    PUBMED_API_KEY = ""
     PUBMED_RATE_LIMIT = 0.34  # PubMed allows 3 requests/second
+    PUBMED_FETCH_BATCH_SIZE = 2
 
 @fixture
 async def pubmed_connector():
@@ -18,15 +22,106 @@ async def pubmed_connector():
 @pytest.mark.asyncio
 async def test_real_pubmed_search(pubmed_connector):
     """Test a real PubMed search"""
-    results: List[Dict] = await pubmed_connector.fetch_papers("Treatment for COVID-19", max_results=5)
-    
+    results: List[Paper] = await pubmed_connector.fetch_papers("Treatment for COVID-19", max_results=5)
+
     print("\nResults from PubMed:")
     for paper in results:
-        print(f"\nTitle: {paper['title']}")
-        print(f"Authors: {', '.join(author['name'] for author in paper['metadata']['authors'])}")
-        print(f"Journal: {paper['metadata']['journal']['title']}")
-        print(f"URL: {paper['url']}")
-        print(f"Abstract: {paper['metadata']['abstract'][:1000]}...")
-    
+        print(f"\nTitle: {paper.title}")
+        print(f"Authors: {', '.join(paper.metadata.authors)}")
+        print(f"Year: {paper.metadata.year}")
+        print(f"URL: {paper.url}")
+        print(f"Abstract: {paper.metadata.abstract[:1000]}...")
+
     assert len(results) > 0
-    assert len(results) <= 5
\ No newline at end of file
+    assert len(results) <= 5
+
+def make_article(pmid: int, abstract: bool = True, pub_date: str = "<MedlineDate>2021 Jan-Feb</MedlineDate>", article_date: str = "") -> str:
+    abstract_xml = f"""
+        <Abstract>
+          <AbstractText Label="BACKGROUND">Cows <i>bond</i> {pmid}.</AbstractText>
+          <AbstractText Label="RESULTS">Pairs stay together.</AbstractText>
+        </Abstract>""" if abstract else ""
+    return f"""
+  <PubmedArticle>
+    <MedlineCitation Status="MEDLINE">
+      <PMID Version="1">{pmid}</PMID>
+      <DateCompleted><Year>1999</Year></DateCompleted>
+      <Article>
+        <Journal><JournalIssue><PubDate>{pub_date}</PubDate></JournalIssue></Journal>
+        <ArticleTitle>Social bonds in <i>Bos taurus</i> {pmid}</ArticleTitle>{abstract_xml}{article_date}
+        <AuthorList>
+          <Author><LastName>Doe</LastName><ForeName>Jane</ForeName></Author>
+          <Author><CollectiveName>Herd Study Group</CollectiveName></Author>
+        </AuthorList>
+        <PublicationTypeList><PublicationType>Journal Article</PublicationType></PublicationTypeList>
+      </Article>
+      <MeshHeadingList><MeshHeading><DescriptorName>Cattle</DescriptorName></MeshHeading></MeshHeadingList>
+      <CommentsCorrectionsList><CommentsCorrections><PMID>1</PMID></CommentsCorrections></CommentsCorrectionsList>
+    </MedlineCitation>
+    <PubmedData>
+      <ArticleIdList><ArticleId IdType="doi">10.1000/{pmid}</ArticleId></ArticleIdList>
+      <ReferenceList><Reference><ArticleIdList><ArticleId IdType="doi">10.9999/ref</ArticleId></ArticleIdList></Reference></ReferenceList>
+    </PubmedData>
+  </PubmedArticle>"""
+
+def make_article_set(pmids: List[int]) -> bytes:
+    articles = "".join(make_article(pmid, abstract=pmid != 0) for pmid in pmids)
+    return f"""<?xml version="1.0" ?>
+<!DOCTYPE PubmedArticleSet PUBLIC "-//NLM//DTD PubMedArticle, 1st January 2024//EN" "https://dtd.nlm.nih.gov/ncbi/pubmed/out/pubmed_240101.dtd">
+<PubmedArticleSet>{articles}
+</PubmedArticleSet>""".encode()
+
+def test_parser_extracts_paper_fields():
+    """Test streaming extraction from chunked efetch XML"""
+    xml = make_article_set([42, 0])
+    parser = PubMedXmlParser()
+    papers = []
+    for i in range(0, len(xml), 13):
+        papers.extend(parser.feed(xml[i:i + 13]))
+
+    # The record without an abstract is skipped
+    assert len(papers) == 1
+    paper = papers[0]
+    assert paper.title == "Social bonds in Bos taurus 42"
+    assert paper.url == "https://pubmed.ncbi.nlm.nih.gov/42/"
+    assert paper.metadata.abstract == "BACKGROUND: Cows bond 42.\nRESULTS: Pairs stay together."
+    assert paper.metadata.authors == ["Jane Doe", "Herd Study Group"]
+    assert paper.metadata.year == 2021
+    assert paper.metadata.doi == "10.1000/42"
+    assert paper.metadata.categories == ["Cattle"]
+    assert paper.metadata.type == "Journal Article"
+
+def test_parser_skips_articles_without_a_year():
+    """Test that a PubDate with no year falls back to the ArticleDate, and undated articles are skipped"""
+    xml = f"""<PubmedArticleSet>
+    {make_article(1, pub_date="<Season>Spring</Season>", article_date="<ArticleDate><Year>2020</Year></ArticleDate>")}
+    {make_article(2, pub_date="<Season>Spring</Season>")}
+    {make_article(3, pub_date="<MedlineDate>Winter issue</MedlineDate>")}
+    </PubmedArticleSet>""".encode()
+
+    papers = PubMedXmlParser().feed(xml)
+
+    assert [(paper.url, paper.metadata.year) for paper in papers] == [("https://pubmed.ncbi.nlm.nih.gov/1/", 2020)]
+
+@pytest.mark.asyncio
+async def test_fetch_uses_history_and_parallel_batches(pubmed_connector, mock_http):
+    """Test esearch with usehistory followed by batched efetch calls"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        params = dict(request.url.params)
+        requests.append((request.url.path, params))
+        if request.url.path.endswith("esearch.fcgi"):
+            return httpx.Response(200, json={'esearchresult': {'count': '5', 'webenv': 'ENV', 'querykey': '1', 'idlist': []}})
+        start, size = int(params['retstart']), int(params['retmax'])
+        return httpx.Response(200, content=make_article_set(list(range(start + 1, start + size + 1))))
+
+    mock_http(handler)
+
+    papers = await pubmed_connector.fetch_papers("cattle social bonds", max_results=5)
+
+    assert [paper.url for paper in papers] == [f"https://pubmed.ncbi.nlm.nih.gov/{i}/" for i in range(1, 6)]
+    assert requests[0][1]['usehistory'] == 'y'
+    fetches = [params for path, params in requests if path.endswith("efetch.fcgi")]
+    assert [(p['retstart'], p['retmax']) for p in fetches] == [('0', '2'), ('2', '2'), ('4', '1')]
+    assert all(p['WebEnv'] == 'ENV' and p['query_key'] == '1' for p in fetches)
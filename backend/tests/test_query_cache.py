@@ -0,0 +1,35 @@
+from unittest.mock import patch
+from app.services.cache.query_cache import QueryEmbeddingCache
+
+def test_normalized_terms_share_entries():
+    """Test that case, whitespace and punctuation variants hit the same entry"""
+    cache = QueryEmbeddingCache(max_entries=10, ttl_seconds=60)
+    cache.put("specter", "Bovine social behavior", [0.1, 0.2])
+
+    assert cache.get("specter", "  bovine SOCIAL behavior?") == [0.1, 0.2]
+    assert cache.get("specter", "bovine-social behavior") == [0.1, 0.2]
+    assert cache.get("other-model", "bovine social behavior") is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+def test_lru_bound():
+    """Test that the least recently used term is dropped at capacity"""
+    cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=60)
+    cache.put("specter", "a", [1.0])
+    cache.put("specter", "b", [2.0])
+    cache.get("specter", "a")
+    cache.put("specter", "c", [3.0])
+
+    assert cache.get("specter", "b") is None
+    assert cache.get("specter", "a") == [1.0]
+    assert cache.get("specter", "c") == [3.0]
+
+def test_ttl_expiry():
+    """Test that entries older than the TTL are treated as misses"""
+    cache = QueryEmbeddingCache(max_entries=10, ttl_seconds=60)
+    with patch('app.services.cache.query_cache.time.monotonic', return_value=1000.0):
+        cache.put("specter", "quantum computing", [1.0])
+    with patch('app.services.cache.query_cache.time.monotonic', return_value=1061.0):
+        assert cache.get("specter", "quantum computing") is None
+
+    assert cache.stats()["expirations"] == 1
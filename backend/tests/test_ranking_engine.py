@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+from app.services.ranking.engine import RankingEngine, normalize_rows, top_k_indices
+
+def test_scores_are_true_cosines():
+    """Test that scores match cosine similarity regardless of vector scale"""
+    rng = np.random.default_rng(0)
+    query = rng.normal(size=768)
+    embeddings = rng.normal(size=(20, 768)) * rng.uniform(0.1, 10, size=(20, 1))
+
+    engine = RankingEngine(query)
+    engine.add([{'title': str(i)} for i in range(20)], embeddings)
+
+    expected = embeddings @ query / (np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query))
+    np.testing.assert_allclose(engine.scores, expected, rtol=1e-4, atol=1e-5)
+
+def test_top_k_matches_full_sort():
+    """Test that argpartition selection agrees with a full sort"""
+    rng = np.random.default_rng(1)
+    query = rng.normal(size=32)
+    embeddings = rng.normal(size=(200, 32))
+
+    engine = RankingEngine(query)
+    engine.add([{'id': i} for i in range(100)], embeddings[:100])
+    engine.add([{'id': i} for i in range(100, 200)], embeddings[100:])
+    ranked = engine.top_k(5)
+
+    expected_ids = list(np.argsort(-engine.scores)[:5])
+    assert [doc['id'] for doc in ranked] == expected_ids
+    assert all(ranked[i]['score'] >= ranked[i + 1]['score'] for i in range(4))
+    assert all(-1.0 <= doc['score'] <= 1.0 for doc in ranked)
+
+def test_top_k_edge_cases():
+    """Test k larger than the candidate set and empty engines"""
+    assert list(top_k_indices(np.array([0.2, 0.9, 0.5]), 10)) == [1, 2, 0]
+    assert len(top_k_indices(np.array([]), 3)) == 0
+
+    engine = RankingEngine([1.0, 0.0])
+    assert engine.top_k(3) == []
+
+def test_zero_vectors_and_mismatches():
+    """Test that zero vectors score 0 and misaligned inputs are rejected"""
+    assert np.all(normalize_rows(np.zeros((2, 4))) == 0)
+
+    engine = RankingEngine([1.0, 0.0])
+    with pytest.raises(ValueError):
+        engine.add([{'id': 1}], np.ones((2, 2)))
+
+def test_running_heap_matches_full_sort():
+    """Test that incremental adds with a bounded heap give the same top-k"""
+    rng = np.random.default_rng(2)
+    query = rng.normal(size=16)
+    embeddings = rng.normal(size=(90, 16))
+
+    engine = RankingEngine(query, keep=4)
+    for start in range(0, 90, 30):
+        engine.add([{'id': i} for i in range(start, start + 30)], embeddings[start:start + 30])
+
+    expected_ids = list(np.argsort(-engine.scores)[:4])
+    assert [doc['id'] for doc in engine.top_k(4)] == expected_ids
+    assert [doc['id'] for doc in engine.top_k(2)] == expected_ids[:2]
+    assert len(engine.top_k(10)) == 10
@@ -0,0 +1,76 @@
+import pytest
+import asyncio
+import time
+from app.services.http.rate_limit import RateLimiter, TokenBucket
+
+@pytest.mark.asyncio
+async def test_idle_upstream_does_not_wait():
+    """Test that a request after an idle period goes straight through"""
+    bucket = TokenBucket(rate=10.0)
+
+    start = time.perf_counter()
+    await bucket.acquire()
+    assert time.perf_counter() - start < 0.01
+
+    await asyncio.sleep(0.11)
+    await bucket.acquire()
+    assert bucket.waited == 0
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_spaced():
+    """Test that concurrent callers share one budget and queue in order"""
+    bucket = TokenBucket(rate=20.0)
+    finished = []
+
+    async def request(i):
+        await bucket.acquire()
+        finished.append((i, time.perf_counter()))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(i) for i in range(4)))
+
+    assert [i for i, _ in finished] == [0, 1, 2, 3]
+    assert finished[-1][1] - start == pytest.approx(0.15, abs=0.05)
+    assert bucket.waited == 3
+    assert bucket.max_wait == pytest.approx(0.15, abs=0.01)
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_free_a_slot_early():
+    """Test that cancelling a queued caller never lets two requests through within one interval"""
+    bucket = TokenBucket(rate=10.0)
+    fired = []
+
+    async def request(name):
+        await bucket.acquire()
+        fired.append((name, time.perf_counter()))
+
+    await request('a')
+    b = asyncio.create_task(request('b'))
+    c = asyncio.create_task(request('c'))
+    await asyncio.sleep(0.05)
+    b.cancel()
+    await asyncio.gather(b, return_exceptions=True)
+    await asyncio.gather(c, request('d'))
+
+    assert [name for name, _ in fired] == ['a', 'c', 'd']
+    assert fired[2][1] - fired[1][1] >= 0.09
+
+@pytest.mark.asyncio
+async def test_burst_capacity():
+    """Test that a bucket with capacity n lets n requests through at once"""
+    bucket = TokenBucket(rate=1.0, capacity=3)
+    for _ in range(3):
+        await bucket.acquire()
+    assert bucket.waited == 0
+
+@pytest.mark.asyncio
+async def test_limiter_keys_by_host():
+    """Test per-host buckets and that unconfigured hosts aren't limited"""
+    limiter = RateLimiter({"api.openalex.org": 0.1, "disabled.example.com": 0})
+
+    await limiter.acquire("api.openalex.org")
+    await limiter.acquire("unknown.example.com")
+    await limiter.acquire(None)
+
+    assert list(limiter.stats()) == ["api.openalex.org"]
+    assert limiter.stats()["api.openalex.org"]["acquired"] == 1
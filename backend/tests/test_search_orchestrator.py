@@ -0,0 +1,63 @@
+import pytest
+import asyncio
+from unittest.mock import patch
+from app.orchestration.search import SearchOrchestrator
+from app.services.query.processor import BasicQueryValidator
+
+class HungQueryProcessor:
+    """Query processor whose LLM call never returns"""
+    def __init__(self):
+        self.basic_validator = BasicQueryValidator()
+
+    async def process_query(self, query: str):
+        await asyncio.sleep(10.0)
+
+class RecordingPipeline:
+    def __init__(self):
+        self.terms = []
+
+    async def search_within_budget(self, query, budget, top_k=3):
+        self.terms.append(query)
+        return [], []
+
+class NoWebSearch:
+    async def search(self, query):
+        return []
+
+class NoSummary:
+    async def generate_summary(self, query, search_results):
+        return None
+
+class MockSettings:
+    SEARCH_BUDGET_SECONDS = 1.0
+    SEARCH_BUDGET_QUERY_SHARE = 0.1
+
+def make_orchestrator() -> SearchOrchestrator:
+    orchestrator = SearchOrchestrator.__new__(SearchOrchestrator)
+    orchestrator.query_processor = HungQueryProcessor()
+    orchestrator.search_pipeline = RecordingPipeline()
+    orchestrator.search_service = NoWebSearch()
+    orchestrator.llm_service = NoSummary()
+    return orchestrator
+
+@pytest.mark.asyncio
+async def test_hung_query_processing_falls_back_to_the_raw_query():
+    """Test that query processing is cut at its budget share and the raw query is searched"""
+    orchestrator = make_orchestrator()
+
+    with patch('app.orchestration.search.settings', MockSettings()):
+        response = await asyncio.wait_for(orchestrator.search("Can cows make friends?"), timeout=1.0)
+
+    assert response.is_valid
+    assert orchestrator.search_pipeline.terms == ["Can cows make friends?"]
+
+@pytest.mark.asyncio
+async def test_raw_query_still_gets_basic_validation():
+    """Test that the fallback doesn't search queries the basic rules reject"""
+    orchestrator = make_orchestrator()
+
+    with patch('app.orchestration.search.settings', MockSettings()):
+        response = await orchestrator.search("12345")
+
+    assert not response.is_valid
+    assert orchestrator.search_pipeline.terms == []
@@ -0,0 +1,99 @@
+import pytest
+from types import SimpleNamespace
+from typing import List
+from app.schemas.search import SearchFilters
+from app.services.search.search import SearchService, build_filter
+from tests.test_pipeline_streaming import FakeConnector, make_pipeline
+
+class FakeIndex:
+    def __init__(self, matches):
+        self.matches = matches
+        self.calls = []
+
+    def query(self, **kwargs):
+        self.calls.append(kwargs)
+        return SimpleNamespace(matches=self.matches)
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.queries: List[str] = []
+
+    async def get_query_embedding_async(self, query: str) -> List[float]:
+        self.queries.append(query)
+        return [1.0, 0.0]
+
+def test_build_filter():
+    """Test translating SearchFilters into a Pinecone metadata filter"""
+    assert build_filter(None) is None
+    assert build_filter(SearchFilters()) is None
+    assert build_filter(SearchFilters(year_min=2020, sources=["arxiv"], categories=["cs.LG", "cs.CL"])) == {
+        "year": {"$gte": 2020},
+        "source": {"$in": ["arxiv"]},
+        "categories": {"$in": ["cs.LG", "cs.CL"]},
+    }
+    assert build_filter(SearchFilters(year_min=2018, year_max=2020)) == {"year": {"$gte": 2018, "$lte": 2020}}
+
+@pytest.mark.asyncio
+async def test_search_returns_full_records():
+    """Test that matches become fully populated ResearchPapers"""
+    index = FakeIndex([
+        SimpleNamespace(score=0.91, metadata={
+            "title": "Social bonds in cattle", "abstract": "Cows form friendships.", "url": "https://example.com/1",
+            "source": "open_alex", "categories": ["Zoology"], "authors": ["A. Author"], "year": 2021.0,
+        }),
+        # Ingested before sources and years were stored
+        SimpleNamespace(score=0.5, metadata={"title": "Legacy", "abstract": "Old record", "url": "https://example.com/2"}),
+    ])
+    service = SearchService(index=index, embedding_service=FakeEmbeddingService())
+
+    papers = await service.search("cows", top_k=2, filters=SearchFilters(year_min=2020))
+
+    assert papers[0].year == 2021
+    assert papers[0].source == "open_alex"
+    assert papers[0].confidence == pytest.approx(0.91)
+    assert papers[1].authors == [] and papers[1].year == 0
+    assert index.calls[0]["filter"] == {"year": {"$gte": 2020}}
+    assert index.calls[0]["include_metadata"] is True
+
+@pytest.mark.asyncio
+async def test_search_many():
+    """Test that several queries are embedded and searched together"""
+    index = FakeIndex([])
+    embedding_service = FakeEmbeddingService()
+    service = SearchService(index=index, embedding_service=embedding_service)
+
+    results = await service.search_many(["a", "b", "c"], top_k=5)
+
+    assert results == [[], [], []]
+    assert embedding_service.queries == ["a", "b", "c"]
+    assert [call["top_k"] for call in index.calls] == [5, 5, 5]
+
+def stored_match(title: str, score: float) -> SimpleNamespace:
+    return SimpleNamespace(score=score, metadata={
+        "title": title, "abstract": "Stored abstract", "url": f"https://example.com/{title}",
+        "source": "source", "categories": [], "authors": [], "year": 2020.0,
+    })
+
+@pytest.mark.asyncio
+async def test_pipeline_serves_strong_pinecone_matches():
+    """Test that the pipeline answers from Pinecone when every top-k match is strong"""
+    connector = FakeConnector(['exact match'], delay=10.0)
+    pipeline = make_pipeline({'source': connector})
+    index = FakeIndex([stored_match("stored", 0.95)])
+    pipeline.vector_search = SearchService(index=index, embedding_service=FakeEmbeddingService())
+
+    results = await pipeline.search("query", top_k=1)
+
+    assert [(r['title'], r['abstract'], r['year']) for r in results] == [("stored", "Stored abstract", 2020)]
+    assert index.calls[0]["filter"] == {"source": {"$in": ["source"]}}
+    assert connector.cancelled
+
+@pytest.mark.asyncio
+async def test_pipeline_falls_back_to_sources_on_weak_pinecone_matches():
+    """Test that a weak Pinecone match leaves the answer to the live sources"""
+    pipeline = make_pipeline({'source': FakeConnector(['exact match'], delay=0.0)})
+    pipeline.vector_search = SearchService(index=FakeIndex([stored_match("stored", 0.5)]), embedding_service=FakeEmbeddingService())
+
+    results = await pipeline.search("query", top_k=1)
+
+    assert [r['title'] for r in results] == ['exact match']
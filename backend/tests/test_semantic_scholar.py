@@ -1,7 +1,10 @@
 import pytest
-from app.services.ingestion.sources.semantic_scholar import SemanticScholarConnector
+import httpx
+import json
+from app.services.ingestion.sources.semantic_scholar import SemanticScholarConnector, SemanticScholarPaper
+from app.schemas.paper import Paper
 from pytest_asyncio import fixture
-from typing import List, Dict
+from typing import List
 from unittest.mock import patch
 
 class MockSettings:
@@ -18,16 +21,93 @@ async def semantic_scholar_connector():
 @pytest.mark.asyncio
 async def test_real_semantic_scholar_search(semantic_scholar_connector):
     """Test a real Semantic Scholar search"""
-    results: List[Dict] = await semantic_scholar_connector.fetch_papers("Treatment for COVID-19", max_results=5)
+    results: List[Paper] = await semantic_scholar_connector.fetch_papers("Treatment for COVID-19", max_results=5)
     
     print("\nResults from Semantic Scholar:")
     for paper in results:
-        print(f"\nTitle: {paper['title']}")
-        print(f"Authors: {', '.join(author['name'] for author in paper['metadata']['authors'])}")
-        print(f"Year: {paper['metadata']['year']}")
-        print(f"Citations: {paper['metadata']['citation_count']}")
-        print(f"URL: {paper['url']}")
-        print(f"Abstract: {paper['metadata']['abstract'][:200]}...")
+        print(f"\nTitle: {paper.title}")
+        print(f"Authors: {', '.join(paper.metadata.authors)}")
+        print(f"Year: {paper.metadata.year}")
+        print(f"Citations: {paper.metadata.citations}")
+        print(f"URL: {paper.url}")
+        print(f"Abstract: {paper.metadata.abstract[:200]}...")
     
     assert len(results) > 0
-    assert len(results) <= 5 
\ No newline at end of file
+    assert len(results) <= 5
+
+def s2_paper(i: int, abstract: bool = True) -> dict:
+    return {
+        'paperId': f"id{i}",
+        'title': f"Paper {i}",
+        'abstract': f"Abstract {i}" if abstract else None,
+        'year': 2020 + i,
+        'citationCount': 10 * i,
+        'externalIds': {'DOI': f"10.1000/{i}", 'ArXiv': None},
+        'url': f"https://www.semanticscholar.org/paper/id{i}",
+        'fieldsOfStudy': ["Biology"],
+        'authors': [{'authorId': "1", 'name': "Jane Doe"}],
+        'publicationTypes': ["JournalArticle"],
+    }
+
+@fixture
+async def mock_s2(semantic_scholar_connector, mock_http):
+    """Serves search, bulk and batch endpoints from a mock transport"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        params = dict(request.url.params)
+        body = json.loads(request.content) if request.content else None
+        requests.append((request.method, request.url.path, params, body))
+        if request.url.path.endswith("/paper/search"):
+            return httpx.Response(200, json={'data': [s2_paper(1), s2_paper(2, abstract=False)]})
+        if request.url.path.endswith("/paper/search/bulk"):
+            if params.get('token') == "page2":
+                return httpx.Response(200, json={'data': [{'paperId': "id3"}]})
+            return httpx.Response(200, json={'data': [{'paperId': "id1"}, {'paperId': "id2"}], 'token': "page2"})
+        # /paper/batch: unknown ids come back as null
+        return httpx.Response(200, json=[s2_paper(int(i[2:])) if i.startswith("id") else None for i in body['ids']])
+
+    mock_http(handler)
+    return semantic_scholar_connector, requests
+
+@pytest.mark.asyncio
+async def test_search_maps_to_paper(mock_s2):
+    """Test slim field projection and mapping onto the shared Paper schema"""
+    connector, requests = mock_s2
+
+    papers = await connector.fetch_papers("cattle", max_results=5)
+
+    assert len(papers) == 1  # The record without an abstract is dropped
+    paper = papers[0]
+    assert paper.metadata.citations == 10
+    assert paper.metadata.doi == "10.1000/1"
+    assert paper.metadata.authors == ["Jane Doe"]
+    assert paper.metadata.categories == ["Biology"]
+    fields = requests[0][2]['fields'].split(',')
+    assert 'citationCount' in fields
+    assert 'citations' not in fields and 'references' not in fields
+    assert 'url' not in fields and 'publicationTypes' not in fields  # Ingestion-only
+
+@pytest.mark.asyncio
+async def test_batch_and_bulk(mock_s2):
+    """Test enriching ids in one request and paging bulk search"""
+    connector, requests = mock_s2
+
+    papers = await connector.fetch_by_ids(["id1", "DOI:10.9/unknown", "id2"])
+    assert [paper.title for paper in papers] == ["Paper 1", "Paper 2"]
+    assert requests[-1][0] == "POST" and len(requests[-1][3]['ids']) == 3
+    assert 'publicationTypes' in requests[-1][2]['fields'].split(',')
+
+    pages = [page async for page in connector.fetch_bulk("cattle", max_results=10)]
+    assert [[paper.title for paper in page] for page in pages] == [["Paper 1", "Paper 2"], ["Paper 3"]]
+
+def test_year_less_records_are_skipped():
+    """Test that a record without a year or publication date is dropped, since results need a year"""
+    items = [
+        SemanticScholarPaper(paper_id="id1", title="Dated", abstract="Abstract", publication_date="2019-05-01"),
+        SemanticScholarPaper(paper_id="id2", title="Undated", abstract="Abstract", year=None),
+    ]
+
+    papers = SemanticScholarConnector._to_papers(items)
+
+    assert [(paper.title, paper.metadata.year) for paper in papers] == [("Dated", 2019)]
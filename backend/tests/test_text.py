@@ -0,0 +1,63 @@
+import random
+import re
+import pytest
+from app.utils.text import normalize_whitespace, strip_abstract_noise, strip_markup
+from tests.fixtures.payloads import load_corpus
+
+def legacy_clean_abstract(text: str) -> str:
+    """OpenAlexConnector.clean_abstract before the shared module, kept as the reference"""
+    if not text:
+        return ""
+    patterns_to_remove = [
+        r'Journal of.*?\d+', r'Volume \d+.*?\d+', r'First published:.*?(?=\n|$)', r'https?://\S+',
+        r'DOI:.*?(?=\n|$)', r'Citations:.*?(?=\n|$)', r'\(e-mail:.*?\)', r'Search for more papers.*?(?=\n|$)',
+        r'Please review.*?(?=\n|$)', r'Share.*?(?=\n|$)', r'Copyright.*?(?=\n|$)', r'\d+\.\s+\w+,\s+\d+',
+        r'The Faculty of.*?publications:', r'The dissertation is based.*?publications:', r'Professor.*?Dean',
+        r'Public defence will.*?\d{4}', r'[A-Z][a-z]+ [A-Z][a-z]+\s+et al\.,?\s+\d{4}', r'\([A-Za-z\s]+,\s+\d{4}\)',
+        r'Chapter \d+.*?(?=\n|$)', r'Part [IVX]+.*?(?=\n|$)', r'Preface.*?(?=\n|$)', r'Acknowledgments.*?(?=\n|$)',
+        r'Abstract.*?(?=\n|$)', r'\*Contributed equally.*?(?=\n|$)',
+    ]
+    text = text.strip()
+    for pattern in patterns_to_remove:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\(\d{4}\)', '', text)
+    text = re.sub(r'\[[\d,\s]+\]', '', text)
+    return text.strip()
+
+def legacy_strip_markup(abstract: str) -> str:
+    """CrossrefConnector.clean_abstract before the shared module, kept as the reference"""
+    if not abstract:
+        return ""
+    text = re.sub(r'<[^>]+>', '', abstract)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+def test_matches_legacy_on_corpus():
+    """Test output is identical to the per-pattern implementations on real-world abstracts"""
+    corpus = load_corpus()
+    for text in corpus["open_alex"]:
+        assert strip_abstract_noise(text) == legacy_clean_abstract(text)
+    for text in corpus["crossref"]:
+        assert strip_markup(text) == legacy_strip_markup(text)
+
+def test_matches_legacy_on_generated_text():
+    """Test equivalence on noisy, multi-line and non-ASCII text, including spliced triggers"""
+    fragments = [
+        "Cows form bonds.", "Sh", "are", "http://x.org/a", "(2019)", "[1, 2]", "(Smith, 2020)", "Smith Jones et al. 2018",
+        "DOI: 10.1/x", "\n", "  ", "Journal of Dairy Science 101", "Professor X and the Dean", "1. Methods, 2",
+        "Abstract", "ſhare", "Über", "Part IV", "chapter 2", "<p>", "Volume 3 issue 7", "*Contributed equally",
+    ]
+    rng = random.Random(7)
+    for _ in range(2000):
+        text = "".join(rng.choice(fragments) + rng.choice(["", " "]) for _ in range(rng.randint(0, 12)))
+        assert strip_abstract_noise(text) == legacy_clean_abstract(text), text
+        assert strip_markup(text) == legacy_strip_markup(text), text
+
+@pytest.mark.parametrize("text", ["", None])
+def test_empty(text):
+    assert strip_abstract_noise(text) == ""
+    assert strip_markup(text) == ""
+
+def test_normalize_whitespace():
+    assert normalize_whitespace("  a\n\tb  c ") == "a b c"
@@ -0,0 +1,80 @@
+import pytest
+import asyncio
+import numpy as np
+from app.services.ingestion.write_behind import InMemoryVectorStore, WriteBehindQueue, VectorStore
+from tests.test_pipeline_streaming import FakeConnector, make_pipeline
+
+def make_docs(n: int, prefix: str = "paper"):
+    return [{'title': f"{prefix} {i}", 'url': f"https://example.com/{prefix}/{i}", 'abstract': "abstract", 'doi': None} for i in range(n)]
+
+class FlakyStore(VectorStore):
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.vectors = {}
+
+    def upsert(self, vectors):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("pinecone unavailable")
+        self.vectors.update((vector["id"], vector) for vector in vectors)
+
+@pytest.mark.asyncio
+async def test_batches_and_dedups_by_paper_id():
+    """Test that a paper queued twice is written once, in full batches"""
+    store = InMemoryVectorStore()
+    queue = WriteBehindQueue(store, batch_size=2, flush_interval=10.0)
+
+    docs = make_docs(3)
+    queue.enqueue(docs, np.ones((3, 4)))
+    queue.enqueue(docs[:1], np.zeros((1, 4)))
+    await queue.close()
+
+    assert len(store.vectors) == 3
+    assert store.upserts == 2
+    assert store.vectors["url:https://example.com/paper/0"]["values"] == [0.0] * 4
+    assert "doi" not in store.vectors["url:https://example.com/paper/0"]["metadata"]
+
+    queue.enqueue(docs, np.ones((3, 4)))
+    assert queue.stats()['skipped'] == 3
+
+@pytest.mark.asyncio
+async def test_bounded_pending_drops_oldest():
+    """Test that memory stays bounded when the store can't keep up"""
+    store = InMemoryVectorStore()
+    queue = WriteBehindQueue(store, batch_size=100, max_pending=2, flush_interval=10.0)
+
+    queue.enqueue(make_docs(5), np.ones((5, 4)))
+    assert queue.stats()['pending'] == 2
+    assert queue.stats()['dropped'] == 3
+
+    await queue.close()
+    assert sorted(store.vectors) == ["url:https://example.com/paper/3", "url:https://example.com/paper/4"]
+
+@pytest.mark.asyncio
+async def test_worker_writes_in_background_and_retries():
+    """Test that queued papers reach the store without an explicit flush"""
+    store = FlakyStore(failures=1)
+    queue = WriteBehindQueue(store, batch_size=100, flush_interval=0.01, retry_delay=0.0)
+
+    queue.enqueue(make_docs(2), np.ones((2, 4)))
+    for _ in range(100):
+        if len(store.vectors) == 2:
+            break
+        await asyncio.sleep(0.01)
+
+    assert len(store.vectors) == 2
+    assert queue.stats()['written'] == 2
+    await queue.close()
+
+@pytest.mark.asyncio
+async def test_pipeline_enqueues_ranked_candidates():
+    """Test that a search hands its embedded candidates to the write-behind queue"""
+    pipeline = make_pipeline({'source': FakeConnector(['exact match', 'close match'], delay=0.0)})
+    store = InMemoryVectorStore()
+    pipeline.write_behind = WriteBehindQueue(store, flush_interval=10.0)
+
+    await pipeline.search("query", top_k=1)
+    assert len(store.vectors) == 0  # Not written on the request path
+
+    await pipeline.close()
+    assert len(store.vectors) == 2